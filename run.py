@@ -2,6 +2,7 @@
 Quick start script for Yuzuriha Rin virtual character system
 """
 
+import argparse
 import sys
 import os
 import io
@@ -21,7 +22,34 @@ if sys.platform == "win32":
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Yuzuriha Rin virtual chat server")
+    parser.add_argument(
+        "--mock-llm",
+        action="store_true",
+        help="Serve a local mock LLM and route every session to it (offline load testing)",
+    )
+    parser.add_argument(
+        "--mock-llm-options",
+        default="",
+        help='Options for tools/mock_llm/mock_llm_server.py, e.g. "--latency uniform:200,900"',
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
+    mock_llm_url = None
+    if args.mock_llm:
+        from tools.mock_llm.mock_llm_server import parse_options, start_in_background
+
+        mock_args, mock_settings = parse_options(args.mock_llm_options)
+        mock_llm_url = start_in_background(mock_settings, mock_args.host, mock_args.port)
+        # Must be set before src.* reads LLM settings
+        os.environ["LLM_OVERRIDE_BASE_URL"] = mock_llm_url
+
     import uvicorn
     from src.infrastructure.network.port_manager import PortManager
     from src.api.main import app
@@ -39,6 +67,8 @@ if __name__ == "__main__":
     print("\nStarting server...", flush=True)
     print(f"  ✓ URL: {port_manager.get_base_url()}", flush=True)
     print(f"  ✓ Port: {port}", flush=True)
+    if mock_llm_url:
+        print(f"  ✓ Mock LLM: {mock_llm_url}", flush=True)
     print("\nPress Ctrl+C to stop\n", flush=True)
     print("=" * 60, flush=True)
 
@@ -0,0 +1,182 @@
+"""
+Benchmark and fuzz the structured-output JSON parser.
+
+    python scripts/benchmarks/json_repair_bench.py
+    python scripts/benchmarks/json_repair_bench.py --corpus recorded.jsonl --fuzz 20000
+
+The corpus is JSONL with a "content" field per line (the fixture format
+written by `tools/mock_llm/mock_llm_server.py --record`) and an optional
+"expected_reply". The bundled corpus is hand-built from the usual failure
+shapes of chat models: code fences, trailing commas, truncation, unescaped
+quotes, prose around the object, Python literals.
+
+Benchmark: recovery rate and time per parse for the legacy strategy
+(json.loads, json.loads on the outer braces, then a reply regex) and for
+`repair_json`. Fuzz: mutates well-formed replies (truncation, trailing
+commas, fences, stray quotes, prose) and checks that `repair_json` never
+raises and that truncated replies come back as a prefix of the original.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from src.services.llm.json_repair import orjson, repair_json  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).parent / "fixtures" / "bad_llm_outputs.jsonl"
+
+SAMPLE_REPLIES = [
+    "好呀，那周末见！",
+    '他说"我马上到"，结果又迟到了',
+    "第一行\n第二行",
+    "今天天气真不错，我们去公园走走吧～",
+    "嗯……让我想想，好像是上周三？",
+    "哈哈哈 you are so funny 😂",
+    "路径是 C:\\Users\\rin，别写错了",
+]
+
+
+def legacy_parse(raw_text: str) -> Optional[Dict[str, Any]]:
+    """The pre-repair LLMService strategy; None where it flagged invalid JSON."""
+    try:
+        return json.loads(raw_text)
+    except Exception:
+        pass
+    start = raw_text.find("{")
+    end = raw_text.rfind("}")
+    if start != -1 and end != -1 and end > start:
+        try:
+            return json.loads(raw_text[start : end + 1])
+        except Exception:
+            pass
+    reply_match = re.search(r'"reply"\s*:\s*"([^"]*)"', raw_text)
+    if reply_match:
+        return {"reply": reply_match.group(1), "emotion": {}}
+    return None
+
+
+def repaired_parse(raw_text: str) -> Optional[Dict[str, Any]]:
+    value = repair_json(raw_text).value
+    return value if isinstance(value, dict) else None
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            rows.append(json.loads(line))
+    return rows
+
+
+def recovered(parsed: Optional[Dict[str, Any]], expected: Optional[str]) -> bool:
+    if parsed is None:
+        return False
+    if expected is None:
+        return bool(parsed.get("reply") or parsed.get("tool_calls"))
+    return parsed.get("reply", "") == expected
+
+
+def time_per_call(fn: Callable[[str], Any], texts: List[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1e6
+
+
+def run_benchmark(corpus: List[Dict[str, Any]], rounds: int):
+    texts = [row["content"] for row in corpus]
+    valid = [
+        json.dumps(
+            {"emotion": {"happy": "medium"}, "reply": reply, "tool_calls": []},
+            ensure_ascii=False,
+        )
+        for reply in SAMPLE_REPLIES
+    ]
+    print(f"corpus: {len(corpus)} samples, orjson: {'yes' if orjson else 'no'}")
+    print(f"{'parser':<10} {'recovered':>10} {'bad us/op':>10} {'valid us/op':>12}")
+    for name, fn in (("legacy", legacy_parse), ("repair", repaired_parse)):
+        hits = sum(
+            recovered(fn(row["content"]), row.get("expected_reply")) for row in corpus
+        )
+        bad_us = time_per_call(fn, texts, rounds)
+        valid_us = time_per_call(fn, valid, rounds)
+        print(f"{name:<10} {hits:>6}/{len(corpus):<3} {bad_us:>10.2f} {valid_us:>12.2f}")
+
+    misses = [
+        row for row in corpus if not recovered(repaired_parse(row["content"]), row.get("expected_reply"))
+    ]
+    for row in misses:
+        print(f"  miss: {row['content'][:80]!r}")
+
+
+def mutate(rng: random.Random, reply: str) -> Dict[str, Any]:
+    obj = {"emotion": {rng.choice(["happy", "sad", "shy"]): "medium"}, "reply": reply, "tool_calls": []}
+    text = json.dumps(obj, ensure_ascii=rng.random() < 0.3)
+    kind = rng.choice(["truncate", "trailing_comma", "fence", "prose", "stray_quote", "single_quotes"])
+    if kind == "truncate":
+        reply_at = text.index('"reply"')
+        cut = rng.randint(reply_at + len('"reply": "'), len(text) - 1)
+        return {"kind": kind, "text": text[:cut], "reply": reply}
+    if kind == "trailing_comma":
+        text = text.replace("]}", "],}").replace('"}', '",}', 1)
+    elif kind == "fence":
+        text = f"```json\n{text}\n```"
+    elif kind == "prose":
+        text = f"好的：\n{text}\n希望有帮助"
+    elif kind == "stray_quote":
+        text = text.replace('\\"', '"')
+    elif kind == "single_quotes" and '"' not in reply and "'" not in reply and "\\" not in reply:
+        text = text.replace('"', "'")
+    return {"kind": kind, "text": text, "reply": reply}
+
+
+def run_fuzz(iterations: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    counts: Dict[str, List[int]] = {}
+    for _ in range(iterations):
+        case = mutate(rng, rng.choice(SAMPLE_REPLIES))
+        try:
+            parsed = repaired_parse(case["text"])
+        except Exception as e:  # The parser must never raise
+            failures += 1
+            print(f"  raised {e!r} on {case['text'][:80]!r}")
+            continue
+        got = (parsed or {}).get("reply", "")
+        if case["kind"] == "truncate":
+            ok = isinstance(got, str) and case["reply"].startswith(got.rstrip("\\"))
+        else:
+            ok = got == case["reply"]
+        stats = counts.setdefault(case["kind"], [0, 0])
+        stats[0] += ok
+        stats[1] += 1
+    print(f"fuzz: {iterations} cases, seed {seed}, exceptions {failures}")
+    for kind, (ok, total) in sorted(counts.items()):
+        print(f"  {kind:<15} {ok}/{total}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--rounds", type=int, default=200, help="Timing rounds over the corpus")
+    parser.add_argument("--fuzz", type=int, default=5000, help="Fuzz iterations (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(load_corpus(args.corpus), args.rounds)
+    failures = run_fuzz(args.fuzz, args.seed) if args.fuzz else 0
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ from src.infrastructure.database.repositories import (
     MessageRepository,
     CharacterRepository,
     SessionRepository,
-    ConfigRepository
+    ConfigRepository,
+    SessionStateRepository
 )
 from src.services.messaging.message_service import MessageService
 from src.services.character.character_service import CharacterService
@@ -12,12 +13,19 @@ from src.services.configurations.config_service import ConfigService
 from src.core.configs import database_config
 
 
-# Database connection singleton
+# Database connection singleton (shared pool for HTTP and WebSocket routes)
 @lru_cache()
 def get_db_connection() -> DatabaseConnection:
     return DatabaseConnection(database_config.path)
 
 
+async def close_db_connection():
+    """Flush and close the shared connection pool if it was ever opened."""
+    if get_db_connection.cache_info().currsize:
+        await get_db_connection().aclose()
+        get_db_connection.cache_clear()
+
+
 # Repository dependencies
 def get_message_repository() -> MessageRepository:
     conn = get_db_connection()
@@ -39,11 +47,17 @@ def get_config_repository() -> ConfigRepository:
     return ConfigRepository(conn)
 
 
+def get_session_state_repository() -> SessionStateRepository:
+    conn = get_db_connection()
+    return SessionStateRepository(conn)
+
+
 # Service dependencies
 @lru_cache()
 def get_message_service() -> MessageService:
     message_repo = get_message_repository()
-    return MessageService(message_repo)
+    state_repo = get_session_state_repository()
+    return MessageService(message_repo, state_repo)
 
 
 @lru_cache()
@@ -1,21 +1,29 @@
 import logging
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List, get_args, get_origin
 from pydantic_core import PydanticUndefined
 from src.infrastructure.database.connection import DatabaseConnection
+from src.api.dependencies import get_db_connection
 from src.services.character.character_service import CharacterService
 from src.services.configurations.config_service import ConfigService
 from src.services.messaging.message_service import MessageService
+from src.services.messaging.message_cache import message_tail_cache
+from src.services.llm.client_pool import llm_client_pool
+from src.services.llm.rate_limiter import get_scheduler_stats
+from src.services.llm.resilience import get_circuit_stats
+from src.services.llm.response_cache import get_response_cache_stats
+from src.services.behavior.scheduler import timeline_scheduler
+from src.services.llm.router import get_router_stats
 from src.infrastructure.database.repositories import (
     MessageRepository,
     CharacterRepository,
     SessionRepository,
     ConfigRepository,
+    SessionStateRepository,
 )
-from src.core.configs import database_config
 from src.core.models.constants import DEFAULT_USER_ID
 from src.core.models.character import Character
 from src.utils.url_utils import sanitize_base_url
@@ -56,16 +64,17 @@ async def initialize_services():
 
     if db_connection is None:
         try:
-            db_connection = DatabaseConnection(database_config.path)
+            db_connection = get_db_connection()
 
             # Create repositories
             message_repo = MessageRepository(db_connection)
             character_repo = CharacterRepository(db_connection)
             session_repo = SessionRepository(db_connection)
             config_repo = ConfigRepository(db_connection)
+            state_repo = SessionStateRepository(db_connection)
 
             # Create services
-            message_service = MessageService(message_repo)
+            message_service = MessageService(message_repo, state_repo)
             config_service = ConfigService(config_repo)
             character_service = CharacterService(
                 character_repo, session_repo, message_service, config_service
@@ -408,14 +417,31 @@ async def activate_session(session_id: str):
 
 
 @router.get("/sessions/{session_id}/messages")
-async def get_session_messages(session_id: str, after: float = 0):
+async def get_session_messages(
+    session_id: str,
+    after: Optional[float] = None,
+    after_seq: Optional[int] = None,
+    before_seq: Optional[int] = None,
+    limit: Optional[int] = None,
+):
     """
-    Incremental message sync over HTTP.
-    Returns all messages with timestamp > after.
+    Incremental message sync over HTTP with keyset pagination.
+    `after_seq` pages forward, `before_seq` pages back (newest page first);
+    `has_more` tells the client to request the next page. `after` (timestamp)
+    is still honored when no seq cursor is given.
     """
     await initialize_services()
-    messages = await message_service.get_messages(session_id, after)
+    messages, has_more = await message_service.get_message_page(
+        session_id,
+        after_seq=after_seq,
+        before_seq=before_seq,
+        limit=limit,
+        after_timestamp=after if after_seq is None and before_seq is None else None,
+    )
+    if before_seq is None:
+        messages += await message_service.get_state_messages(session_id)
     return {
+        "has_more": has_more,
         "messages": [
             {
                 "id": msg.id,
@@ -427,6 +453,7 @@ async def get_session_messages(session_id: str, after: float = 0):
                 "is_recalled": msg.is_recalled,
                 "is_read": msg.is_read,
                 "timestamp": msg.timestamp,
+                "seq": msg.seq,
             }
             for msg in messages
         ]
@@ -456,10 +483,38 @@ async def update_config(data: ConfigUpdate):
 
 
 @router.get("/hash")
-async def get_hash():
+async def get_hash(request: Request):
+    """
+    Version tag of config, avatar, characters and sessions (O(1) read of
+    trigger-maintained counters). Also sent as an ETag; a matching
+    If-None-Match gets 304 Not Modified.
+    """
     await initialize_services()
     hash_value = await config_service.compute_hash()
-    return {"hash": hash_value}
+    etag = f'"{hash_value}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if hash_value and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({"hash": hash_value}, headers=headers)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Operational metrics for the backend runtime (DB pool, executor, caches)."""
+    from src.api import websocket_session as ws_routes
+
+    await initialize_services()
+    return {
+        "database": db_connection.get_metrics(),
+        "message_cache": message_tail_cache.get_stats(),
+        "llm_clients": llm_client_pool.get_stats(),
+        "llm_schedulers": get_scheduler_stats(),
+        "llm_circuits": get_circuit_stats(),
+        "llm_endpoints": get_router_stats(),
+        "llm_response_cache": get_response_cache_stats(),
+        "timelines": timeline_scheduler.get_stats(),
+        "sessions": ws_routes.session_clients.get_stats(),
+    }
 
 
 @router.get("/avatar")
@@ -31,7 +31,13 @@ async def lifespan(app: FastAPI):
     try:
         # Import here to avoid circular dependencies
         from src.api.websocket_session import cleanup_resources
+        from src.api.dependencies import close_db_connection
+        from src.services.llm.client_pool import llm_client_pool
+        from src.services.llm.response_cache import close_response_cache
         await cleanup_resources()
+        await llm_client_pool.aclose()
+        close_response_cache()
+        await close_db_connection()
         logger.info("Application shutdown complete")
     except Exception as e:
         logger.error(f"Error during shutdown cleanup: {e}", exc_info=True)
@@ -2,11 +2,13 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Optional, Dict, Any
 
 from src.infrastructure.database.connection import DatabaseConnection
+from src.api.dependencies import get_db_connection
 from src.infrastructure.database.repositories import (
     MessageRepository,
     CharacterRepository,
     SessionRepository,
     ConfigRepository,
+    SessionStateRepository,
 )
 from src.services.messaging.message_service import MessageService
 from src.services.character.character_service import CharacterService
@@ -17,7 +19,6 @@ from src.core.utils.logger import (
     broadcast_log_if_needed,
     LogCategory,
 )
-from src.core.configs import database_config
 
 router = APIRouter()
 
@@ -32,15 +33,16 @@ async def initialize_services():
     global conn_mgr, message_service, character_service, config_service, ws_manager
 
     if conn_mgr is None:
-        conn_mgr = DatabaseConnection(database_config.path)
+        conn_mgr = get_db_connection()
 
     message_repo = MessageRepository(conn_mgr)
     character_repo = CharacterRepository(conn_mgr)
     session_repo = SessionRepository(conn_mgr)
     config_repo = ConfigRepository(conn_mgr)
+    state_repo = SessionStateRepository(conn_mgr)
 
     if message_service is None:
-        message_service = MessageService(message_repo)
+        message_service = MessageService(message_repo, state_repo)
     if config_service is None:
         config_service = ConfigService(config_repo)
     if character_service is None:
@@ -1,26 +1,29 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from src.infrastructure.database.connection import DatabaseConnection
+from src.api.dependencies import get_db_connection
 from src.infrastructure.database.repositories import (
     MessageRepository,
     CharacterRepository,
     SessionRepository,
     ConfigRepository,
+    SessionStateRepository,
 )
 from src.services.messaging.message_service import MessageService
 from src.services.character.character_service import CharacterService
 from src.services.configurations.config_service import ConfigService
 from src.services.session.session_service import SessionService
+from src.services.session.session_registry import SessionRegistry
 from src.infrastructure.network.websocket_manager import WebSocketManager
-from src.core.models.message import MessageType
+from src.core.models.message import Message, MessageType
 from src.core.schemas import LLMConfig
 from src.core.utils.logger import (
     unified_logger,
     broadcast_log_if_needed,
     LogCategory,
 )
-from src.core.configs import database_config, llm_defaults
+from src.core.configs import llm_defaults, session_config, websocket_config
 from src.core.models.constants import DEFAULT_USER_ID
 from src.utils.url_utils import sanitize_base_url
 
@@ -31,19 +34,26 @@ message_repo: Optional[MessageRepository] = None
 character_repo: Optional[CharacterRepository] = None
 session_repo: Optional[SessionRepository] = None
 config_repo: Optional[ConfigRepository] = None
+state_repo: Optional[SessionStateRepository] = None
 message_service: Optional[MessageService] = None
 character_service: Optional[CharacterService] = None
 config_service: Optional[ConfigService] = None
 ws_manager: Optional[WebSocketManager] = None
-session_clients: Dict[str, SessionService] = {}
+# Live SessionService per session, LRU-bounded and evicted when idle
+session_clients = SessionRegistry(
+    max_sessions=session_config.max_active,
+    idle_timeout=session_config.idle_timeout,
+    sweep_interval=session_config.idle_sweep_interval,
+    max_dormant=session_config.max_dormant,
+)
 
 
 async def initialize_services():
-    global conn_mgr, message_repo, character_repo, session_repo, config_repo
+    global conn_mgr, message_repo, character_repo, session_repo, config_repo, state_repo
     global message_service, character_service, config_service, ws_manager
 
     if conn_mgr is None:
-        conn_mgr = DatabaseConnection(database_config.path)
+        conn_mgr = get_db_connection()
 
     # Initialize repos/services if missing (supports init order with global WS first).
     if message_repo is None:
@@ -54,9 +64,11 @@ async def initialize_services():
         session_repo = SessionRepository(conn_mgr)
     if config_repo is None:
         config_repo = ConfigRepository(conn_mgr)
+    if state_repo is None:
+        state_repo = SessionStateRepository(conn_mgr)
 
     if message_service is None:
-        message_service = MessageService(message_repo)
+        message_service = MessageService(message_repo, state_repo)
     if config_service is None:
         config_service = ConfigService(config_repo)
     if character_service is None:
@@ -84,7 +96,11 @@ async def initialize_services():
 
 @router.websocket("/ws/{session_id}")
 async def websocket_endpoint(
-    websocket: WebSocket, session_id: str, user_id: str = Query(default=DEFAULT_USER_ID)
+    websocket: WebSocket,
+    session_id: str,
+    user_id: str = Query(default=DEFAULT_USER_ID),
+    after_seq: Optional[int] = Query(default=None),
+    limit: Optional[int] = Query(default=None),
 ):
     await initialize_services()
 
@@ -98,27 +114,7 @@ async def websocket_endpoint(
     await ws_manager.connect(websocket, session_id, user_id)
 
     try:
-        messages = await message_service.get_messages(session_id)
-        history_event = {
-            "type": "history",
-            "data": {
-                "messages": [
-                    {
-                        "id": msg.id,
-                        "session_id": msg.session_id,
-                        "sender_id": msg.sender_id,
-                        "type": msg.type,
-                        "content": msg.content,
-                        "metadata": msg.metadata,
-                        "is_recalled": msg.is_recalled,
-                        "is_read": msg.is_read,
-                        "timestamp": msg.timestamp,
-                    }
-                    for msg in messages
-                ]
-            },
-        }
-        await ws_manager.send_to_websocket(websocket, history_event)
+        await send_connect_history(websocket, session_id, after_seq, limit)
 
         while True:
             data = await websocket.receive_json()
@@ -162,6 +158,9 @@ async def handle_client_message(
         elif msg_type == "sync_messages":
             await handle_sync_messages(websocket, session_id, data)
 
+        elif msg_type == "load_history":
+            await handle_load_history(websocket, session_id, data)
+
         elif msg_type == "switch_session":
             await handle_switch_session(data)
 
@@ -221,6 +220,7 @@ async def handle_send_message(session_id: str, user_id: str, data: Dict[str, Any
                 "is_recalled": message.is_recalled,
                 "is_read": message.is_read,
                 "timestamp": message.timestamp,
+                "seq": message.seq,
             },
         }
         # If blocked, only send to user, not to character_client
@@ -252,15 +252,46 @@ async def handle_send_message(session_id: str, user_id: str, data: Dict[str, Any
                 "is_recalled": hint_msg.is_recalled,
                 "is_read": hint_msg.is_read,
                 "timestamp": hint_msg.timestamp,
+                "seq": hint_msg.seq,
             },
         }
         # Send hint only to user
         await ws_manager.send_to_user(session_id, user_id, hint_event)
     else:
         # Only process with session client if not blocked
-        session_client = session_clients.get(session_id)
+        session_client = session_clients.get(session_id) or await rehydrate_session(
+            session_id
+        )
         if session_client:
-            await session_client.process_user_message(messages[-1])
+            session_clients.touch(session_id)
+            await session_client.enqueue_user_message(messages[-1])
+        else:
+            # Never initialized, or its init payload fell out of the dormant
+            # bound: the message is stored but nothing will answer it.
+            log_entry = unified_logger.warning(
+                f"No SessionService for session {session_id}; requesting init_character",
+                category=LogCategory.WEBSOCKET,
+                metadata={"session_id": session_id, "message_id": messages[-1].id},
+            )
+            await broadcast_log_if_needed(log_entry)
+            await ws_manager.send_to_conversation(
+                session_id,
+                {"type": "reinit_required", "data": {"session_id": session_id}},
+            )
+
+
+async def rehydrate_session(session_id: str) -> Optional[SessionService]:
+    """Rebuild the SessionService of a session evicted while idle."""
+    payload = session_clients.take_dormant(session_id)
+    if payload is None:
+        return None
+    await handle_init_character(session_id, payload["data"], payload["user_id"])
+    log_entry = unified_logger.info(
+        f"SessionService rehydrated for session {session_id}",
+        category=LogCategory.WEBSOCKET,
+    )
+    await broadcast_log_if_needed(log_entry)
+    return session_clients.get(session_id)
 
 
 async def handle_set_typing(session_id: str, user_id: str, data: Dict[str, Any]):
@@ -280,6 +311,7 @@ async def handle_set_typing(session_id: str, user_id: str, data: Dict[str, Any])
             "is_recalled": typing_msg.is_recalled,
             "is_read": typing_msg.is_read,
             "timestamp": typing_msg.timestamp,
+            "seq": typing_msg.seq,
         },
     }
     await ws_manager.send_to_conversation(session_id, event, exclude_ws=None)
@@ -312,40 +344,142 @@ async def handle_recall_message(session_id: str, user_id: str, data: Dict[str, A
                 "is_recalled": recall_msg.is_recalled,
                 "is_read": recall_msg.is_read,
                 "timestamp": recall_msg.timestamp,
+                "seq": recall_msg.seq,
             },
         }
         await ws_manager.send_to_conversation(session_id, event)
 
 
-async def handle_sync_messages(
-    websocket: WebSocket, session_id: str, data: Dict[str, Any]
-):
-    after_timestamp = data.get("after_timestamp", 0)
+def _message_to_dict(msg: Message) -> Dict[str, Any]:
+    return {
+        "id": msg.id,
+        "session_id": msg.session_id,
+        "sender_id": msg.sender_id,
+        "type": msg.type,
+        "content": msg.content,
+        "metadata": msg.metadata,
+        "is_recalled": msg.is_recalled,
+        "is_read": msg.is_read,
+        "timestamp": msg.timestamp,
+        "seq": msg.seq,
+    }
 
-    messages = await message_service.get_messages(session_id, after_timestamp)
 
+async def _send_history_frame(
+    websocket: WebSocket,
+    messages: List[Message],
+    has_more: bool,
+    final: bool,
+    direction: str,
+):
     history_event = {
         "type": "history",
         "data": {
-            "messages": [
-                {
-                    "id": msg.id,
-                    "session_id": msg.session_id,
-                    "sender_id": msg.sender_id,
-                    "type": msg.type,
-                    "content": msg.content,
-                    "metadata": msg.metadata,
-                    "is_recalled": msg.is_recalled,
-                    "is_read": msg.is_read,
-                    "timestamp": msg.timestamp,
-                }
-                for msg in messages
-            ]
+            "messages": [_message_to_dict(msg) for msg in messages],
+            "has_more": has_more,
+            "final": final,
+            "direction": direction,
         },
     }
     await ws_manager.send_to_websocket(websocket, history_event)
 
 
+async def send_connect_history(
+    websocket: WebSocket,
+    session_id: str,
+    after_seq: Optional[int],
+    limit: Optional[int],
+):
+    """
+    Send history on connect as bounded `history` frames.
+
+    With a client cursor (`after_seq`) only the delta is streamed forward,
+    one chunk per frame, until caught up. Without one, only the newest page
+    is sent (direction "latest"); `has_more` tells the client older pages can
+    be requested with `load_history`. The last frame has `final` set and carries the current
+    typing/emotion state.
+    """
+    chunk_size = limit if limit and limit > 0 else websocket_config.history_chunk_size
+
+    if after_seq is None:
+        messages, has_more = await message_service.get_message_page(
+            session_id, limit=chunk_size, from_end=True
+        )
+        messages += await message_service.get_state_messages(session_id)
+        await _send_history_frame(websocket, messages, has_more, True, "latest")
+        return
+
+    cursor = after_seq
+    while True:
+        messages, has_more = await message_service.get_message_page(
+            session_id, after_seq=cursor, limit=chunk_size
+        )
+        if messages:
+            cursor = messages[-1].seq or cursor
+        if not has_more:
+            messages += await message_service.get_state_messages(session_id)
+        await _send_history_frame(
+            websocket, messages, has_more, not has_more, "forward"
+        )
+        if not has_more:
+            return
+
+
+async def handle_load_history(
+    websocket: WebSocket, session_id: str, data: Dict[str, Any]
+):
+    """Backfill: send the page of messages older than `before_seq`."""
+    before_seq = _optional_int(data.get("before_seq"))
+    limit = _optional_int(data.get("limit")) or websocket_config.history_chunk_size
+
+    messages, has_more = await message_service.get_message_page(
+        session_id, before_seq=before_seq, limit=limit, from_end=before_seq is None
+    )
+    await _send_history_frame(websocket, messages, has_more, True, "backward")
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def handle_sync_messages(
+    websocket: WebSocket, session_id: str, data: Dict[str, Any]
+):
+    """
+    Keyset-paginated sync: `after_seq` pages forward, `before_seq` pages back.
+    `after_timestamp` is still accepted from older clients when no seq cursor is sent.
+    """
+    after_seq = _optional_int(data.get("after_seq"))
+    before_seq = _optional_int(data.get("before_seq"))
+    limit = _optional_int(data.get("limit"))
+    after_timestamp = None
+    if after_seq is None and before_seq is None:
+        after_timestamp = data.get("after_timestamp")
+
+    messages, has_more = await message_service.get_message_page(
+        session_id,
+        after_seq=after_seq,
+        before_seq=before_seq,
+        limit=limit,
+        after_timestamp=after_timestamp,
+    )
+    if before_seq is None:
+        messages += await message_service.get_state_messages(session_id)
+
+    await _send_history_frame(
+        websocket,
+        messages,
+        has_more,
+        True,
+        "backward" if before_seq is not None else "forward",
+    )
+
+
 async def handle_switch_session(data: Dict[str, Any]):
     new_session_id = data.get("session_id")
     if not new_session_id:
@@ -361,10 +495,7 @@ async def handle_clear_session(session_id: str):
 
     new_session_id = await character_service.recreate_session(session.character_id)
     if new_session_id:
-        session_client = session_clients.get(session_id)
-        if session_client:
-            await session_client.stop()
-            del session_clients[session_id]
+        await session_clients.remove(session_id)
 
         event = {
             "type": "session_recreated",
@@ -375,10 +506,7 @@ async def handle_clear_session(session_id: str):
 
 async def handle_init_character(session_id: str, data: Dict[str, Any], user_id: str):
     if session_id in session_clients:
-        old_client = session_clients.get(session_id)
-        if old_client:
-            await old_client.stop()
-        session_clients.pop(session_id, None)
+        await session_clients.remove(session_id)
         log_entry = unified_logger.info(
             f"SessionService reinitialized for session {session_id}",
             category=LogCategory.WEBSOCKET,
@@ -413,6 +541,9 @@ async def handle_init_character(session_id: str, data: Dict[str, Any], user_id:
     )
 
     resolved_api_key = llm_config_dict.get("api_key") or config.get("llm_api_key") or ""
+    if not resolved_api_key and llm_defaults.override_base_url:
+        # The local mock provider (run.py --mock-llm) does not check keys.
+        resolved_api_key = "mock-llm"
     if not resolved_api_key:
         # Allow init to proceed so UI can load; LLM calls will fail until key set.
         resolved_api_key = "DUMMY_API_KEY"
@@ -428,7 +559,9 @@ async def handle_init_character(session_id: str, data: Dict[str, Any], user_id:
         )
 
     normalized_base_url = sanitize_base_url(
-        llm_config_dict.get("base_url") or config.get("llm_base_url")
+        llm_defaults.override_base_url
+        or llm_config_dict.get("base_url")
+        or config.get("llm_base_url")
     )
 
     # Handle temperature - can be None (optional)
@@ -473,7 +606,9 @@ async def handle_init_character(session_id: str, data: Dict[str, Any], user_id:
     )
 
     await session_client.start(session_id)
-    session_clients[session_id] = session_client
+    await session_clients.add(
+        session_id, session_client, {"data": data, "user_id": user_id}
+    )
 
     log_entry = unified_logger.info(
         f"SessionService initialized for session {session_id} with character {character.name}",
@@ -524,7 +659,7 @@ async def cleanup_resources():
                 )
                 await broadcast_log_if_needed(log_entry)
 
-        session_clients.clear()
+    session_clients.clear()
 
     # Close all WebSocket connections
     if ws_manager:
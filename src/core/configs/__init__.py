@@ -5,12 +5,16 @@ from src.core.configs.settings import (
     UIDefaults,
     WebSocketConfig,
     DatabaseConfig,
+    CacheConfig,
+    SessionConfig,
     app_config,
     character_config,
     llm_defaults,
     ui_defaults,
     websocket_config,
-    database_config
+    database_config,
+    cache_config,
+    session_config,
 )
 
 __all__ = [
@@ -20,10 +24,14 @@ __all__ = [
     'UIDefaults',
     'WebSocketConfig',
     'DatabaseConfig',
+    'CacheConfig',
+    'SessionConfig',
     'app_config',
     'character_config',
     'llm_defaults',
     'ui_defaults',
     'websocket_config',
     'database_config',
+    'cache_config',
+    'session_config',
 ]
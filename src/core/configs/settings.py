@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Dict
+from typing import Any, Dict, List
 from src.core.models.constants import DEFAULT_USER_AVATAR, DEFAULT_ASSISTANT_AVATAR
 
 
@@ -29,6 +29,61 @@ class LLMDefaults(BaseSettings):
     api_key: str = ""  # Required but default empty
     model: str = "deepseek-chat"  # Default to deepseek-chat
     max_tokens: int = 1000  # Required, default 1000
+    # Forces every session onto this base URL (set by `run.py --mock-llm`)
+    override_base_url: str = ""
+    # Prompt size control (system block + history); 0 disables trimming
+    context_token_budget: int = 12000
+    context_min_recent_messages: int = 8  # Newest turns never dropped
+    context_tokenizer: str = ""  # Local HF tokenizer path/id; empty = heuristic
+    # "stable": keep a byte-identical prompt prefix across turns for provider
+    # prefix caching (history is trimmed in steps of context_drop_granularity)
+    prompt_layout: str = "classic"
+    context_drop_granularity: int = 16
+    stream: bool = True  # SSE streaming so replies can play while generating
+    # Provider prompt caching: cache_control breakpoints (messages) and
+    # prompt_cache_key (responses); completions providers cache automatically
+    prompt_cache: bool = True
+    messages_api_version: str = "2023-06-01"  # anthropic-version header
+    # Shared HTTP client pool (one client per provider origin)
+    http_timeout: float = 60.0
+    http_connect_timeout: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2: bool = False  # Requires the optional 'h2' package
+    # Admission control per provider + model (0 = unlimited)
+    max_in_flight: int = 8
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    # Retries for 429/5xx/timeouts (jittered exponential backoff, honors Retry-After)
+    retry_max_attempts: int = 3  # Total attempts including the first; 1 disables retries
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 10.0
+    # Per-endpoint circuit breaker: fail fast while a provider is down
+    circuit_failure_threshold: int = 5  # Consecutive transient failures before opening
+    circuit_recovery_timeout: float = 30.0  # Seconds open before a probe request
+    # Extra OpenAI-compatible endpoints, JSON list of
+    # {"base_url", "api_key", "model", "weight"}; missing fields inherit the session's
+    fallback_endpoints: List[Dict[str, Any]] = Field(default_factory=list)
+    router_window: int = 50  # Recent requests kept per endpoint for latency/error stats
+    router_min_samples: int = 10  # Samples before an endpoint's stats are trusted
+    # Hedging: after the primary's p95 latency, send a duplicate to the next endpoint
+    hedge_enabled: bool = False
+    hedge_min_delay: float = 1.0  # Floor for the hedge deadline (seconds)
+    hedge_default_delay: float = 5.0  # Deadline until enough latency samples exist
+    # Reply cache for byte-identical prompts (retries, re-inits, deterministic runs);
+    # sampled requests (temperature unset or > 0) bypass it unless allowed
+    response_cache: bool = False
+    response_cache_ttl: float = 600.0  # Seconds an entry stays valid
+    response_cache_max_entries: int = 256  # In-memory LRU size
+    response_cache_path: str = ""  # SQLite file for a persistent tier; empty = memory only
+    response_cache_allow_sampling: bool = False
+    # Rolling summary of older turns (runs in the background after a reply)
+    summary_enabled: bool = True
+    summary_trigger_messages: int = 60  # Unsummarized prompt messages before folding
+    summary_trigger_tokens: int = 6000  # ...or unsummarized prompt tokens
+    summary_keep_recent_messages: int = 20  # Newest messages always kept verbatim
+    summary_max_tokens: int = 600
 
     class Config:
         env_file = ".env"
@@ -75,6 +130,8 @@ class WebSocketConfig(BaseSettings):
     port: int = 8000
     ping_interval: float = 20.0
     ping_timeout: float = 10.0
+    # Messages per `history` frame sent on connect / load_history
+    history_chunk_size: int = 100
 
     class Config:
         env_file = ".env"
@@ -83,15 +140,61 @@ class WebSocketConfig(BaseSettings):
 
 class DatabaseConfig(BaseSettings):
     path: str = "data/database/rin_app.db"
+    # Connection pool: one writer plus this many long-lived reader connections
+    reader_pool_size: int = 4
+    # Per-connection page cache (KiB) and memory-mapped I/O window (bytes)
+    cache_size_kb: int = 16384
+    mmap_size: int = 268435456
+    # Worker threads running blocking sqlite3 calls off the event loop
+    executor_workers: int = 5
+    # Write-behind batching for message inserts/updates
+    write_flush_interval_ms: int = 5
+    write_batch_size: int = 64
+    # Keyset pagination for message sync (default and maximum page size)
+    message_page_size: int = 200
+    message_page_max: int = 1000
 
     class Config:
         env_file = ".env"
         env_prefix = "DB_"
 
 
+class CacheConfig(BaseSettings):
+    # In-memory per-session message tail cache (MessageTailCache)
+    message_cache_sessions: int = 32
+    message_cache_messages_per_session: int = 2000
+
+    class Config:
+        env_file = ".env"
+        env_prefix = "CACHE_"
+
+
+class SessionConfig(BaseSettings):
+    # Inbound user messages: a burst arriving within this window (ms) of each
+    # other becomes one LLM turn; 0 replies to every message immediately
+    inbound_debounce_ms: int = 800
+    # New input cancels a reply still generating or playing back
+    supersede_on_new_input: bool = True
+    # Behavior timelines share one scheduler; actions due within this many ms
+    # of each other are dispatched together
+    timeline_tick_ms: int = 10
+    # Live SessionService instances: LRU bound and idle eviction (0 disables);
+    # an evicted session is rebuilt on its next message
+    max_active: int = 64
+    idle_timeout: float = 900.0
+    idle_sweep_interval: float = 60.0
+    max_dormant: int = 1024  # Init payloads kept for rebuilding evicted sessions
+
+    class Config:
+        env_file = ".env"
+        env_prefix = "SESSION_"
+
+
 app_config = AppConfig()
 character_config = CharacterConfig()
 llm_defaults = LLMDefaults()
 ui_defaults = UIDefaults()
 websocket_config = WebSocketConfig()
 database_config = DatabaseConfig()
+cache_config = CacheConfig()
+session_config = SessionConfig()
@@ -3,6 +3,7 @@ from src.core.interfaces.repositories import (
     ICharacterRepository,
     ISessionRepository,
     IMessageRepository,
+    ISessionStateRepository,
     IConfigRepository,
 )
 
@@ -10,5 +11,6 @@ __all__ = [
     "ICharacterRepository",
     "ISessionRepository",
     "IMessageRepository",
+    "ISessionStateRepository",
     "IConfigRepository",
 ]
@@ -1,6 +1,6 @@
 """Repository interfaces for dependency inversion"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from src.core.models.character import Character
 from src.core.models.session import Session
 from src.core.models.message import Message
@@ -84,19 +84,61 @@ class IMessageRepository(ABC):
     
     @abstractmethod
     async def get_by_session(
-        self, session_id: str, after_timestamp: Optional[float] = None
+        self,
+        session_id: str,
+        after_timestamp: Optional[float] = None,
+        limit: Optional[int] = None,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        from_end: bool = False,
     ) -> List[Message]:
         """Get messages for a session"""
         pass
     
     @abstractmethod
-    async def create(self, message: Message) -> bool:
-        """Create a new message"""
+    async def get_last_message(self, session_id: str) -> Optional[Message]:
+        """Get the newest message of a session"""
         pass
     
     @abstractmethod
-    async def update_recalled_status(self, message_id: str, is_recalled: bool) -> bool:
-        """Update recalled status of a message"""
+    async def get_latest_by_type(
+        self, session_id: str, message_type: str
+    ) -> Optional[Message]:
+        """Get the newest message of a given type in a session"""
+        pass
+    
+    @abstractmethod
+    async def exists_by_type(self, session_id: str, message_type: str) -> bool:
+        """Check whether a session has any message of a given type"""
+        pass
+    
+    @abstractmethod
+    async def create(
+        self,
+        message: Message,
+        durable: bool = True,
+        on_failure: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Create a new message (durable=False returns once queued and calls
+        `on_failure` if the queued write is later lost)
+        """
+        pass
+    
+    @abstractmethod
+    async def update_recalled_status(
+        self,
+        message_id: str,
+        is_recalled: bool,
+        durable: bool = True,
+        on_failure: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """Update recalled status of a message (`on_failure` as in create)"""
+        pass
+    
+    @abstractmethod
+    async def flush_pending_writes(self) -> None:
+        """Commit any queued write-behind statements"""
         pass
     
     @abstractmethod
@@ -117,6 +159,37 @@ class IMessageRepository(ABC):
         pass
 
 
+class ISessionStateRepository(ABC):
+    """Interface for per-session state (typing, emotion) repository"""
+    
+    @abstractmethod
+    async def get_state(self, session_id: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get a single state value"""
+        pass
+    
+    @abstractmethod
+    async def get_states(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get all state values of a session with their update time"""
+        pass
+    
+    @abstractmethod
+    async def set_state(
+        self,
+        session_id: str,
+        key: str,
+        value: Dict[str, Any],
+        updated_at: float,
+        durable: bool = True,
+    ) -> bool:
+        """Upsert a state value"""
+        pass
+    
+    @abstractmethod
+    async def delete_by_session(self, session_id: str) -> bool:
+        """Delete all state for a session"""
+        pass
+
+
 class IConfigRepository(ABC):
     """Interface for configuration repository"""
     
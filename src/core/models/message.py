@@ -40,6 +40,8 @@ class Message(BaseModel):
     is_recalled: bool = False
     is_read: bool = False
     timestamp: float
+    # Per-session monotonic sequence number; None for transient state messages.
+    seq: Optional[int] = None
 
     class Config:
         use_enum_values = True
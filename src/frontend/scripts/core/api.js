@@ -41,15 +41,19 @@ export async function fetchSessions() {
 }
 
 /**
- * Incremental message sync over HTTP.
+ * Incremental message sync over HTTP (one keyset page).
  * @param {string} sessionId
- * @param {number} afterTimestamp
+ * @param {{afterSeq?: number|null, beforeSeq?: number|null, after?: number|null, limit?: number|null}} cursor
+ * @returns {Promise<{messages: any[], hasMore: boolean}>}
  */
-export async function fetchMessages(sessionId, afterTimestamp) {
-  const data = await fetchJson(
-    `/api/sessions/${sessionId}/messages?after=${encodeURIComponent(afterTimestamp || 0)}`,
-  );
-  return data.messages || [];
+export async function fetchMessages(sessionId, cursor = {}) {
+  const params = new URLSearchParams();
+  if (cursor.afterSeq != null) params.set("after_seq", String(cursor.afterSeq));
+  if (cursor.beforeSeq != null) params.set("before_seq", String(cursor.beforeSeq));
+  if (cursor.after != null) params.set("after", String(cursor.after));
+  if (cursor.limit != null) params.set("limit", String(cursor.limit));
+  const data = await fetchJson(`/api/sessions/${sessionId}/messages?${params}`);
+  return { messages: data.messages || [], hasMore: Boolean(data.has_more) };
 }
 
 export async function fetchConfig() {
@@ -12,7 +12,7 @@ import * as api from "./api.js";
 import { WsClient } from "./ws.js";
 import { GlobalWsClient } from "./globalWs.js";
 import { renderSessionListView, showSessionListView } from "../views/sessionList.js";
-import { renderChatSession, showChatSession, showChatView, ensureChatSessionContainer, setWsClient, dropChatSessionContainer, refreshVisibleAvatars } from "../views/chatView.js";
+import { renderChatSession, showChatSession, showChatView, ensureChatSessionContainer, setWsClient, dropChatSessionContainer, refreshVisibleAvatars, setOlderHistoryState } from "../views/chatView.js";
 import { showSettingsModal, showErrorModal, showConfirmModal } from "../ui/modal.js";
 import { showToast } from "../ui/toast.js";
 import { appendDebugLog, setDebugPanelVisible } from "../ui/debugPanel.js";
@@ -100,11 +100,21 @@ export function createApp() {
 
     for (const session of state.sessions) {
       const cached = state.messageCache.get(session.id) || [];
+      const lastSeq = getLastSeq(cached);
+      // Older caches have no seq yet; fall back to the timestamp cursor once.
       const lastTs =
         cached.length > 0 ? Math.max(...cached.map((m) => m.timestamp)) : 0;
 
       try {
-        const messages = await api.fetchMessages(session.id, lastTs);
+        const messages = [];
+        let cursor = lastSeq > 0 ? { afterSeq: lastSeq } : { after: lastTs };
+        for (;;) {
+          const page = await api.fetchMessages(session.id, cursor);
+          messages.push(...page.messages);
+          const pageLastSeq = getLastSeq(page.messages);
+          if (!page.hasMore || pageLastSeq <= 0) break;
+          cursor = { afterSeq: pageLastSeq };
+        }
         if (messages.length > 0) {
           appendDebugLog({
             timestamp: Date.now() / 1000,
@@ -152,6 +162,17 @@ export function createApp() {
     return lastRead;
   }
 
+  /**
+   * @param {any[]} messages
+   */
+  function getLastSeq(messages) {
+    let lastSeq = 0;
+    for (const msg of messages) {
+      if (typeof msg.seq === "number" && msg.seq > lastSeq) lastSeq = msg.seq;
+    }
+    return lastSeq;
+  }
+
   function ensureSessionConnections() {
     const existingIds = new Set(wsClientsBySession.keys());
     const currentIds = new Set(state.sessions.map((s) => s.id));
@@ -165,7 +186,9 @@ export function createApp() {
 
     for (const session of state.sessions) {
       if (wsClientsBySession.has(session.id)) continue;
-      const client = new WsClient(session.id);
+      const client = new WsClient(session.id, () =>
+        getLastSeq(state.messageCache.get(session.id) || []),
+      );
       client.onMessage((event) => handleWsMessage(event, session.id));
       client.onOpen(() => {
         reconnectController.markConnected(session.id);
@@ -220,14 +243,24 @@ export function createApp() {
     switch (event.type) {
       case "history": {
         const messages = event.data.messages || [];
+        const direction = event.data.direction;
+        const isBackfill = direction === "backward";
         if (sourceSessionId) {
           upsertMessages(sourceSessionId, messages);
         }
         if (sourceSessionId) {
           ensureChatSessionContainer(sourceSessionId);
+          if (direction === "latest" || isBackfill) {
+            setOlderHistoryState(sourceSessionId, Boolean(event.data.has_more));
+          }
         }
         if (sourceSessionId === state.activeSessionId && !isChatViewHidden()) {
-          renderChatSession(sourceSessionId, { scrollOnEnter: true });
+          renderChatSession(
+            sourceSessionId,
+            isBackfill && messages.length > 0
+              ? { keepScrollAnchor: true }
+              : { scrollOnEnter: true },
+          );
         } else {
           renderSessionListView();
         }
@@ -336,6 +369,17 @@ export function createApp() {
         }
         break;
       }
+      case "reinit_required": {
+        // The server dropped this session's character state (e.g. idle eviction).
+        const client = sourceSessionId ? wsClientsBySession.get(sourceSessionId) : null;
+        if (client && isConfigValid(state.config)) {
+          client.initCharacter(state.config);
+          showToast("会话已重新连接，请重新发送上一条消息。", "info");
+        } else {
+          showToast("会话未初始化，请检查设置后重新发送消息。", "info");
+        }
+        break;
+      }
       default:
         break;
     }
@@ -11,6 +11,7 @@
  * @property {boolean} is_recalled
  * @property {boolean} is_read
  * @property {number} timestamp
+ * @property {number|null} [seq] per-session sequence number (null for typing/emotion state)
  */
 
 /**
@@ -3,9 +3,11 @@
 export class WsClient {
   /**
    * @param {string} sessionId
+   * @param {(() => number) | null} getHistoryCursor last cached seq; sent on connect so only the delta is streamed
    */
-  constructor(sessionId) {
+  constructor(sessionId, getHistoryCursor = null) {
     this.sessionId = sessionId;
+    this.getHistoryCursor = getHistoryCursor;
     this.ws = /** @type {WebSocket | null} */ (null);
     this.messageHandlers = [];
     this.openHandlers = [];
@@ -13,7 +15,9 @@ export class WsClient {
   }
 
   connect() {
-    const url = `${location.protocol === "https:" ? "wss" : "ws"}://${location.host}/api/ws/${this.sessionId}`;
+    const afterSeq = this.getHistoryCursor ? this.getHistoryCursor() : 0;
+    const query = afterSeq > 0 ? `?after_seq=${encodeURIComponent(afterSeq)}` : "";
+    const url = `${location.protocol === "https:" ? "wss" : "ws"}://${location.host}/api/ws/${this.sessionId}${query}`;
     this.ws = new WebSocket(url);
 
     this.ws.addEventListener("open", () => {
@@ -96,10 +100,23 @@ export class WsClient {
   }
 
   /**
-   * @param {number} afterTimestamp
+   * @param {{afterSeq?: number|null, beforeSeq?: number|null, limit?: number|null}} cursor
    */
-  syncMessages(afterTimestamp) {
-    this.send("sync_messages", { after_timestamp: afterTimestamp });
+  syncMessages(cursor = {}) {
+    this.send("sync_messages", {
+      after_seq: cursor.afterSeq ?? null,
+      before_seq: cursor.beforeSeq ?? null,
+      limit: cursor.limit ?? null,
+    });
+  }
+
+  /**
+   * Request the page of messages older than beforeSeq.
+   * @param {number} beforeSeq
+   * @param {number} [limit]
+   */
+  loadHistory(beforeSeq, limit) {
+    this.send("load_history", { before_seq: beforeSeq, limit: limit ?? null });
   }
 
   clearSession() {
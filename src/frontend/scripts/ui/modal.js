@@ -166,8 +166,12 @@ function getSettingsContent() {
           <option value="completions" ${
             protocol === "completions" ? "selected" : ""
           }>completions (/chat/completions)</option>
-          <option value="responses" disabled>responses (/responses) - 暂未实现</option>
-          <option value="messages" disabled>messages (/messages) - 暂未实现</option>
+          <option value="responses" ${
+            protocol === "responses" ? "selected" : ""
+          }>responses (/responses)</option>
+          <option value="messages" ${
+            protocol === "messages" ? "selected" : ""
+          }>messages (/messages)</option>
         </select>
       </div>
       <div class="form-group">
@@ -12,6 +12,9 @@ let wsClient = null;
 const typingStateBySession = new Map();
 /** @type {Map<string, HTMLElement>} */
 const messageContainersBySession = new Map();
+/** Sessions whose server history has older pages, and whether a backfill is in flight. */
+/** @type {Map<string, {hasMore: boolean, loading: boolean}>} */
+const olderHistoryBySession = new Map();
 let activeMessageContainer = /** @type {HTMLElement | null} */ (null);
 
 const DEFAULT_CHARACTER_AVATAR = "/static/images/avatar/default.webp";
@@ -35,6 +38,31 @@ export function setWsClient(client) {
   setupInputHandlers();
 }
 
+/**
+ * Record whether older history pages can still be requested with load_history.
+ * @param {string} sessionId
+ * @param {boolean} hasMore
+ */
+export function setOlderHistoryState(sessionId, hasMore) {
+  olderHistoryBySession.set(sessionId, { hasMore, loading: false });
+}
+
+function maybeLoadOlderHistory(sessionId, container) {
+  if (container.scrollTop > 40 || !wsClient) return;
+  const entry = olderHistoryBySession.get(sessionId);
+  if (!entry || !entry.hasMore || entry.loading) return;
+  const msgs = state.messageCache.get(sessionId) || [];
+  let oldestSeq = 0;
+  for (const m of msgs) {
+    if (typeof m.seq === "number" && (oldestSeq === 0 || m.seq < oldestSeq)) {
+      oldestSeq = m.seq;
+    }
+  }
+  if (oldestSeq <= 1) return;
+  entry.loading = true;
+  wsClient.loadHistory(oldestSeq);
+}
+
 export function refreshVisibleAvatars() {
   if (!activeMessageContainer) return;
   const sessionId = activeMessageContainer.dataset.sessionId || "";
@@ -137,7 +165,7 @@ export function showChatSession(sessionId, scrollToBottomOnEnter) {
 /**
  * Render (or re-render) a specific session's messages container.
  * @param {string} sessionId
- * @param {{scrollOnEnter?: boolean, forceScrollBehavior?: "instant" | "smooth"}} opts
+ * @param {{scrollOnEnter?: boolean, forceScrollBehavior?: "instant" | "smooth", keepScrollAnchor?: boolean}} opts
  */
 export function renderChatSession(sessionId, opts = {}) {
   const container = ensureChatSessionContainer(sessionId);
@@ -236,7 +264,11 @@ export function renderChatSession(sessionId, opts = {}) {
     setupScrollReadTracking(container);
     applyEmotionForSession(sessionId, latestEmotionMap);
 
-    if (opts.scrollOnEnter) {
+    if (opts.keepScrollAnchor) {
+      // Older messages were prepended: keep the same content in view.
+      container.scrollTop = container.scrollHeight - (prevScrollHeight - prevScrollTop);
+      requestAnimationFrame(() => handleScroll(container));
+    } else if (opts.scrollOnEnter) {
       scrollToBottom(container, { behavior: "instant" });
       markAllRead(sessionId);
       updateNewMessageIndicator(sessionId, container);
@@ -586,6 +618,8 @@ function handleScroll(container) {
   const sessionId = state.activeSessionId;
   if (!sessionId) return;
 
+  maybeLoadOlderHistory(sessionId, container);
+
   const visibleBottom = container.scrollTop + container.clientHeight;
   const messageNodes = Array.from(
     container.querySelectorAll(".message[data-timestamp]"),
@@ -1,24 +1,111 @@
+import queue
 import sqlite3
 import logging
+import threading
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Callable, Dict, Generator, List, Optional, TypeVar
+
+from src.core.configs import database_config
+from src.infrastructure.database.executor import DatabaseExecutor
+from src.infrastructure.database.sequence import SessionSequencer
+from src.infrastructure.database.write_buffer import WriteBehindBuffer
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Tables whose changes invalidate the client's full-sync cache (see /api/hash).
+VERSIONED_TABLES = ("app_config", "user_settings", "characters", "sessions")
+# PRAGMA user_version after every one-off data migration below has run:
+# 1 = message seq backfilled, 2 = typing/emotion rows moved to session_state
+SCHEMA_VERSION = 2
+
 
 class DatabaseConnection:
-    def __init__(self, db_path: str):
+    """
+    Process-wide SQLite connection pool.
+
+    One writer connection (serialized by a lock) and a fixed set of reader
+    connections are opened once and kept for the process lifetime. WAL mode
+    lets readers proceed while the writer commits, and all per-connection
+    PRAGMAs are applied a single time when the connection is opened.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        reader_pool_size: Optional[int] = None,
+        cache_size_kb: Optional[int] = None,
+        mmap_size: Optional[int] = None,
+        executor_workers: Optional[int] = None,
+    ):
         self.db_path = Path(db_path)
+        self.reader_pool_size = max(
+            1, reader_pool_size or database_config.reader_pool_size
+        )
+        self.cache_size_kb = cache_size_kb or database_config.cache_size_kb
+        self.mmap_size = (
+            mmap_size if mmap_size is not None else database_config.mmap_size
+        )
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections: List[sqlite3.Connection] = []
+        self._closed = False
+
         self._prepare_database_path()
+        self._writer = self._open_connection()
         self._ensure_schema()
+        for _ in range(self.reader_pool_size):
+            self._readers.put(self._open_connection())
+
+        # Blocking sqlite3 work is dispatched here so the event loop never waits on disk.
+        self.executor = DatabaseExecutor(
+            executor_workers or database_config.executor_workers
+        )
+        # Hot-path message writes from all sessions are grouped into shared transactions.
+        self.write_buffer = WriteBehindBuffer(
+            self,
+            flush_interval_ms=database_config.write_flush_interval_ms,
+            max_batch_size=database_config.write_batch_size,
+        )
+        # Per-session message seq counters (assigned before the insert is flushed).
+        self.sequencer = SessionSequencer()
+
+        logger.info(
+            f"Database pool ready at {self.db_path} "
+            f"(1 writer, {self.reader_pool_size} readers, WAL)"
+        )
 
     def _prepare_database_path(self):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 30000")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            # Negative cache_size is interpreted by SQLite as KiB.
+            conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        except Exception as e:
+            logger.warning(f"Failed to apply SQLite PRAGMAs: {e}")
+        self._connections.append(conn)
+        return conn
+
     def _ensure_schema(self):
         with self.transaction() as conn:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA user_version")
+            schema_version = cursor.fetchone()[0]
 
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS messages (
@@ -31,15 +118,29 @@ class DatabaseConnection:
                     is_recalled BOOLEAN DEFAULT FALSE,
                     is_read BOOLEAN DEFAULT FALSE,
                     timestamp REAL NOT NULL,
+                    seq INTEGER,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
 
+            if schema_version < 1:
+                self._migrate_message_seq(cursor)
+
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_session_timestamp
                 ON messages(session_id, timestamp)
             """)
 
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_session_seq
+                ON messages(session_id, seq)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_session_type_timestamp
+                ON messages(session_id, type, timestamp)
+            """)
+
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_sender
                 ON messages(sender_id)
@@ -134,6 +235,19 @@ class DatabaseConnection:
                 ON sessions(is_active)
             """)
 
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS session_state (
+                    session_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, key)
+                ) WITHOUT ROWID
+            """)
+
+            if schema_version < 2:
+                self._migrate_state_rows(cursor)
+
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS app_config (
                     key TEXT PRIMARY KEY,
@@ -150,36 +264,157 @@ class DatabaseConnection:
                 )
             """)
 
+            self._ensure_change_versions(cursor)
+
+            if schema_version < SCHEMA_VERSION:
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
             conn.commit()
 
+    def _ensure_change_versions(self, cursor: sqlite3.Cursor):
+        """
+        Per-table change counters bumped by triggers, so `/api/hash` is a
+        single read instead of hashing table contents. The `__epoch__` row is
+        random per database file, so a recreated database never reuses a
+        version string.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS change_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO change_versions (table_name, version)
+            VALUES ('__epoch__', abs(random()))
+        """)
+        for table in VERSIONED_TABLES:
+            cursor.execute(
+                "INSERT OR IGNORE INTO change_versions (table_name, version) VALUES (?, 0)",
+                (table,),
+            )
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE change_versions SET version = version + 1
+                        WHERE table_name = '{table}';
+                    END
+                """)
+
+    def _migrate_state_rows(self, cursor: sqlite3.Cursor):
+        """
+        Typing/emotion used to be stored as message rows; keep the latest
+        emotion per session as state and drop the dead rows.
+        """
+        cursor.execute("""
+            INSERT OR IGNORE INTO session_state (session_id, key, value, updated_at)
+            SELECT session_id, 'emotion', COALESCE(metadata, '{}'), MAX(timestamp)
+            FROM messages
+            WHERE type = 'system-emotion' AND is_recalled = FALSE
+            GROUP BY session_id
+        """)
+        cursor.execute("""
+            DELETE FROM messages
+            WHERE type IN ('system-typing', 'system-emotion')
+        """)
+
+    def _migrate_message_seq(self, cursor: sqlite3.Cursor):
+        """Add the per-session `seq` column to older databases and backfill it."""
+        cursor.execute("PRAGMA table_info(messages)")
+        columns = {row["name"] for row in cursor.fetchall()}
+        if "seq" not in columns:
+            cursor.execute("ALTER TABLE messages ADD COLUMN seq INTEGER")
+
+        cursor.execute("SELECT 1 FROM messages WHERE seq IS NULL LIMIT 1")
+        if cursor.fetchone() is None:
+            return
+
+        # Number unsequenced rows after any existing seq, in transcript order.
+        cursor.execute("""
+            CREATE TEMP TABLE seq_backfill (id TEXT PRIMARY KEY, seq INTEGER NOT NULL)
+        """)
+        cursor.execute("""
+            INSERT INTO seq_backfill (id, seq)
+            SELECT m.id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY m.session_id ORDER BY m.timestamp, m.rowid
+                   ) + COALESCE(s.max_seq, 0)
+            FROM messages m
+            LEFT JOIN (
+                SELECT session_id, MAX(seq) AS max_seq
+                FROM messages
+                GROUP BY session_id
+            ) s ON s.session_id = m.session_id
+            WHERE m.seq IS NULL
+        """)
+        cursor.execute("""
+            UPDATE messages
+            SET seq = (SELECT b.seq FROM seq_backfill b WHERE b.id = messages.id)
+            WHERE seq IS NULL
+        """)
+        cursor.execute("DROP TABLE seq_backfill")
+        logger.info("Backfilled message seq column")
+
     @contextmanager
     def transaction(self) -> Generator[sqlite3.Connection, None, None]:
-        conn = sqlite3.connect(str(self.db_path), timeout=30)
-        conn.row_factory = sqlite3.Row
-        try:
-            conn.execute("PRAGMA busy_timeout = 30000")
-            conn.execute("PRAGMA foreign_keys = ON")
-        except Exception:
-            pass
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        if self._closed or self._writer is None:
+            raise RuntimeError("Database connection pool is closed")
+        with self._writer_lock:
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        conn = sqlite3.connect(str(self.db_path), timeout=30)
-        conn.row_factory = sqlite3.Row
-        try:
-            conn.execute("PRAGMA busy_timeout = 30000")
-            conn.execute("PRAGMA foreign_keys = ON")
-        except Exception:
-            pass
+        if self._closed:
+            raise RuntimeError("Database connection pool is closed")
+        conn = self._readers.get(timeout=30)
         try:
             yield conn
         finally:
-            conn.close()
+            # Release any read snapshot left open by an unfinished cursor so
+            # the WAL can be checkpointed and the next borrower sees fresh data.
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a blocking callable (that uses this pool) on the DB executor."""
+        return await self.executor.run(fn, *args)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "readers": self.reader_pool_size,
+            "idle_readers": self._readers.qsize(),
+            "writer_busy": self._writer_lock.locked(),
+            "executor": self.executor.get_metrics(),
+            "write_buffer": self.write_buffer.get_metrics(),
+        }
+
+    async def aclose(self):
+        """Flush pending write-behind statements, then close the pool."""
+        if not self._closed:
+            await self.write_buffer.close()
+        self.close()
+
+    def close(self):
+        """Close every pooled connection. Safe to call multiple times."""
+        if self._closed:
+            return
+        self._closed = True
+        self.executor.shutdown(wait=True)
+        with self._writer_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.warning(f"Error closing SQLite connection: {e}")
+            self._connections.clear()
+            self._writer = None
+        logger.info("Database pool closed")
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DatabaseExecutor:
+    """
+    Dedicated thread pool for blocking sqlite3 work.
+
+    Repositories hand their query closures to `run()` so the asyncio event loop
+    never blocks on disk I/O. Queue depth (submitted but not yet started),
+    in-flight count and wait times are tracked for operators.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="rin-db"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._peak_queue_depth = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        with self._lock:
+            self._queued += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self._queued)
+
+        def _call() -> T:
+            wait = time.perf_counter() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return fn(*args)
+            except Exception:
+                with self._lock:
+                    self._failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        return await loop.run_in_executor(self._pool, _call)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            avg_wait = self._total_wait / self._completed if self._completed else 0.0
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "peak_queue_depth": self._peak_queue_depth,
+                "in_flight": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+        logger.info("Database executor stopped")
@@ -3,6 +3,7 @@ from src.infrastructure.database.repositories.message_repo import MessageReposit
 from src.infrastructure.database.repositories.character_repo import CharacterRepository
 from src.infrastructure.database.repositories.session_repo import SessionRepository
 from src.infrastructure.database.repositories.config_repo import ConfigRepository
+from src.infrastructure.database.repositories.session_state_repo import SessionStateRepository
 
 __all__ = [
     'BaseRepository',
@@ -10,4 +11,5 @@ __all__ = [
     'CharacterRepository',
     'SessionRepository',
     'ConfigRepository',
+    'SessionStateRepository',
 ]
@@ -8,6 +8,12 @@ class BaseRepository(ABC, Generic[T]):
     def __init__(self, connection_manager):
         self.conn_mgr = connection_manager
 
+    async def _await_pending_writes(self) -> None:
+        # Read-your-writes: statements still in the write-behind buffer must
+        # land before we read or issue a direct write that depends on them.
+        if self.conn_mgr.write_buffer.has_pending:
+            await self.conn_mgr.write_buffer.flush()
+
     @abstractmethod
     async def get_by_id(self, id: str) -> Optional[T]:
         pass
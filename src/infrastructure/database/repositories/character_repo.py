@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 class CharacterRepository(BaseRepository[Character], ICharacterRepository):
     async def get_by_id(self, id: str) -> Optional[Character]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM characters WHERE id = ?", (id,))
@@ -19,23 +19,29 @@ class CharacterRepository(BaseRepository[Character], ICharacterRepository):
                 if row:
                     return self._row_to_character(row)
                 return None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting character by id: {e}", exc_info=True)
             return None
 
     async def get_all(self) -> List[Character]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM characters ORDER BY created_at ASC")
                 rows = cursor.fetchall()
                 return [self._row_to_character(row) for row in rows]
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting all characters: {e}", exc_info=True)
             return []
 
     async def create(self, character: Character) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -91,12 +97,15 @@ class CharacterRepository(BaseRepository[Character], ICharacterRepository):
                     character.sticker_confidence_threshold_negative
                 ))
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error creating character: {e}", exc_info=True)
             return False
 
     async def update(self, character: Character) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -151,16 +160,22 @@ class CharacterRepository(BaseRepository[Character], ICharacterRepository):
                     character.id
                 ))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error updating character: {e}", exc_info=True)
             return False
 
     async def delete(self, id: str) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM characters WHERE id = ?", (id,))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error deleting character: {e}", exc_info=True)
             return False
@@ -1,6 +1,4 @@
 import logging
-import hashlib
-import json
 from typing import List, Optional, Dict
 from src.core.interfaces.repositories import IConfigRepository
 from src.infrastructure.database.repositories.base import BaseRepository
@@ -29,39 +27,48 @@ class ConfigRepository(BaseRepository[Dict], IConfigRepository):
         return await self.set_config(entity.get("key"), entity.get("value"))
 
     async def delete(self, id: str) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM app_config WHERE key = ?", (id,))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error deleting config: {e}", exc_info=True)
             return False
 
     async def get_config(self, key: str) -> Optional[str]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT value FROM app_config WHERE key = ?", (key,))
                 row = cursor.fetchone()
                 return row['value'] if row else None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting config: {e}", exc_info=True)
             return None
 
     async def get_all_config(self) -> Dict[str, str]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT key, value FROM app_config")
                 rows = cursor.fetchall()
                 return {row['key']: row['value'] for row in rows}
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting all config: {e}", exc_info=True)
             return {}
 
     async def set_config(self, key: str, value: str) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
@@ -75,12 +82,15 @@ class ConfigRepository(BaseRepository[Dict], IConfigRepository):
                     (key, value),
                 )
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error setting config: {e}", exc_info=True)
             return False
 
     async def set_config_batch(self, config: Dict[str, str]) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 for key, value in config.items():
@@ -95,23 +105,29 @@ class ConfigRepository(BaseRepository[Dict], IConfigRepository):
                         (key, value),
                     )
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error setting config batch: {e}", exc_info=True)
             return False
 
     async def get_user_avatar(self, user_id: str) -> Optional[str]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT avatar_data FROM user_settings WHERE user_id = ?", (user_id,))
                 row = cursor.fetchone()
                 return row['avatar_data'] if row else None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting user avatar: {e}", exc_info=True)
             return None
 
     async def set_user_avatar(self, avatar_data: str, user_id: str) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -122,12 +138,15 @@ class ConfigRepository(BaseRepository[Dict], IConfigRepository):
                         updated_at = CURRENT_TIMESTAMP
                 """, (user_id, avatar_data))
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error setting user avatar: {e}", exc_info=True)
             return False
 
     async def delete_user_avatar(self, user_id: str) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -136,19 +155,24 @@ class ConfigRepository(BaseRepository[Dict], IConfigRepository):
                     WHERE user_id = ?
                 """, (user_id,))
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error deleting user avatar: {e}", exc_info=True)
             return False
 
-    async def compute_hash(self, table: str) -> str:
-        try:
+    async def get_change_versions(self) -> Dict[str, int]:
+        """Trigger-maintained change counters per table (plus `__epoch__`)."""
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(f"SELECT * FROM {table} ORDER BY rowid")
+                cursor.execute("SELECT table_name, version FROM change_versions")
                 rows = cursor.fetchall()
+                return {row['table_name']: row['version'] for row in rows}
 
-                content = json.dumps([dict(row) for row in rows], sort_keys=True)
-                return hashlib.sha256(content.encode()).hexdigest()
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
-            logger.error(f"Error computing hash for table {table}: {e}", exc_info=True)
-            return ""
+            logger.error(f"Error getting change versions: {e}", exc_info=True)
+            return {}
@@ -1,6 +1,7 @@
+import asyncio
 import json
 import logging
-from typing import List, Optional
+from typing import Callable, List, Optional
 from src.core.models.message import Message, MessageType
 from src.core.interfaces.repositories import IMessageRepository
 from src.infrastructure.database.repositories.base import BaseRepository
@@ -10,7 +11,9 @@ logger = logging.getLogger(__name__)
 
 class MessageRepository(BaseRepository[Message], IMessageRepository):
     async def get_by_id(self, id: str) -> Optional[Message]:
-        try:
+        await self._await_pending_writes()
+
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM messages WHERE id = ?", (id,))
@@ -18,48 +21,76 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
                 if row:
                     return self._row_to_message(row)
                 return None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting message by id: {e}", exc_info=True)
             return None
 
     async def get_all(self) -> List[Message]:
-        try:
+        await self._await_pending_writes()
+
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM messages ORDER BY timestamp ASC")
                 rows = cursor.fetchall()
                 return [self._row_to_message(row) for row in rows]
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting all messages: {e}", exc_info=True)
             return []
 
-    async def create(self, message: Message) -> bool:
+    async def create(
+        self,
+        message: Message,
+        durable: bool = True,
+        on_failure: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Queue the insert on the shared write-behind buffer.
+        With durable=False the call returns once queued; the row is committed
+        with the next batch (reads on this repository flush first) and
+        `on_failure` runs if that commit fails.
+        The next per-session seq is assigned to `message.seq` before queueing.
+        """
         try:
-            with self.conn_mgr.transaction() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO messages (
-                        id, session_id, sender_id, type, content,
-                        metadata, is_recalled, is_read, timestamp
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    message.id,
-                    message.session_id,
-                    message.sender_id,
-                    message.type,
-                    message.content,
-                    json.dumps(message.metadata),
-                    message.is_recalled,
-                    message.is_read,
-                    message.timestamp
-                ))
+            message.seq = await self.conn_mgr.sequencer.next(
+                message.session_id, self._load_last_seq
+            )
+            future = self.conn_mgr.write_buffer.submit("""
+                INSERT INTO messages (
+                    id, session_id, sender_id, type, content,
+                    metadata, is_recalled, is_read, timestamp, seq
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                message.id,
+                message.session_id,
+                message.sender_id,
+                message.type,
+                message.content,
+                json.dumps(message.metadata),
+                message.is_recalled,
+                message.is_read,
+                message.timestamp,
+                message.seq
+            ))
+            if not durable:
+                self._watch_queued(future, f"insert of message {message.id}", on_failure)
                 return True
+            rowcount = await future
+            return rowcount is not None
         except Exception as e:
             logger.error(f"Error creating message: {e}", exc_info=True)
             return False
 
     async def update(self, message: Message) -> bool:
-        try:
+        await self._await_pending_writes()
+
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -73,16 +104,24 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
                     message.timestamp, message.id
                 ))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error updating message: {e}", exc_info=True)
             return False
 
     async def delete(self, id: str) -> bool:
-        try:
+        await self._await_pending_writes()
+
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM messages WHERE id = ?", (id,))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error deleting message: {e}", exc_info=True)
             return False
@@ -91,9 +130,21 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
         self,
         session_id: str,
         after_timestamp: Optional[float] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        from_end: bool = False,
     ) -> List[Message]:
-        try:
+        """
+        Messages of a session in seq order.
+
+        Keyset cursors: `after_seq` pages forward from a cursor; `before_seq`
+        (or `from_end` without a cursor) returns the newest `limit` messages
+        older than the cursor, still in ascending order, for scrolling back.
+        """
+        await self._await_pending_writes()
+
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
 
@@ -104,7 +155,16 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
                     query += " AND timestamp > ?"
                     params.append(after_timestamp)
 
-                query += " ORDER BY timestamp ASC"
+                if after_seq is not None:
+                    query += " AND seq > ?"
+                    params.append(after_seq)
+
+                if before_seq is not None:
+                    query += " AND seq < ?"
+                    params.append(before_seq)
+
+                backwards = after_seq is None and (before_seq is not None or from_end)
+                query += " ORDER BY seq DESC" if backwards else " ORDER BY seq ASC"
 
                 if limit is not None:
                     query += " LIMIT ?"
@@ -112,26 +172,145 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
 
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
+                if backwards:
+                    rows.reverse()
 
                 return [self._row_to_message(row) for row in rows]
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting messages by session: {e}", exc_info=True)
             return []
 
-    async def update_recalled_status(self, message_id: str, is_recalled: bool) -> bool:
+    async def get_last_message(self, session_id: str) -> Optional[Message]:
+        """Return the newest message of a session (index seek, no history scan)."""
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT * FROM messages
+                    WHERE session_id = ?
+                    ORDER BY seq DESC
+                    LIMIT 1
+                """, (session_id,))
+                row = cursor.fetchone()
+                return self._row_to_message(row) if row else None
+
         try:
-            with self.conn_mgr.transaction() as conn:
+            return await self.conn_mgr.run(_query)
+        except Exception as e:
+            logger.error(f"Error getting last message: {e}", exc_info=True)
+            return None
+
+    async def get_latest_by_type(
+        self, session_id: str, message_type: str
+    ) -> Optional[Message]:
+        """Return the newest message of a given type in a session."""
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    UPDATE messages
-                    SET is_recalled = ?
-                    WHERE id = ?
-                """, (is_recalled, message_id))
-                return cursor.rowcount > 0
+                    SELECT * FROM messages
+                    WHERE session_id = ? AND type = ?
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                """, (session_id, message_type))
+                row = cursor.fetchone()
+                return self._row_to_message(row) if row else None
+
+        try:
+            return await self.conn_mgr.run(_query)
+        except Exception as e:
+            logger.error(f"Error getting latest message by type: {e}", exc_info=True)
+            return None
+
+    async def exists_by_type(self, session_id: str, message_type: str) -> bool:
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT 1 FROM messages
+                    WHERE session_id = ? AND type = ?
+                    LIMIT 1
+                """, (session_id, message_type))
+                return cursor.fetchone() is not None
+
+        try:
+            return await self.conn_mgr.run(_query)
+        except Exception as e:
+            logger.error(f"Error checking message type existence: {e}", exc_info=True)
+            return False
+
+    async def update_recalled_status(
+        self,
+        message_id: str,
+        is_recalled: bool,
+        durable: bool = True,
+        on_failure: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        try:
+            future = self.conn_mgr.write_buffer.submit("""
+                UPDATE messages
+                SET is_recalled = ?
+                WHERE id = ?
+            """, (is_recalled, message_id))
+            if not durable:
+                self._watch_queued(
+                    future, f"recall update of message {message_id}", on_failure
+                )
+                return True
+            rowcount = await future
+            return bool(rowcount and rowcount > 0)
         except Exception as e:
             logger.error(f"Error updating recalled status: {e}", exc_info=True)
             return False
 
+    @staticmethod
+    def _watch_queued(
+        future: asyncio.Future,
+        description: str,
+        on_failure: Optional[Callable[[], None]],
+    ):
+        """Report a non-durable write whose batch failed (rowcount None)."""
+
+        def _done(done: asyncio.Future):
+            if not done.cancelled() and done.result() is not None:
+                return
+            logger.error(f"Queued {description} was not committed")
+            if on_failure is not None:
+                try:
+                    on_failure()
+                except Exception as e:
+                    logger.error(f"Write failure handler raised: {e}", exc_info=True)
+
+        future.add_done_callback(_done)
+
+    async def _load_last_seq(self, session_id: str) -> int:
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT MAX(seq) AS seq FROM messages WHERE session_id = ?",
+                    (session_id,),
+                )
+                row = cursor.fetchone()
+                return int(row["seq"]) if row and row["seq"] is not None else 0
+
+        return await self.conn_mgr.run(_query)
+
+    async def flush_pending_writes(self) -> None:
+        """Wait until every queued write-behind statement is committed."""
+        await self.conn_mgr.write_buffer.flush()
+
     async def update_read_status_until(
         self, session_id: str, until_timestamp: float, is_read: bool = True
     ) -> int:
@@ -139,7 +318,9 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
         Mark messages in a session as read/unread up to a timestamp.
         Returns number of affected rows.
         """
-        try:
+        await self._await_pending_writes()
+
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
@@ -153,13 +334,18 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
                     (is_read, session_id, until_timestamp),
                 )
                 return cursor.rowcount or 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error updating read status: {e}", exc_info=True)
             return 0
 
     async def get_last_read_timestamp(self, session_id: str) -> float:
         """Return latest timestamp among read messages in a session."""
-        try:
+        await self._await_pending_writes()
+
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
@@ -174,22 +360,34 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
                 )
                 row = cursor.fetchone()
                 return float(row["ts"]) if row and row["ts"] is not None else 0.0
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting last read timestamp: {e}", exc_info=True)
             return 0.0
 
     async def delete_by_session(self, session_id: str) -> bool:
-        try:
+        await self._await_pending_writes()
+
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
                 return True
+
+        try:
+            deleted = await self.conn_mgr.run(_execute)
+            self.conn_mgr.sequencer.reset(session_id)
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting messages by session: {e}", exc_info=True)
             return False
 
     async def delete_by_type(self, session_id: str, message_type: str) -> bool:
-        try:
+        await self._await_pending_writes()
+
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -197,6 +395,9 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
                     WHERE session_id = ? AND type = ?
                 """, (session_id, message_type))
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error deleting messages by type: {e}", exc_info=True)
             return False
@@ -212,5 +413,6 @@ class MessageRepository(BaseRepository[Message], IMessageRepository):
             metadata=metadata,
             is_recalled=bool(row['is_recalled']),
             is_read=bool(row['is_read']),
-            timestamp=row['timestamp']
+            timestamp=row['timestamp'],
+            seq=row['seq']
         )
@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 class SessionRepository(BaseRepository[Session], ISessionRepository):
     async def get_by_id(self, id: str) -> Optional[Session]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM sessions WHERE id = ?", (id,))
@@ -18,23 +18,29 @@ class SessionRepository(BaseRepository[Session], ISessionRepository):
                 if row:
                     return self._row_to_session(row)
                 return None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting session by id: {e}", exc_info=True)
             return None
 
     async def get_all(self) -> List[Session]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM sessions ORDER BY created_at ASC")
                 rows = cursor.fetchall()
                 return [self._row_to_session(row) for row in rows]
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting all sessions: {e}", exc_info=True)
             return []
 
     async def create(self, session: Session) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -42,12 +48,15 @@ class SessionRepository(BaseRepository[Session], ISessionRepository):
                     VALUES (?, ?, ?)
                 """, (session.id, session.character_id, session.is_active))
                 return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error creating session: {e}", exc_info=True)
             return False
 
     async def update(self, session: Session) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -56,22 +65,31 @@ class SessionRepository(BaseRepository[Session], ISessionRepository):
                     WHERE id = ?
                 """, (session.character_id, session.is_active, session.id))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error updating session: {e}", exc_info=True)
             return False
 
     async def delete(self, id: str) -> bool:
-        try:
+        await self._await_pending_writes()
+
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
+                cursor.execute("DELETE FROM session_state WHERE session_id = ?", (id,))
                 cursor.execute("DELETE FROM sessions WHERE id = ?", (id,))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error deleting session: {e}", exc_info=True)
             return False
 
     async def get_by_character(self, character_id: str) -> Optional[Session]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM sessions WHERE character_id = ?", (character_id,))
@@ -79,12 +97,15 @@ class SessionRepository(BaseRepository[Session], ISessionRepository):
                 if row:
                     return self._row_to_session(row)
                 return None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting session by character: {e}", exc_info=True)
             return None
 
     async def get_active_session(self) -> Optional[Session]:
-        try:
+        def _query():
             with self.conn_mgr.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM sessions WHERE is_active = TRUE LIMIT 1")
@@ -92,17 +113,23 @@ class SessionRepository(BaseRepository[Session], ISessionRepository):
                 if row:
                     return self._row_to_session(row)
                 return None
+
+        try:
+            return await self.conn_mgr.run(_query)
         except Exception as e:
             logger.error(f"Error getting active session: {e}", exc_info=True)
             return None
 
     async def set_active_session(self, session_id: str) -> bool:
-        try:
+        def _execute():
             with self.conn_mgr.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("UPDATE sessions SET is_active = FALSE")
                 cursor.execute("UPDATE sessions SET is_active = TRUE WHERE id = ?", (session_id,))
                 return cursor.rowcount > 0
+
+        try:
+            return await self.conn_mgr.run(_execute)
         except Exception as e:
             logger.error(f"Error setting active session: {e}", exc_info=True)
             return False
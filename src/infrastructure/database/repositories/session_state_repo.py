@@ -0,0 +1,143 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from src.core.interfaces.repositories import ISessionStateRepository
+from src.infrastructure.database.repositories.base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStateRepository(BaseRepository[Dict], ISessionStateRepository):
+    """
+    Current per-session state (typing per user, emotion) keyed by
+    (session_id, key). Each update is a single-row upsert instead of a new
+    message row.
+    """
+
+    async def get_by_id(self, id: str) -> Optional[Dict]:
+        states = await self.get_states(id)
+        return states or None
+
+    async def get_all(self) -> List[Dict]:
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM session_state")
+                rows = cursor.fetchall()
+                return [self._row_to_dict(row) for row in rows]
+
+        try:
+            return await self.conn_mgr.run(_query)
+        except Exception as e:
+            logger.error(f"Error getting all session state: {e}", exc_info=True)
+            return []
+
+    async def create(self, entity: Dict) -> bool:
+        return await self.set_state(
+            entity.get("session_id"),
+            entity.get("key"),
+            entity.get("value") or {},
+            entity.get("updated_at") or 0.0,
+        )
+
+    async def update(self, entity: Dict) -> bool:
+        return await self.create(entity)
+
+    async def delete(self, id: str) -> bool:
+        return await self.delete_by_session(id)
+
+    async def get_state(self, session_id: str, key: str) -> Optional[Dict[str, Any]]:
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT value FROM session_state WHERE session_id = ? AND key = ?",
+                    (session_id, key),
+                )
+                row = cursor.fetchone()
+                return json.loads(row["value"]) if row else None
+
+        try:
+            return await self.conn_mgr.run(_query)
+        except Exception as e:
+            logger.error(f"Error getting session state: {e}", exc_info=True)
+            return None
+
+    async def get_states(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        """Return {key: {"value": ..., "updated_at": ...}} for a session."""
+        await self._await_pending_writes()
+
+        def _query():
+            with self.conn_mgr.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT * FROM session_state WHERE session_id = ?",
+                    (session_id,),
+                )
+                rows = cursor.fetchall()
+                return {
+                    row["key"]: {
+                        "value": json.loads(row["value"]),
+                        "updated_at": row["updated_at"],
+                    }
+                    for row in rows
+                }
+
+        try:
+            return await self.conn_mgr.run(_query)
+        except Exception as e:
+            logger.error(f"Error getting session states: {e}", exc_info=True)
+            return {}
+
+    async def set_state(
+        self,
+        session_id: str,
+        key: str,
+        value: Dict[str, Any],
+        updated_at: float,
+        durable: bool = True,
+    ) -> bool:
+        try:
+            future = self.conn_mgr.write_buffer.submit("""
+                INSERT INTO session_state (session_id, key, value, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(session_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    updated_at = excluded.updated_at
+            """, (session_id, key, json.dumps(value), updated_at))
+            if not durable:
+                return True
+            rowcount = await future
+            return rowcount is not None
+        except Exception as e:
+            logger.error(f"Error setting session state: {e}", exc_info=True)
+            return False
+
+    async def delete_by_session(self, session_id: str) -> bool:
+        await self._await_pending_writes()
+
+        def _execute():
+            with self.conn_mgr.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "DELETE FROM session_state WHERE session_id = ?", (session_id,)
+                )
+                return True
+
+        try:
+            return await self.conn_mgr.run(_execute)
+        except Exception as e:
+            logger.error(f"Error deleting session state: {e}", exc_info=True)
+            return False
+
+    def _row_to_dict(self, row) -> Dict:
+        return {
+            "session_id": row["session_id"],
+            "key": row["key"],
+            "value": json.loads(row["value"]),
+            "updated_at": row["updated_at"],
+        }
@@ -0,0 +1,33 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class SessionSequencer:
+    """
+    Allocates monotonic per-session message sequence numbers.
+
+    The last assigned `seq` of each session is loaded from the database once
+    and then kept in memory, so a message knows its seq before its insert is
+    flushed by the write-behind buffer. All message inserts go through the
+    shared DatabaseConnection, which owns the single sequencer instance.
+    """
+
+    def __init__(self):
+        self._last: Dict[str, int] = {}
+        self._load_lock: Optional[asyncio.Lock] = None
+
+    async def next(
+        self, session_id: str, load_last: Callable[[str], Awaitable[int]]
+    ) -> int:
+        if session_id not in self._last:
+            if self._load_lock is None:
+                self._load_lock = asyncio.Lock()
+            async with self._load_lock:
+                if session_id not in self._last:
+                    self._last[session_id] = await load_last(session_id)
+        self._last[session_id] += 1
+        return self._last[session_id]
+
+    def reset(self, session_id: str):
+        """Forget a session's counter (e.g. after its messages were deleted)."""
+        self._last.pop(session_id, None)
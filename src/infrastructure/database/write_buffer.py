@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    sql: str
+    params: Sequence[Any]
+    future: asyncio.Future
+
+
+class WriteBehindBuffer:
+    """
+    Write-behind queue for small, hot-path write statements.
+
+    Statements submitted from any session are committed together in a single
+    writer transaction, either every `flush_interval_ms` or as soon as
+    `max_batch_size` statements are waiting. Each submit returns a future that
+    resolves to the statement's rowcount (or None if it failed) once the batch
+    is durable, so callers can choose whether to await durability.
+    """
+
+    def __init__(self, conn_mgr, flush_interval_ms: int, max_batch_size: int):
+        self.conn_mgr = conn_mgr
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._pending: List[_PendingWrite] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._in_flight = 0
+
+        self._batches = 0
+        self._rows = 0
+        self._largest_batch = 0
+        self._failed_rows = 0
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending) or self._in_flight > 0
+
+    def submit(self, sql: str, params: Sequence[Any]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingWrite(sql=sql, params=params, future=future))
+
+        if self._batch_full is None:
+            self._batch_full = asyncio.Event()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._delayed_flush())
+
+        return future
+
+    async def flush(self):
+        """Commit everything submitted so far (read-your-writes barrier)."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._pending:
+                await self._flush_once()
+
+    async def close(self):
+        await self.flush()
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "rows": self._rows,
+            "avg_batch_size": round(self._rows / self._batches, 2)
+            if self._batches
+            else 0.0,
+            "largest_batch": self._largest_batch,
+            "failed_rows": self._failed_rows,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "max_batch_size": self.max_batch_size,
+        }
+
+    async def _delayed_flush(self):
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._batch_full.clear()
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Write-behind flush failed: {e}", exc_info=True)
+
+    async def _flush_once(self):
+        batch = self._pending[: self.max_batch_size]
+        del self._pending[: len(batch)]
+        self._in_flight += len(batch)
+
+        def _execute_batch() -> List[int]:
+            with self.conn_mgr.transaction() as conn:
+                cursor = conn.cursor()
+                rowcounts = []
+                for item in batch:
+                    cursor.execute(item.sql, item.params)
+                    rowcounts.append(cursor.rowcount)
+                return rowcounts
+
+        def _execute_each() -> List[Optional[int]]:
+            # Isolate the failing statement so one bad row cannot drop the rest.
+            rowcounts: List[Optional[int]] = []
+            for item in batch:
+                try:
+                    with self.conn_mgr.transaction() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(item.sql, item.params)
+                        rowcounts.append(cursor.rowcount)
+                except Exception as e:
+                    logger.error(f"Write-behind statement failed: {e}", exc_info=True)
+                    rowcounts.append(None)
+            return rowcounts
+
+        try:
+            results: List[Optional[int]] = await self.conn_mgr.run(_execute_batch)
+        except Exception as e:
+            logger.warning(f"Write-behind batch failed, retrying row by row: {e}")
+            try:
+                results = await self.conn_mgr.run(_execute_each)
+            except Exception as e:
+                logger.error(f"Write-behind retry failed: {e}", exc_info=True)
+                results = [None] * len(batch)
+        finally:
+            self._in_flight -= len(batch)
+
+        self._batches += 1
+        self._rows += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        for item, rowcount in zip(batch, results):
+            if rowcount is None:
+                self._failed_rows += 1
+            if not item.future.done():
+                item.future.set_result(rowcount)
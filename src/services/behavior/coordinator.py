@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 import uuid
 import random
 
@@ -17,6 +17,9 @@ from src.services.behavior.sticker import StickerSelector
 from src.core.utils.logger import unified_logger, LogCategory
 from src.core.models.character import Character
 
+# SINGLE SOURCE OF TRUTH for max segments safety limit
+MAX_SEGMENTS = 20
+
 
 class BehaviorCoordinator:
     def __init__(self, character: Character):
@@ -44,8 +47,6 @@ class BehaviorCoordinator:
         total_segments = len(segments)
 
         # Safety check: prevent excessive segments (likely due to malformed input)
-        # SINGLE SOURCE OF TRUTH for max segments safety limit
-        MAX_SEGMENTS = 20
         if total_segments > MAX_SEGMENTS:
             unified_logger.error(
                 f"Excessive segments detected ({total_segments}), truncating to {MAX_SEGMENTS}. "
@@ -86,6 +87,84 @@ class BehaviorCoordinator:
         timeline = self.timeline_builder.build_timeline(actions)
         return timeline
 
+    # ------------------------------------------------------------------ #
+    # Streaming replies: segments are played while the LLM still generates
+    # ------------------------------------------------------------------ #
+    def stream_lead_in(self) -> List[PlaybackAction]:
+        """Hesitation, initial delay and typing indicator for a streamed reply."""
+        timeline = self.timeline_builder.build_lead_in()
+        current_time = sum(action.duration for action in timeline)
+        timeline.append(
+            PlaybackAction(
+                type="typing_start",
+                timestamp=current_time,
+                metadata={"reason": "stream_start"},
+            )
+        )
+        return timeline
+
+    def stream_segments(self, text: str, final: bool = False) -> List[str]:
+        """
+        Segments of a partial reply that can no longer change.
+        Until `final`, the last segment may still grow and is held back.
+        """
+        cleaned_input = text.strip()
+        if not cleaned_input:
+            return []
+        segments = self._segment_and_clean(cleaned_input)
+        if not final:
+            segments = segments[:-1]
+        return segments[:MAX_SEGMENTS]
+
+    def process_stream_segment(
+        self, segment_text: str, segment_index: int, emotion_map: dict | None = None
+    ) -> List[PlaybackAction]:
+        """Timeline for one streamed segment, paced after the previous one."""
+        normalized_emotion_map = EmotionFetcher.normalize_map(emotion_map)
+        emotion = self._fetch_emotion(segment_text, normalized_emotion_map)
+
+        actions: List[PlaybackAction] = []
+        if segment_index > 0:
+            actions.extend(self._segment_interval_actions(segment_index - 1, emotion))
+        actions.extend(
+            self._build_actions_for_segment(
+                segment_text=segment_text,
+                segment_index=segment_index,
+                total_segments=None,
+                emotion=emotion,
+                emotion_map=normalized_emotion_map,
+            )
+        )
+        return self.timeline_builder.build_timeline(actions, lead_in=False)
+
+    def finish_stream(
+        self, text: str, emotion_map: dict | None = None
+    ) -> List[PlaybackAction]:
+        """Trailing actions once the streamed reply is complete (sticker)."""
+        cleaned_input = text.strip()
+        if not cleaned_input:
+            return []
+
+        normalized_emotion_map = EmotionFetcher.normalize_map(emotion_map)
+        should_send, sticker_path, log_entry = StickerSelector.select_sticker(
+            cleaned_input,
+            self.character.sticker_packs,
+            normalized_emotion_map,
+            self.character.sticker_send_probability,
+            self.character.sticker_confidence_threshold_positive,
+            self.character.sticker_confidence_threshold_neutral,
+            self.character.sticker_confidence_threshold_negative,
+        )
+        if log_entry:
+            self.pending_log_entries.append(log_entry)
+        if not (should_send and sticker_path):
+            return []
+
+        # The segments were already played, so the sticker can only follow them.
+        return self.timeline_builder.build_timeline(
+            self._sticker_actions(sticker_path), lead_in=False
+        )
+
     def get_emotion(self, text: str, emotion_map: dict | None = None) -> EmotionState:
         normalized_map = EmotionFetcher.normalize_map(emotion_map)
         return self._fetch_emotion(text, normalized_map)
@@ -115,10 +194,11 @@ class BehaviorCoordinator:
         self,
         segment_text: str,
         segment_index: int,
-        total_segments: int,
+        total_segments: Optional[int],
         emotion: EmotionState,
         emotion_map: dict | None = None,
     ) -> List[PlaybackAction]:
+        """`total_segments` is None for streamed replies (pause added by the next segment)."""
         actions: List[PlaybackAction] = []
         base_metadata = {
             "segment_index": segment_index,
@@ -160,28 +240,34 @@ class BehaviorCoordinator:
                     )
                 )
 
-        if segment_index < total_segments - 1:
-            interval = PausePredictor.segment_interval(
-                emotion=emotion,
-                emotion_multipliers=EMOTION_PAUSE_MULTIPLIERS,
-                min_duration=self.character.pause_min_duration,
-                max_duration=self.character.pause_max_duration,
-            )
-            if interval > 0:
-                actions.append(
-                    PlaybackAction(
-                        type="pause",
-                        duration=interval,
-                        metadata={
-                            "reason": "segment_interval",
-                            "from_segment": segment_index,
-                            "emotion": emotion.value,
-                        },
-                    )
-                )
+        if total_segments is not None and segment_index < total_segments - 1:
+            actions.extend(self._segment_interval_actions(segment_index, emotion))
 
         return actions
 
+    def _segment_interval_actions(
+        self, from_segment: int, emotion: EmotionState
+    ) -> List[PlaybackAction]:
+        interval = PausePredictor.segment_interval(
+            emotion=emotion,
+            emotion_multipliers=EMOTION_PAUSE_MULTIPLIERS,
+            min_duration=self.character.pause_min_duration,
+            max_duration=self.character.pause_max_duration,
+        )
+        if interval <= 0:
+            return []
+        return [
+            PlaybackAction(
+                type="pause",
+                duration=interval,
+                metadata={
+                    "reason": "segment_interval",
+                    "from_segment": from_segment,
+                    "emotion": emotion.value,
+                },
+            )
+        ]
+
     def _build_recall_sequence(
         self,
         typo_action: PlaybackAction,
@@ -249,6 +335,13 @@ class BehaviorCoordinator:
         if insert_after:
             insert_idx += 1
 
+        new_actions = actions[:insert_idx]
+        new_actions.extend(self._sticker_actions(sticker_path))
+        new_actions.extend(actions[insert_idx:])
+
+        return new_actions
+
+    def _sticker_actions(self, sticker_path: str) -> List[PlaybackAction]:
         wait_duration = random.uniform(1.0, 5.0)
         wait_action = PlaybackAction(
             type="pause",
@@ -262,13 +355,7 @@ class BehaviorCoordinator:
             message_id=self._generate_message_id(),
             metadata={"is_sticker": True},
         )
-
-        new_actions = actions[:insert_idx]
-        new_actions.append(wait_action)
-        new_actions.append(sticker_action)
-        new_actions.extend(actions[insert_idx:])
-
-        return new_actions
+        return [wait_action, sticker_action]
 
     @staticmethod
     def _trim_trailing_punctuation(text: str) -> str:
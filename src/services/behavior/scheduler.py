@@ -0,0 +1,229 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.configs import session_config
+from src.core.models.behavior import PlaybackAction
+
+logger = logging.getLogger(__name__)
+
+ActionRunner = Callable[[PlaybackAction], Awaitable[None]]
+CompletionHook = Callable[[], Awaitable[None]]
+
+# Rebuild the heap once cancelled entries outnumber live ones by this much.
+_COMPACT_SLACK = 64
+
+
+class ScheduledTimeline:
+    """One reply's actions on the shared scheduler."""
+
+    __slots__ = ("session_id", "actions", "index", "start", "run_action", "on_complete", "done")
+
+    def __init__(
+        self,
+        session_id: str,
+        actions: List[PlaybackAction],
+        run_action: ActionRunner,
+        on_complete: Optional[CompletionHook],
+        start: float,
+        done: "asyncio.Future[None]",
+    ):
+        self.session_id = session_id
+        self.actions = actions
+        self.index = 0
+        self.start = start
+        self.run_action = run_action
+        self.on_complete = on_complete
+        self.done = done
+
+    @property
+    def active(self) -> bool:
+        return not self.done.done()
+
+    def due(self) -> float:
+        """Loop time of the next action (the start once all actions ran)."""
+        if self.index >= len(self.actions):
+            return self.start
+        return self.start + max(0.0, self.actions[self.index].timestamp or 0.0)
+
+    async def wait(self):
+        """
+        Wait for the last action and completion hook. Cancelling the waiter
+        cancels the timeline; a cancelled timeline raises CancelledError.
+        """
+        await self.done
+
+
+class TimelineScheduler:
+    """
+    Process-wide clock for behavior timelines.
+
+    Only the next action of each playing timeline is kept, in one min-heap
+    keyed by due time, and a single loop timer (`call_at`) is armed for the
+    earliest entry. When it fires, every entry due within `tick` is popped
+    and the batch runs in one task; a timeline keeps running inline while
+    its following actions are due too, then goes back on the heap. Cancel is
+    O(1): the entry is skipped when popped and the heap is rebuilt once stale
+    entries dominate. Finished timelines leave every index, so concurrent
+    replies cost one heap entry each instead of a sleeping task.
+    """
+
+    def __init__(self, tick: float):
+        self.tick = max(0.0, tick)
+        self._heap: List[Tuple[float, int, ScheduledTimeline]] = []
+        self._seq = itertools.count()
+        self._by_session: Dict[str, Set[ScheduledTimeline]] = {}
+        self._active = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = 0.0
+        self._batches: Set[asyncio.Task] = set()
+
+        self._scheduled = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._actions = 0
+        self._batch_count = 0
+        self._max_batch = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+
+    def schedule(
+        self,
+        session_id: str,
+        actions: List[PlaybackAction],
+        run_action: ActionRunner,
+        on_complete: Optional[CompletionHook] = None,
+    ) -> ScheduledTimeline:
+        """Start playing `actions` (timestamps relative to now)."""
+        loop = asyncio.get_running_loop()
+        timeline = ScheduledTimeline(
+            session_id, list(actions), run_action, on_complete, loop.time(), loop.create_future()
+        )
+        timeline.done.add_done_callback(lambda _f: self._discard(timeline))
+        self._by_session.setdefault(session_id, set()).add(timeline)
+        self._active += 1
+        self._scheduled += 1
+        self._push(timeline)
+        return timeline
+
+    def cancel(self, timeline: ScheduledTimeline) -> bool:
+        """Drop a timeline's remaining actions; an action already running finishes."""
+        if not timeline.active:
+            return False
+        timeline.done.cancel()
+        return True
+
+    def cancel_session(self, session_id: str) -> int:
+        timelines = list(self._by_session.get(session_id, ()))
+        return sum(self.cancel(timeline) for timeline in timelines)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active_timelines": self._active,
+            "sessions": len(self._by_session),
+            "heap_size": len(self._heap),
+            "running_batches": len(self._batches),
+            "scheduled": self._scheduled,
+            "completed": self._completed,
+            "cancelled": self._cancelled,
+            "actions": self._actions,
+            "batches": self._batch_count,
+            "max_batch_size": self._max_batch,
+            "avg_lag_ms": (
+                round(self._total_lag / self._actions * 1000, 3) if self._actions else 0.0
+            ),
+            "max_lag_ms": round(self._max_lag * 1000, 3),
+        }
+
+    def _discard(self, timeline: ScheduledTimeline):
+        sessions = self._by_session.get(timeline.session_id)
+        if sessions is None or timeline not in sessions:
+            return
+        sessions.discard(timeline)
+        if not sessions:
+            del self._by_session[timeline.session_id]
+        self._active -= 1
+        if timeline.done.cancelled():
+            self._cancelled += 1
+            if len(self._heap) > 2 * self._active + _COMPACT_SLACK:
+                self._heap = [entry for entry in self._heap if entry[2].active]
+                heapq.heapify(self._heap)
+                self._arm()
+        else:
+            self._completed += 1
+
+    def _push(self, timeline: ScheduledTimeline):
+        heapq.heappush(self._heap, (timeline.due(), next(self._seq), timeline))
+        self._arm()
+
+    def _arm(self):
+        """Point the loop timer at the earliest heap entry."""
+        if not self._heap:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            return
+        due = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_at <= due:
+                return
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_at(due, self._on_timer)
+        self._timer_at = due
+
+    def _on_timer(self):
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        horizon = loop.time() + self.tick
+        batch: List[ScheduledTimeline] = []
+        while self._heap and self._heap[0][0] <= horizon:
+            _, _, timeline = heapq.heappop(self._heap)
+            if timeline.active:
+                batch.append(timeline)
+        if batch:
+            self._batch_count += 1
+            self._max_batch = max(self._max_batch, len(batch))
+            task = loop.create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+        self._arm()
+
+    async def _dispatch(self, batch: List[ScheduledTimeline]):
+        await asyncio.gather(*(self._advance(timeline) for timeline in batch))
+
+    async def _advance(self, timeline: ScheduledTimeline):
+        """Run every action of `timeline` that is due, then requeue or finish it."""
+        loop = asyncio.get_running_loop()
+        while timeline.index < len(timeline.actions):
+            due = timeline.due()
+            now = loop.time()
+            if due > now + self.tick:
+                self._push(timeline)
+                return
+            lag = max(0.0, now - due)
+            self._total_lag += lag
+            self._max_lag = max(self._max_lag, lag)
+
+            action = timeline.actions[timeline.index]
+            timeline.index += 1
+            self._actions += 1
+            try:
+                await timeline.run_action(action)
+            except Exception as e:
+                logger.error(f"Error executing action {action.type}: {e}", exc_info=True)
+            if not timeline.active:
+                return  # Cancelled while the action ran
+
+        if timeline.on_complete is not None:
+            try:
+                await timeline.on_complete()
+            except Exception as e:
+                logger.error(f"Error completing timeline: {e}", exc_info=True)
+        if timeline.active:
+            timeline.done.set_result(None)
+
+
+# Process-wide scheduler shared by every SessionService.
+timeline_scheduler = TimelineScheduler(tick=session_config.timeline_tick_ms / 1000)
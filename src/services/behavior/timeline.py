@@ -8,27 +8,16 @@ class TimelineBuilder:
     def __init__(self, character: Character):
         self.character = character
 
-    def build_timeline(self, actions: List[PlaybackAction]) -> List[PlaybackAction]:
-        timeline = []
-        current_time = 0.0
-
-        hesitation_sequence = self._generate_hesitation_sequence()
-        for hesitation_action in hesitation_sequence:
-            hesitation_action.timestamp = current_time
-            timeline.append(hesitation_action)
-            current_time += hesitation_action.duration
-
-        initial_delay = self._sample_initial_delay()
-        if initial_delay > 0:
-            timeline.append(
-                PlaybackAction(
-                    type="wait",
-                    duration=initial_delay,
-                    timestamp=current_time,
-                    metadata={"reason": "initial_delay"},
-                )
-            )
-            current_time += initial_delay
+    def build_timeline(
+        self, actions: List[PlaybackAction], lead_in: bool = True
+    ) -> List[PlaybackAction]:
+        """
+        Schedule actions on a relative clock. `lead_in=False` skips the
+        hesitation and initial delay, for segments appended to a reply that
+        is already playing.
+        """
+        timeline = self.build_lead_in() if lead_in else []
+        current_time = sum(action.duration for action in timeline)
 
         typing_active = False
         for i, action in enumerate(actions):
@@ -132,6 +121,30 @@ class TimelineBuilder:
 
         return timeline
 
+    def build_lead_in(self) -> List[PlaybackAction]:
+        """Hesitation cycles and initial delay played before the first message."""
+        timeline = []
+        current_time = 0.0
+
+        hesitation_sequence = self._generate_hesitation_sequence()
+        for hesitation_action in hesitation_sequence:
+            hesitation_action.timestamp = current_time
+            timeline.append(hesitation_action)
+            current_time += hesitation_action.duration
+
+        initial_delay = self._sample_initial_delay()
+        if initial_delay > 0:
+            timeline.append(
+                PlaybackAction(
+                    type="wait",
+                    duration=initial_delay,
+                    timestamp=current_time,
+                    metadata={"reason": "initial_delay"},
+                )
+            )
+
+        return timeline
+
     def _generate_hesitation_sequence(self) -> List[PlaybackAction]:
         if random.random() > self.character.timeline_hesitation_probability:
             return []
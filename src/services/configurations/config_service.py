@@ -48,17 +48,24 @@ class ConfigService:
     async def delete_user_avatar(self, user_id: str) -> bool:
         return await self.config_repo.delete_user_avatar(user_id)
 
+    async def get_change_versions(self) -> Dict[str, int]:
+        return await self.config_repo.get_change_versions()
+
     async def compute_hash(self) -> str:
+        """
+        Combined version tag of config, avatars, characters and sessions.
+        Built from trigger-maintained counters, so it is an O(1) read.
+        """
         try:
-            app_hash = await self.config_repo.compute_hash("app_config")
-            user_hash = await self.config_repo.compute_hash("user_settings")
-            char_hash = await self.config_repo.compute_hash("characters")
-            session_hash = await self.config_repo.compute_hash("sessions")
-
-            combined = f"{app_hash}{user_hash}{char_hash}{session_hash}"
-            import hashlib
-
-            return hashlib.sha256(combined.encode()).hexdigest()
+            versions = await self.config_repo.get_change_versions()
+            if not versions:
+                return ""
+            epoch = versions.get("__epoch__", 0)
+            parts = [f"{epoch:x}"] + [
+                str(versions.get(table, 0))
+                for table in ("app_config", "user_settings", "characters", "sessions")
+            ]
+            return ".".join(parts)
         except Exception as e:
             logger.error(f"Error computing hash: {e}", exc_info=True)
             return ""
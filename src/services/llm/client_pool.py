@@ -0,0 +1,101 @@
+import logging
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.core.configs import llm_defaults
+
+logger = logging.getLogger(__name__)
+
+
+def provider_origin(base_url: str) -> str:
+    """scheme://host[:port] of a provider base URL ("" if it has no host)."""
+    parts = urlsplit((base_url or "").strip())
+    if not parts.netloc:
+        return ""
+    return f"{parts.scheme or 'https'}://{parts.netloc.lower()}"
+
+
+class LLMClientPool:
+    """
+    Process-wide registry of httpx.AsyncClient instances, one per provider
+    origin (scheme://host:port).
+
+    LLMService instances only borrow clients, so re-initializing a session
+    keeps warm keep-alive/TLS connections and hundreds of sessions share one
+    bounded connection pool per provider. Clients are closed once, in the
+    FastAPI lifespan shutdown.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        http2: bool = False,
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(0, max_keepalive_connections),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and self._http2_available()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._requests: Dict[str, int] = {}  # get() calls, i.e. LLM requests
+        self._created: Dict[str, int] = {}
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        key = provider_origin(base_url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, http2=self.http2
+            )
+            self._clients[key] = client
+            self._created[key] = self._created.get(key, 0) + 1
+            logger.info(f"Created shared LLM HTTP client for {key or '<default>'}")
+        self._requests[key] = self._requests.get(key, 0) + 1
+        return client
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for key, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing LLM HTTP client for {key}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "requests": dict(self._requests),
+            "created": dict(self._created),
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+        }
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("LLM_HTTP2 is enabled but 'h2' is not installed; using HTTP/1.1")
+            return False
+        return True
+
+
+# Process-wide pool shared by every LLMService instance.
+llm_client_pool = LLMClientPool(
+    timeout=llm_defaults.http_timeout,
+    connect_timeout=llm_defaults.http_connect_timeout,
+    max_connections=llm_defaults.http_max_connections,
+    max_keepalive_connections=llm_defaults.http_max_keepalive_connections,
+    keepalive_expiry=llm_defaults.http_keepalive_expiry,
+    http2=llm_defaults.http2,
+)
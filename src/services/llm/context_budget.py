@@ -0,0 +1,224 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Chat formats add a few framing tokens per message (role, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+OMITTED_HISTORY_HINT = "系统提示：更早的 {count} 条聊天记录已省略。"
+RECALL_NOTICE = "系统提示：上一条消息已被撤回。"
+
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯＀-￯]")
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+
+
+class TokenEstimator:
+    """Offline token estimate tuned for mixed Chinese/English chat text."""
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        cjk = len(_CJK_RE.findall(text))
+        rest = _CJK_RE.sub(" ", text)
+        tokens = cjk
+        for piece in _WORD_RE.findall(rest):
+            # BPE vocabularies split long latin words roughly every 4 chars.
+            tokens += max(1, (len(piece) + 3) // 4) if piece[0].isalnum() else 1
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        return sum(
+            self.count(m.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+            for m in messages
+        )
+
+
+class HFTokenEstimator(TokenEstimator):
+    """Exact counts from a local Hugging Face tokenizer (transformers)."""
+
+    def __init__(self, tokenizer):
+        self._tokenizer = tokenizer
+        self.name = getattr(tokenizer, "name_or_path", "hf")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._tokenizer.encode(text, add_special_tokens=False))
+
+
+_estimators: Dict[str, TokenEstimator] = {}
+
+
+def get_token_estimator(tokenizer: Optional[str] = None) -> TokenEstimator:
+    """
+    Return a shared estimator. `tokenizer` names a local Hugging Face tokenizer
+    (directory or cached model id); empty uses the built-in heuristic. Failing
+    to load falls back to the heuristic so a bad setting never blocks chat.
+    """
+    key = (tokenizer or "").strip()
+    if key in _estimators:
+        return _estimators[key]
+
+    estimator: TokenEstimator = TokenEstimator()
+    if key:
+        try:
+            from transformers import AutoTokenizer
+
+            estimator = HFTokenEstimator(
+                AutoTokenizer.from_pretrained(key, local_files_only=True)
+            )
+        except Exception as e:
+            logger.warning(f"Tokenizer '{key}' unavailable, using heuristic: {e}")
+
+    _estimators[key] = estimator
+    return estimator
+
+
+@dataclass
+class ContextWindow:
+    messages: List[Dict[str, str]]
+    token_count: int
+    budget: int
+    dropped: int = 0
+    estimator: str = "heuristic"
+    stable_tokens: Optional[int] = None
+
+    def to_log(self) -> Dict[str, object]:
+        log: Dict[str, object] = {
+            "tokens": self.token_count,
+            "budget": self.budget,
+            "dropped_messages": self.dropped,
+            "estimator": self.estimator,
+        }
+        if self.stable_tokens is not None:
+            log["stable_prefix_tokens"] = self.stable_tokens
+            log["stable_prefix_share"] = (
+                round(self.stable_tokens / self.token_count, 3) if self.token_count else 0.0
+            )
+        return log
+
+
+class ContextBudget:
+    """
+    Fit an OpenAI-style message list into a prompt token budget.
+
+    The leading system messages (system block, summary) and the trailing
+    system messages (current emotion state) are always kept, as are the
+    newest `min_recent` turns. Older turns are dropped oldest-first and
+    replaced with a single hint saying how many were omitted, so the same
+    input always yields the same window. A budget of 0 disables trimming but
+    still counts tokens.
+
+    With `drop_granularity` > 1 turns are dropped in multiples of that many,
+    so the omitted-count hint and the first kept turn (and with them the
+    prompt prefix) only change every few turns instead of on every request.
+    """
+
+    def __init__(
+        self,
+        estimator: TokenEstimator,
+        budget: int,
+        min_recent: int = 0,
+        drop_granularity: int = 1,
+    ):
+        self.estimator = estimator
+        self.budget = max(0, budget)
+        self.min_recent = max(0, min_recent)
+        self.drop_granularity = max(1, drop_granularity)
+
+    def fit(self, messages: List[Dict[str, str]]) -> ContextWindow:
+        costs = [
+            self.estimator.count(m.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+            for m in messages
+        ]
+        total = sum(costs)
+        if not self.budget or total <= self.budget:
+            return self._window(messages, total)
+
+        head = 0
+        while head < len(messages) and messages[head].get("role") == "system":
+            head += 1
+        tail_start = len(messages)
+        while tail_start > head and messages[tail_start - 1].get("role") == "system":
+            tail_start -= 1
+
+        body = list(range(head, tail_start))
+        protected = set(body[-self.min_recent :]) if self.min_recent else set()
+
+        hint_cost = (
+            self.estimator.count(OMITTED_HISTORY_HINT.format(count=len(body)))
+            + MESSAGE_OVERHEAD_TOKENS
+        )
+        dropped = 0
+        for idx in body:
+            if total + hint_cost <= self.budget or idx in protected:
+                break
+            total -= costs[idx]
+            dropped += 1
+
+        if dropped:
+            for idx in body[dropped:]:
+                if dropped % self.drop_granularity == 0 or idx in protected:
+                    break
+                total -= costs[idx]
+                dropped += 1
+
+        if not dropped:
+            return self._window(messages, total)
+
+        # A recall notice is meaningless without the message it refers to.
+        cut = head + dropped
+        while (
+            cut < tail_start
+            and cut not in protected
+            and messages[cut].get("content") == RECALL_NOTICE
+        ):
+            total -= costs[cut]
+            dropped += 1
+            cut += 1
+
+        hint = {"role": "system", "content": OMITTED_HISTORY_HINT.format(count=dropped)}
+        total += self.estimator.count(hint["content"]) + MESSAGE_OVERHEAD_TOKENS
+        window = messages[:head] + [hint] + messages[cut:]
+        return self._window(window, total, dropped)
+
+    def _window(
+        self, messages: List[Dict[str, str]], tokens: int, dropped: int = 0
+    ) -> ContextWindow:
+        return ContextWindow(
+            messages=messages,
+            token_count=tokens,
+            budget=self.budget,
+            dropped=dropped,
+            estimator=self.estimator.name,
+        )
+
+
+class PrefixTracker:
+    """
+    Measures how much of each prompt repeats the previous one verbatim.
+
+    Provider prefix caches (DeepSeek, OpenAI, Anthropic) only reuse an
+    identical leading run of the prompt, so the tokens of the leading
+    messages shared with the previous request estimate what can hit.
+    """
+
+    def __init__(self, estimator: TokenEstimator):
+        self.estimator = estimator
+        self._previous: List[int] = []
+
+    def observe(self, window: ContextWindow) -> int:
+        current = [hash((m.get("role"), m.get("content"))) for m in window.messages]
+        shared = 0
+        for before, now in zip(self._previous, current):
+            if before != now:
+                break
+            shared += 1
+        self._previous = current
+        window.stable_tokens = self.estimator.count_messages(window.messages[:shared])
+        return window.stable_tokens
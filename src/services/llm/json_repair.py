@@ -0,0 +1,297 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+
+    _fast_loads: Callable[[str], Any] = orjson.loads
+    _FAST_ERRORS: Tuple[type, ...] = (orjson.JSONDecodeError, ValueError, TypeError)
+except ImportError:
+    orjson = None
+    _fast_loads = json.loads
+    _FAST_ERRORS = (ValueError, TypeError)
+
+_FENCE_RE = re.compile(r"^```[A-Za-z0-9_-]*\s*\n?(.*?)\n?```\s*$", re.S)
+_NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d*)?")
+_BARE_WORD_RE = re.compile(r"[^\s,:{}\[\]\"']+")
+_STRING_STOP = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+_ESCAPES = {
+    '"': '"',
+    "'": "'",
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+_LITERALS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "True": True,
+    "False": False,
+    "None": None,
+}
+# After a closing quote one of these may follow (past whitespace).
+_CLOSERS = set(",:}]")
+# After "<quote>," the next token must start like a value or a key.
+_VALUE_STARTS = set("\"'{[-0123456789tfnTFN}]")
+
+
+@dataclass
+class RepairResult:
+    value: Any
+    repaired: bool = False  # Input was not strict JSON
+    truncated: bool = False  # Input ended inside a value
+    # Paths (keys / indexes from the root) of containers closed at the cut-off
+    closed: Tuple[Tuple[Any, ...], ...] = ()
+
+    def is_complete(self, *path: Any) -> bool:
+        """Whether the container at `path` was closed by the input itself."""
+        return path not in self.closed
+
+
+def repair_json(text: str) -> RepairResult:
+    """
+    Parse LLM JSON output in one tolerant pass.
+
+    Strict JSON (after stripping a Markdown code fence) goes through the
+    fast path (`orjson` when installed). Anything else is read from the
+    first "{" or "[" by a forgiving parser that accepts trailing commas,
+    single quotes, Python literals, raw newlines and unescaped quotes inside
+    strings, invalid escapes, and truncation (open strings and containers are
+    closed where the text stops, and listed in `closed`). `value` is None if
+    nothing parseable exists.
+    """
+    candidate = (text or "").strip()
+    fence = _FENCE_RE.match(candidate)
+    if fence:
+        candidate = fence.group(1).strip()
+    try:
+        return RepairResult(_fast_loads(candidate), repaired=fence is not None)
+    except _FAST_ERRORS:
+        pass
+
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i != -1]
+    if not starts:
+        return RepairResult(None, repaired=True)
+    parser = _TolerantParser(candidate, min(starts))
+    value = parser.parse_value()
+    return RepairResult(
+        value, repaired=True, truncated=parser.truncated, closed=tuple(parser.closed)
+    )
+
+
+class _TolerantParser:
+    def __init__(self, text: str, pos: int = 0):
+        self.text = text
+        self.pos = pos
+        self.length = len(text)
+        self.truncated = False
+        self.path: List[Any] = []
+        self.closed: List[Tuple[Any, ...]] = []
+
+    def parse_value(self) -> Any:
+        self._skip_ws()
+        if self.pos >= self.length:
+            self.truncated = True
+            return None
+        ch = self.text[self.pos]
+        if ch == "{":
+            return self._parse_object()
+        if ch == "[":
+            return self._parse_array()
+        if ch in _STRING_STOP:
+            return self._parse_string()
+        number = _NUMBER_RE.match(self.text, self.pos)
+        if number:
+            self.pos = number.end()
+            return self._to_number(number.group())
+        word = _BARE_WORD_RE.match(self.text, self.pos)
+        if word:
+            self.pos = word.end()
+            return _LITERALS.get(word.group(), word.group())
+        # Stray delimiter where a value belongs: consume it, yield nothing.
+        self.pos += 1
+        return None
+
+    def _parse_object(self) -> Dict[str, Any]:
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        while True:
+            self._skip_ws_and_commas()
+            if self.pos >= self.length:
+                return self._cut_off(result)
+            ch = self.text[self.pos]
+            if ch == "}":
+                self.pos += 1
+                return result
+            if ch == "]":
+                # Mismatched bracket: close the object, let the caller see "]".
+                return result
+            key = self._parse_key()
+            if key is None:
+                continue
+            self._skip_ws()
+            if self.pos < self.length and self.text[self.pos] == ":":
+                self.pos += 1
+            self._skip_ws()
+            if self.pos >= self.length:
+                return self._cut_off(result)
+            self.path.append(key)
+            result[key] = self.parse_value()
+            self.path.pop()
+
+    def _parse_array(self) -> List[Any]:
+        self.pos += 1
+        result: List[Any] = []
+        while True:
+            self._skip_ws_and_commas()
+            if self.pos >= self.length:
+                return self._cut_off(result)
+            ch = self.text[self.pos]
+            if ch == "]":
+                self.pos += 1
+                return result
+            if ch == "}":
+                return result
+            start = self.pos
+            self.path.append(len(result))
+            value = self.parse_value()
+            self.path.pop()
+            if self.pos == start:
+                self.pos += 1
+                continue
+            if value is not None or not self.truncated:
+                result.append(value)
+
+    def _cut_off(self, container: Any) -> Any:
+        """Close `container` where the input stopped."""
+        self.truncated = True
+        self.closed.append(tuple(self.path))
+        return container
+
+    def _parse_key(self) -> Optional[str]:
+        ch = self.text[self.pos]
+        if ch in _STRING_STOP:
+            return self._parse_string()
+        word = _BARE_WORD_RE.match(self.text, self.pos)
+        if word:
+            self.pos = word.end()
+            return word.group()
+        self.pos += 1  # Garbage where a key belongs
+        return None
+
+    def _parse_string(self) -> str:
+        quote = self.text[self.pos]
+        stop = _STRING_STOP[quote]
+        self.pos += 1
+        parts: List[str] = []
+        text = self.text
+        while True:
+            match = stop.search(text, self.pos)
+            if match is None:
+                parts.append(text[self.pos :])
+                self.pos = self.length
+                self.truncated = True
+                return "".join(parts)
+            index = match.start()
+            parts.append(text[self.pos : index])
+            if text[index] == "\\":
+                self.pos = index + 1
+                parts.append(self._parse_escape())
+                continue
+            self.pos = index + 1
+            if self._closes_string():
+                return "".join(parts)
+            parts.append(quote)  # Unescaped quote inside the string
+
+    def _parse_escape(self) -> str:
+        if self.pos >= self.length:
+            self.truncated = True
+            return ""
+        ch = self.text[self.pos]
+        self.pos += 1
+        if ch != "u":
+            return _ESCAPES.get(ch, ch)
+        digits = self.text[self.pos : self.pos + 4]
+        if len(digits) < 4:
+            self.pos = self.length
+            self.truncated = True
+            return ""
+        try:
+            code = int(digits, 16)
+        except ValueError:
+            return "u"
+        self.pos += 4
+        if 0xD800 <= code < 0xDC00 and self.length - self.pos < 6 and (
+            "\\u".startswith(self.text[self.pos : self.pos + 2])
+        ):
+            # Cut off before the low surrogate: drop the lone high half
+            self.pos = self.length
+            self.truncated = True
+            return ""
+        if 0xD800 <= code < 0xDC00 and self.text.startswith("\\u", self.pos):
+            try:
+                low = int(self.text[self.pos + 2 : self.pos + 6], 16)
+            except ValueError:
+                low = 0
+            if 0xDC00 <= low < 0xE000:
+                self.pos += 6
+                return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00))
+        return chr(code)
+
+    def _closes_string(self) -> bool:
+        """Whether the quote just consumed ends the string (vs. a stray quote)."""
+        index = self._next_non_ws(self.pos)
+        if index >= self.length:
+            return True
+        ch = self.text[index]
+        if ch in _STRING_STOP:
+            # Missing comma before the next key: `"x" "key": ...`
+            return self._is_key_at(index)
+        if ch not in _CLOSERS:
+            return False
+        if ch != ",":
+            return True
+        after = self._next_non_ws(index + 1)
+        return after >= self.length or self.text[after] in _VALUE_STARTS
+
+    def _is_key_at(self, index: int) -> bool:
+        """Whether a quoted run at `index` is followed by ":" (a key)."""
+        quote = self.text[index]
+        end = self.text.find(quote, index + 1)
+        if end == -1 or "\n" in self.text[index + 1 : end]:
+            return False
+        after = self._next_non_ws(end + 1)
+        return after < self.length and self.text[after] == ":"
+
+    def _next_non_ws(self, index: int) -> int:
+        while index < self.length and self.text[index].isspace():
+            index += 1
+        return index
+
+    def _skip_ws(self):
+        self.pos = self._next_non_ws(self.pos)
+
+    def _skip_ws_and_commas(self):
+        while self.pos < self.length and (
+            self.text[self.pos].isspace() or self.text[self.pos] == ","
+        ):
+            self.pos += 1
+
+    @staticmethod
+    def _to_number(raw: str) -> Any:
+        try:
+            return int(raw)
+        except ValueError:
+            pass
+        try:
+            return float(raw)
+        except ValueError:
+            # Truncated exponent or trailing dot, e.g. "1e" / "2."
+            return float(raw.rstrip("eE+-.") or 0)
@@ -1,13 +1,35 @@
 # LLM API client supporting protocol-based configuration with structured JSON output
+import asyncio
+import hashlib
 import json
 import logging
 import re
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 import httpx
 
+from src.core.configs import llm_defaults
 from src.core.schemas import ChatMessage, LLMConfig
+from src.services.llm.client_pool import llm_client_pool
+from src.services.llm.json_repair import repair_json
+from src.services.llm.response_cache import get_response_cache, response_cache_key
+from src.services.llm.context_budget import (
+    ContextBudget,
+    PrefixTracker,
+    get_token_estimator,
+)
+from src.services.llm.rate_limiter import get_provider_scheduler
+from src.services.llm.router import EndpointRouter, RoutedEndpoint
+from src.services.llm.resilience import (
+    default_retry_policy,
+    ProviderStreamError,
+    is_rate_limited,
+    parse_retry_after,
+)
+from src.services.llm.stream_parser import StreamingReplyParser
 from src.core.utils.logger import (
     unified_logger,
     broadcast_log_if_needed,
@@ -16,6 +38,20 @@ from src.core.utils.logger import (
 
 logger = logging.getLogger(__name__)
 
+PartialCallback = Callable[[StreamingReplyParser], Awaitable[None]]
+# (endpoint config, stream callback or None, per-attempt stats) -> raw content
+ProtocolRequest = Callable[
+    [LLMConfig, Optional[PartialCallback], Dict[str, Any]], Awaitable[str]
+]
+
+# The Messages API requires the first turn to come from the user.
+MESSAGES_OPENING_TURN = "（对话开始）"
+
+# A 4xx on a streamed request only means "no streaming" if the error names it.
+_STREAM_PARAM_RE = re.compile(r"\bstream\b", re.I)
+# Endpoint URL + model pairs that rejected `stream`; they get plain requests.
+_streaming_unsupported: Set[str] = set()
+
 
 SYSTEM_BEHAVIOR_PROMPT = """
 你正在扮演微信聊天里的真人对话者。严格遵守以下协议并只返回 JSON：
@@ -66,6 +102,10 @@ class LLMStructuredResponse:
     is_invalid_json: bool = False
     is_empty_content: bool = False
     tool_calls: List[Dict[str, Any]] = None
+    prompt_tokens: int = 0
+    was_repaired: bool = False  # Recovered from malformed/truncated JSON
+    # Output was cut off mid-object (only tool calls closed before it are kept)
+    truncated: bool = False
 
     def __post_init__(self):
         if self.tool_calls is None:
@@ -79,36 +119,54 @@ class LLMService:
     
     Supported protocols:
     - completions: OpenAI-compatible /chat/completions endpoint
-    - responses: /responses endpoint (not yet implemented)
-    - messages: /messages endpoint (not yet implemented)
+    - responses: OpenAI Responses API /responses endpoint
+    - messages: Anthropic Messages API /messages endpoint
     """
 
     def __init__(self, config: LLMConfig):
         self.config = config
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.context_budget = ContextBudget(
+            get_token_estimator(llm_defaults.context_tokenizer),
+            budget=llm_defaults.context_token_budget,
+            min_recent=llm_defaults.context_min_recent_messages,
+            drop_granularity=(
+                llm_defaults.context_drop_granularity
+                if llm_defaults.prompt_layout == "stable"
+                else 1
+            ),
+        )
+        self.prefix_tracker = PrefixTracker(self.context_budget.estimator)
+        self.retry_policy = default_retry_policy()
+        self.router = EndpointRouter.from_config(config)
 
-    async def chat(self, messages: List[ChatMessage]) -> LLMStructuredResponse:
+    async def chat(
+        self,
+        messages: List[ChatMessage],
+        on_partial: Optional[PartialCallback] = None,
+        session_id: Optional[str] = None,
+    ) -> LLMStructuredResponse:
+        """
+        Request a structured reply. With `on_partial` and LLM_STREAM enabled the
+        completion is streamed and the callback receives the incremental parser
+        after every chunk; the returned response is still parsed from the full text.
+        `session_id` is used for fair queuing in the provider scheduler.
+        """
         try:
-            # Validate configuration
-            if not self.config.api_key or self.config.api_key == "DUMMY_API_KEY":
-                raise ValueError("LLM api_key not configured")
-            
-            if not self.config.base_url:
-                raise ValueError("LLM base_url not configured")
-            
-            if not self.config.model:
-                raise ValueError("LLM model not configured")
+            self._validate_config()
 
             protocol = self.config.protocol or "completions"
             
-            # Build messages for logging
-            openai_style_messages = self._build_openai_messages(messages)
+            # Build the budgeted prompt once; it is both logged and sent
+            window = self.context_budget.fit(self._build_openai_messages(messages))
+            openai_style_messages = window.messages
+            self.prefix_tracker.observe(window)
             
             payload_for_log: Dict[str, Any] = {
                 "protocol": protocol,
                 "model": self.config.model,
                 "base_url": self.config.base_url,
                 "max_tokens": self.config.max_tokens,
+                "context": window.to_log(),
             }
             
             if self.config.temperature is not None:
@@ -119,6 +177,7 @@ class LLMService:
                 provider=protocol,
                 model=self.config.model,
                 messages=openai_style_messages,
+                token_count=window.token_count,
             )
             await broadcast_log_if_needed(log_entry)
             log_entry = unified_logger.info(
@@ -129,14 +188,47 @@ class LLMService:
             await broadcast_log_if_needed(log_entry)
 
             # Dispatch to appropriate protocol handler
-            if protocol == "completions":
-                raw = await self._completions_chat(messages)
-            elif protocol == "responses":
-                raise ValueError("Protocol 'responses' is not yet implemented")
-            elif protocol == "messages":
-                raise ValueError("Protocol 'messages' is not yet implemented")
+            stream_stats: Dict[str, Any] = {}
+            handler, stream_handler = self._protocol_handlers(protocol)
+
+            async def request(endpoint, endpoint_partial, attempt_stats):
+                if endpoint_partial:
+                    return await stream_handler(
+                        endpoint, openai_style_messages, endpoint_partial, attempt_stats
+                    )
+                return await handler(endpoint, openai_style_messages, stats=attempt_stats)
+
+            # Byte-identical prompts (retries, re-inits) may be served from cache
+            cache = get_response_cache()
+            cache_key = None
+            if cache is not None and cache.cacheable(self.config.temperature):
+                cache_key = response_cache_key(
+                    self.config.base_url or "",
+                    protocol,
+                    self.config.model,
+                    self.config.temperature,
+                    self.config.max_tokens,
+                    openai_style_messages,
+                )
+            cached = await cache.get(cache_key) if cache_key else None
+
+            if cached is not None:
+                raw, tier = cached
+                stream_stats["cache"] = tier
+                log_entry = unified_logger.info(
+                    "LLM response cache hit",
+                    category=LogCategory.LLM,
+                    metadata={"tier": tier, "key": cache_key[:16], "session_id": session_id},
+                )
+                await broadcast_log_if_needed(log_entry)
             else:
-                raise ValueError(f"Unsupported protocol: {protocol}")
+                raw = await self._send(
+                    request,
+                    session_id,
+                    window.token_count + self.config.max_tokens,
+                    stream_stats,
+                    on_partial=on_partial if llm_defaults.stream else None,
+                )
 
             # Log full raw response for debugging (may be large).
             log_entry = unified_logger.info(
@@ -146,14 +238,18 @@ class LLMService:
                     "protocol": protocol,
                     "model": self.config.model,
                     "raw_text": raw,
+                    **stream_stats,
                 },
             )
             await broadcast_log_if_needed(log_entry)
 
-            parsed, is_invalid_json = self._parse_structured_response(raw)
+            parsed, is_invalid_json, was_repaired, truncated = (
+                self._parse_structured_response(raw)
+            )
             normalized_emotion = self._normalize_emotion_map(parsed)
             
-            reply = parsed.get("reply", "").strip()
+            reply = parsed.get("reply") or ""
+            reply = (reply if isinstance(reply, str) else str(reply)).strip()
             is_empty_content = not reply
             
             # Extract tool_calls from parsed response
@@ -168,8 +264,26 @@ class LLMService:
                 is_invalid_json=is_invalid_json,
                 is_empty_content=is_empty_content,
                 tool_calls=tool_calls,
+                prompt_tokens=window.token_count,
+                was_repaired=was_repaired,
+                truncated=truncated,
             )
 
+            # Keys name the session's own endpoint; replies a fallback served are not stored
+            served_by_primary = (
+                stream_stats.get("endpoint", self.router.endpoints[0].key)
+                == self.router.endpoints[0].key
+            )
+            if (
+                cache_key
+                and cached is None
+                and served_by_primary
+                and not is_invalid_json
+                and not is_empty_content
+                and not truncated
+            ):
+                await cache.put(cache_key, raw)
+
             # Log LLM response
             log_entry = unified_logger.llm_response(
                 provider=protocol,
@@ -190,42 +304,678 @@ class LLMService:
             logger.error(f"Error in LLM chat: {e}", exc_info=True)
             raise
 
+    async def complete_text(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: Optional[int] = None,
+        session_id: Optional[str] = None,
+    ) -> str:
+        """
+        Plain-text completion for background tasks (e.g. summarization).
+        No behavior system block, JSON mode or context budget is applied.
+        """
+        self._validate_config()
+        handler, _ = self._protocol_handlers(self.config.protocol or "completions")
+
+        estimator = self.context_budget.estimator
+        tokens = sum(estimator.count(m.content) for m in messages)
+        openai_style_messages = [{"role": m.role, "content": m.content} for m in messages]
+
+        async def request(endpoint, _endpoint_partial, _attempt_stats):
+            return await handler(
+                endpoint, openai_style_messages, json_mode=False, max_tokens=max_tokens
+            )
+
+        raw = await self._send(
+            request,
+            session_id,
+            tokens + (max_tokens or self.config.max_tokens),
+        )
+        return (raw or "").strip()
+
     # ------------------------------------------------------------------ #
     # Protocol handlers
     # ------------------------------------------------------------------ #
-    async def _completions_chat(self, messages: List[ChatMessage]) -> str:
+    def _protocol_handlers(
+        self, protocol: str
+    ) -> Tuple[Callable[..., Awaitable[str]], Callable[..., Awaitable[str]]]:
+        """(request, streaming request) handlers for a protocol."""
+        handlers = {
+            "completions": (self._completions_chat, self._completions_chat_stream),
+            "responses": (self._responses_chat, self._responses_chat_stream),
+            "messages": (self._messages_chat, self._messages_chat_stream),
+        }
+        if protocol not in handlers:
+            raise ValueError(f"Unsupported protocol: {protocol}")
+        return handlers[protocol]
+
+    async def _completions_chat(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        json_mode: bool = True,
+        max_tokens: Optional[int] = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> str:
         """
         Handle /chat/completions protocol (OpenAI-compatible).
         This is the most common protocol used by most LLM providers.
+        `messages` is the already budgeted OpenAI-style list; `endpoint` is
+        the routed config (base_url, api_key, model) for this attempt.
         """
-        base_url = self.config.base_url.rstrip("/")
-        
+        data = await self._post_json(
+            endpoint,
+            "/chat/completions",
+            self._completions_payload(endpoint, messages, json_mode, max_tokens),
+        )
+        self._record_usage(stats, data.get("usage"))
+        return data["choices"][0]["message"]["content"]
+
+    async def _completions_chat_stream(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        on_partial: PartialCallback,
+        stats: Dict[str, Any],
+    ) -> str:
+        """Streamed /chat/completions (SSE `choices[0].delta.content`)."""
+        payload = self._completions_payload(endpoint, messages, True, None)
+        payload["stream"] = True
+        return await self._stream_sse(
+            endpoint,
+            "/chat/completions",
+            payload,
+            self._completions_delta,
+            on_partial,
+            stats,
+            fallback=lambda: self._completions_chat(endpoint, messages, stats=stats),
+        )
+
+    async def _responses_chat(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        json_mode: bool = True,
+        max_tokens: Optional[int] = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Handle /responses protocol (OpenAI Responses API). The chat list is
+        sent as `input`; `prompt_cache_key` keeps requests that share the
+        system prefix on the same prompt cache.
+        """
+        data = await self._post_json(
+            endpoint,
+            "/responses",
+            self._responses_payload(endpoint, messages, json_mode, max_tokens),
+        )
+        self._record_usage(stats, data.get("usage"))
+        if isinstance(data.get("output_text"), str):
+            return data["output_text"]
+        return "".join(
+            part.get("text", "")
+            for item in data.get("output") or []
+            if item.get("type") == "message"
+            for part in item.get("content") or []
+            if part.get("type") == "output_text"
+        )
+
+    async def _responses_chat_stream(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        on_partial: PartialCallback,
+        stats: Dict[str, Any],
+    ) -> str:
+        """Streamed /responses (SSE `response.output_text.delta` events)."""
+        payload = self._responses_payload(endpoint, messages, True, None)
+        payload["stream"] = True
+        return await self._stream_sse(
+            endpoint,
+            "/responses",
+            payload,
+            self._responses_delta,
+            on_partial,
+            stats,
+            fallback=lambda: self._responses_chat(endpoint, messages, stats=stats),
+        )
+
+    async def _messages_chat(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        json_mode: bool = True,
+        max_tokens: Optional[int] = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Handle /messages protocol (Anthropic Messages API). There is no JSON
+        mode; the system block already demands a JSON object and the parser
+        tolerates surrounding text. `json_mode` is accepted for symmetry.
+        """
+        data = await self._post_json(
+            endpoint,
+            "/messages",
+            self._messages_payload(endpoint, messages, max_tokens),
+        )
+        self._record_usage(stats, data.get("usage"))
+        return "".join(
+            block.get("text", "")
+            for block in data.get("content") or []
+            if block.get("type") == "text"
+        )
+
+    async def _messages_chat_stream(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        on_partial: PartialCallback,
+        stats: Dict[str, Any],
+    ) -> str:
+        """Streamed /messages (SSE `content_block_delta` text deltas)."""
+        payload = self._messages_payload(endpoint, messages, None)
+        payload["stream"] = True
+        return await self._stream_sse(
+            endpoint,
+            "/messages",
+            payload,
+            self._messages_delta,
+            on_partial,
+            stats,
+            fallback=lambda: self._messages_chat(endpoint, messages, stats=stats),
+        )
+
+    # ------------------------------------------------------------------ #
+    # Wire formats
+    # ------------------------------------------------------------------ #
+    def _completions_payload(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        json_mode: bool,
+        max_tokens: Optional[int],
+    ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
-            "model": self.config.model,
-            "messages": self._build_openai_messages(messages),
-            "max_tokens": self.config.max_tokens,
-            "response_format": {"type": "json_object"},
+            "model": endpoint.model,
+            "messages": messages,
+            "max_tokens": max_tokens or endpoint.max_tokens,
         }
-        
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
         # Only include temperature if it's set (not None)
-        if self.config.temperature is not None:
-            payload["temperature"] = self.config.temperature
+        if endpoint.temperature is not None:
+            payload["temperature"] = endpoint.temperature
+        return payload
 
-        response = await self.client.post(
-            f"{base_url}/chat/completions",
-            json=payload,
-            headers={
-                "Authorization": f"Bearer {self.config.api_key}",
+    def _responses_payload(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        json_mode: bool,
+        max_tokens: Optional[int],
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": endpoint.model,
+            "input": messages,
+            "max_output_tokens": max_tokens or endpoint.max_tokens,
+            "store": False,
+        }
+        if json_mode:
+            payload["text"] = {"format": {"type": "json_object"}}
+        if endpoint.temperature is not None:
+            payload["temperature"] = endpoint.temperature
+        if llm_defaults.prompt_cache and messages:
+            payload["prompt_cache_key"] = self._prompt_cache_key(messages)
+        return payload
+
+    def _messages_payload(
+        self,
+        endpoint: LLMConfig,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+    ) -> Dict[str, Any]:
+        """
+        Leading system messages become `system`; later system notices are
+        sent as user text, since the Messages API only has user/assistant
+        turns. Same-role neighbours are merged into one turn. With
+        LLM_PROMPT_CACHE, cache breakpoints go on the system block and on the
+        last message before the trailing system state (emotion), which is
+        rebuilt every request; the next request then reads everything up to
+        that point from the provider's cache.
+        """
+        stable_end = len(messages) - 1
+        while stable_end > 0 and messages[stable_end]["role"] == "system":
+            stable_end -= 1
+
+        system_parts: List[str] = []
+        turns: List[Dict[str, Any]] = []
+        breakpoint_block: Optional[Dict[str, Any]] = None
+        for index, message in enumerate(messages):
+            role, content = message["role"], message["content"]
+            if not content:
+                continue
+            if role == "system":
+                if not turns:
+                    system_parts.append(content)
+                    continue
+                role = "user"
+            block = {"type": "text", "text": content}
+            if index <= stable_end:
+                breakpoint_block = block
+            if turns and turns[-1]["role"] == role:
+                turns[-1]["content"].append(block)
+            else:
+                turns.append({"role": role, "content": [block]})
+        if not turns or turns[0]["role"] != "user":
+            turns.insert(
+                0, {"role": "user", "content": [{"type": "text", "text": MESSAGES_OPENING_TURN}]}
+            )
+
+        payload: Dict[str, Any] = {
+            "model": endpoint.model,
+            "messages": turns,
+            "max_tokens": max_tokens or endpoint.max_tokens,
+        }
+        if system_parts:
+            payload["system"] = [{"type": "text", "text": "\n\n".join(system_parts)}]
+        if endpoint.temperature is not None:
+            # The Messages API accepts 0..1
+            payload["temperature"] = min(1.0, endpoint.temperature)
+        if llm_defaults.prompt_cache:
+            if system_parts:
+                payload["system"][-1]["cache_control"] = {"type": "ephemeral"}
+            (breakpoint_block or turns[-1]["content"][-1])["cache_control"] = {
+                "type": "ephemeral"
+            }
+        return payload
+
+    def _headers(self, endpoint: LLMConfig) -> Dict[str, str]:
+        if (endpoint.protocol or "completions") == "messages":
+            return {
+                "x-api-key": endpoint.api_key or "",
+                "anthropic-version": llm_defaults.messages_api_version,
                 "Content-Type": "application/json",
-            },
+            }
+        return {
+            "Authorization": f"Bearer {endpoint.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    async def _post_json(
+        self, endpoint: LLMConfig, path: str, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        base_url = endpoint.base_url.rstrip("/")
+        response = await self._client(endpoint).post(
+            f"{base_url}{path}", json=payload, headers=self._headers(endpoint)
         )
         response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+        return response.json()
+
+    async def _stream_sse(
+        self,
+        endpoint: LLMConfig,
+        path: str,
+        payload: Dict[str, Any],
+        extract_delta: Callable[[Dict[str, Any], Dict[str, Any]], Optional[str]],
+        on_partial: PartialCallback,
+        stats: Dict[str, Any],
+        fallback: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        POST `payload` and read the SSE response. `extract_delta` maps each
+        event to its text delta (recording usage into `stats` on the way);
+        deltas are fed to a StreamingReplyParser and `on_partial` runs
+        whenever the reply or a top-level field advances. Returns the full
+        content, like the non-streaming handlers. An endpoint whose 4xx
+        error names the `stream` parameter is remembered and served by
+        `fallback` from then on; other 4xx errors are raised as usual.
+        """
+        base_url = endpoint.base_url.rstrip("/")
+        stream_key = f"{base_url}{path}|{endpoint.model or ''}"
+        if stream_key in _streaming_unsupported:
+            return await fallback()
+        parser = StreamingReplyParser(normalize_emotion=self._normalize_emotion_map)
+        chunks: List[str] = []
+        started_at = time.perf_counter()
+
+        async with self._client(endpoint).stream(
+            "POST",
+            f"{base_url}{path}",
+            json=payload,
+            headers=self._headers(endpoint),
+        ) as response:
+            if response.status_code in (400, 404, 422):
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                if _STREAM_PARAM_RE.search(body):
+                    _streaming_unsupported.add(stream_key)
+                    logger.warning(
+                        f"Streaming rejected by {base_url}{path} ({response.status_code}), "
+                        f"using non-streaming requests for model {endpoint.model}"
+                    )
+                    return await fallback()
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                delta = extract_delta(event, stats)
+                if not delta:
+                    continue
+
+                if not chunks:
+                    stats["first_token_ms"] = round(
+                        (time.perf_counter() - started_at) * 1000, 1
+                    )
+                chunks.append(delta)
+                if parser.feed(delta):
+                    try:
+                        await on_partial(parser)
+                    except Exception as e:
+                        logger.warning(f"Stream consumer failed: {e}", exc_info=True)
+
+        stats["streamed"] = True
+        stats["stream_chunks"] = len(chunks)
+        stats["total_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+        return "".join(chunks)
+
+    @classmethod
+    def _completions_delta(cls, event: Dict[str, Any], stats: Dict[str, Any]) -> Optional[str]:
+        cls._record_usage(stats, event.get("usage"))
+        choices = event.get("choices") or []
+        if not choices:
+            return None
+        return (choices[0].get("delta") or {}).get("content")
+
+    @classmethod
+    def _responses_delta(cls, event: Dict[str, Any], stats: Dict[str, Any]) -> Optional[str]:
+        event_type = event.get("type")
+        if event_type == "response.output_text.delta":
+            return event.get("delta")
+        if event_type == "response.completed":
+            cls._record_usage(stats, (event.get("response") or {}).get("usage"))
+        elif event_type in ("response.failed", "error"):
+            error = event.get("error") or (event.get("response") or {}).get("error") or {}
+            raise ProviderStreamError(f"Responses stream failed: {error.get('message') or event_type}")
+        return None
+
+    @classmethod
+    def _messages_delta(cls, event: Dict[str, Any], stats: Dict[str, Any]) -> Optional[str]:
+        event_type = event.get("type")
+        if event_type == "content_block_delta":
+            delta = event.get("delta") or {}
+            return delta.get("text") if delta.get("type") == "text_delta" else None
+        if event_type == "message_start":
+            cls._record_usage(stats, (event.get("message") or {}).get("usage"))
+        elif event_type == "error":
+            error = event.get("error") or {}
+            raise ProviderStreamError(f"Messages stream failed: {error.get('message') or event_type}")
+        return None
+
+    @staticmethod
+    def _record_usage(stats: Optional[Dict[str, Any]], usage: Any):
+        """Keep provider usage and the prompt-cache hit count for logging."""
+        if stats is None or not isinstance(usage, dict):
+            return
+        stats["usage"] = usage
+        details = usage.get("prompt_tokens_details") or usage.get("input_tokens_details") or {}
+        cached = (
+            details.get("cached_tokens")
+            if isinstance(details, dict)
+            else None
+        )
+        if cached is None:
+            # DeepSeek (completions) / Anthropic (messages) field names
+            cached = usage.get("prompt_cache_hit_tokens", usage.get("cache_read_input_tokens"))
+        if cached is not None:
+            stats["cached_tokens"] = cached
+
+    @staticmethod
+    def _prompt_cache_key(messages: List[Dict[str, str]]) -> str:
+        """Stable key for requests sharing the leading (system) message."""
+        digest = hashlib.sha256(messages[0]["content"].encode("utf-8")).hexdigest()
+        return f"rin-{digest[:24]}"
 
     # ------------------------------------------------------------------ #
     # Helpers
     # ------------------------------------------------------------------ #
+    async def _send(
+        self,
+        request: ProtocolRequest,
+        session_id: Optional[str],
+        tokens: int,
+        stats: Optional[Dict[str, Any]] = None,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        """
+        Run one protocol request on the healthiest endpoint, retrying
+        429/5xx/transport errors. A retry fails over to the next ranked
+        endpoint at once, or backs off when the same endpoint is picked
+        again. A stream is not retried once it has fed `on_partial`, since
+        the reply may already be playing.
+        """
+        stats = stats if stats is not None else {}
+        attempt = 0
+        while True:
+            attempt += 1
+            ranked = self.router.ranked()
+            try:
+                raw = await self._race(request, ranked, session_id, tokens, stats, on_partial)
+            except Exception as e:
+                following = self.router.ranked()[0]
+                if (
+                    not self.retry_policy.is_retryable(e)
+                    or attempt >= self.retry_policy.max_attempts
+                    or "stream_endpoint" in stats
+                    or not following.breaker.allows_request
+                ):
+                    if attempt > 1:
+                        stats["attempts"] = attempt
+                    raise
+                delay = (
+                    0.0
+                    if following.key != ranked[0].key
+                    else self.retry_policy.delay(attempt, e)
+                )
+                log_entry = unified_logger.warning(
+                    f"LLM request failed, retrying in {delay:.2f}s: {e!r}",
+                    category=LogCategory.LLM,
+                    metadata={
+                        "session_id": session_id,
+                        "failed_endpoint": ranked[0].key,
+                        "next_endpoint": following.key,
+                        "attempt": attempt,
+                        "max_attempts": self.retry_policy.max_attempts,
+                        "delay_s": round(delay, 3),
+                    },
+                )
+                await broadcast_log_if_needed(log_entry)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                continue
+
+            if attempt > 1:
+                stats["attempts"] = attempt
+            return raw
+
+    async def _race(
+        self,
+        request: ProtocolRequest,
+        ranked: List[RoutedEndpoint],
+        session_id: Optional[str],
+        tokens: int,
+        stats: Dict[str, Any],
+        on_partial: Optional[PartialCallback],
+    ) -> str:
+        """
+        Send to `ranked[0]`; with hedging enabled and no answer by its p95
+        deadline, send a duplicate to the next available endpoint. The first
+        success wins and the other request is cancelled. For streams the race
+        is decided by the first partial update, so only one stream ever
+        reaches `on_partial`.
+        """
+        tasks: Dict[asyncio.Task, RoutedEndpoint] = {}
+        attempt_stats: Dict[asyncio.Task, Dict[str, Any]] = {}
+
+        def start(endpoint: RoutedEndpoint):
+            own_stats: Dict[str, Any] = {}
+            holder: List[asyncio.Task] = []
+            endpoint_partial = None
+            if on_partial is not None:
+
+                async def endpoint_partial(parser: StreamingReplyParser):
+                    if "stream_endpoint" not in stats:
+                        stats["stream_endpoint"] = endpoint.key
+                        for other in tasks:
+                            if other is not holder[0]:
+                                other.cancel()
+                    if stats["stream_endpoint"] == endpoint.key:
+                        await on_partial(parser)
+
+            task = asyncio.create_task(
+                self._attempt(
+                    request, endpoint, session_id, tokens, own_stats, endpoint_partial
+                )
+            )
+            holder.append(task)
+            tasks[task] = endpoint
+            attempt_stats[task] = own_stats
+
+        primary = ranked[0]
+        start(primary)
+        hedge = self.router.hedge_target(ranked)
+        error: BaseException = RuntimeError("LLM request was cancelled")
+        try:
+            if hedge is not None:
+                done, _ = await asyncio.wait(
+                    set(tasks), timeout=self.router.hedge_delay(primary)
+                )
+                # A stream that already reaches playback is not duplicated.
+                if not done and "stream_endpoint" not in stats:
+                    stats["hedged_to"] = hedge.key
+                    log_entry = unified_logger.info(
+                        "LLM request hedged",
+                        category=LogCategory.LLM,
+                        metadata={
+                            "session_id": session_id,
+                            "primary": primary.key,
+                            "hedge": hedge.key,
+                        },
+                    )
+                    await broadcast_log_if_needed(log_entry)
+                    start(hedge)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    exc = task.exception()
+                    if exc is not None:
+                        error = exc
+                        continue
+                    stats.update(attempt_stats[task])
+                    stats["endpoint"] = tasks[task].key
+                    return task.result()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _attempt(
+        self,
+        request: ProtocolRequest,
+        endpoint: RoutedEndpoint,
+        session_id: Optional[str],
+        tokens: int,
+        stats: Dict[str, Any],
+        on_partial: Optional[PartialCallback],
+    ) -> str:
+        """One request to one endpoint under its circuit breaker and scheduler."""
+        breaker = endpoint.breaker
+        health = self.router.health(endpoint)
+        breaker.check()
+        async with self._admission(endpoint.config, session_id, tokens, stats):
+            # Taken once admitted, so a queued request never holds the probe.
+            breaker.before_request()
+            started_at = time.perf_counter()
+            try:
+                raw = await request(endpoint.config, on_partial, stats)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                if is_rate_limited(e):
+                    breaker.release()
+                    health.record_failure()
+                elif self.retry_policy.is_retryable(e):
+                    breaker.record_failure()
+                    health.record_failure()
+                else:
+                    breaker.release()
+                raise
+
+        breaker.record_success()
+        # Streams are judged by time to first token, other requests end to end.
+        health.record_success(
+            stats.get("first_token_ms")
+            or round((time.perf_counter() - started_at) * 1000, 1)
+        )
+        return raw
+
+    @asynccontextmanager
+    async def _admission(
+        self,
+        endpoint: LLMConfig,
+        session_id: Optional[str],
+        tokens: int,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold a slot in the provider/model scheduler for one request.
+        A 429 pauses admission for the provider's Retry-After.
+        """
+        scheduler = get_provider_scheduler(endpoint.base_url or "", endpoint.model or "")
+        queued_at = time.perf_counter()
+        async with scheduler.slot(session_id, tokens):
+            if stats is not None:
+                stats["queue_wait_ms"] = round(
+                    (time.perf_counter() - queued_at) * 1000, 1
+                )
+            try:
+                yield
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429:
+                    scheduler.backoff(self._retry_after(e.response))
+                raise
+
+    @staticmethod
+    def _retry_after(response: httpx.Response, default: float = 1.0) -> float:
+        retry_after = parse_retry_after(response)
+        return default if retry_after is None else retry_after
+
+    def _validate_config(self):
+        if not self.config.api_key or self.config.api_key == "DUMMY_API_KEY":
+            raise ValueError("LLM api_key not configured")
+
+        if not self.config.base_url:
+            raise ValueError("LLM base_url not configured")
+
+        if not self.config.model:
+            raise ValueError("LLM model not configured")
+
     def _build_openai_messages(
         self, history: List[ChatMessage]
     ) -> List[Dict[str, str]]:
@@ -254,45 +1004,47 @@ class LLMService:
 
         return f"{SYSTEM_BEHAVIOR_PROMPT}{persona_section}{additional_context}"
 
-    def _parse_structured_response(self, raw_text: str) -> Tuple[Dict[str, Any], bool]:
+    def _parse_structured_response(
+        self, raw_text: str
+    ) -> Tuple[Dict[str, Any], bool, bool, bool]:
         """
-        Parse JSON returned by the LLM. Falls back to best-effort extraction.
-        Returns (parsed_dict, is_invalid_json)
+        Parse JSON returned by the LLM with the tolerant parser (code fences,
+        trailing commas, stray quotes, truncation). A recovered object,
+        even a partial one, is accepted; tool calls cut off by truncation
+        are dropped, since the repair may have closed them mid-arguments.
+        Returns (parsed_dict, is_invalid_json, was_repaired, truncated)
         """
-        # Try direct JSON parse
-        try:
-            return json.loads(raw_text), False
-        except Exception:
-            pass
-
-        # Best-effort: find JSON object inside text
-        start = raw_text.find("{")
-        end = raw_text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(raw_text[start : end + 1]), False
-            except Exception:
-                pass
-
-        # Emergency fallback: try to extract reply field value using regex
-        reply_match = re.search(r'"reply"\s*:\s*"([^"]*)"', raw_text)
-        if reply_match:
-            reply_text = reply_match.group(1)
-            logger.warning(
-                f"LLM JSON parse failed, extracted reply field: {reply_text[:100]}..."
-            )
-            return {"reply": reply_text, "emotion": {}}, True
+        result = repair_json(raw_text or "")
+        if isinstance(result.value, dict):
+            if result.repaired:
+                logger.warning(
+                    f"LLM JSON repaired (truncated={result.truncated}): {raw_text[:200]}..."
+                )
+            tool_calls = result.value.get("tool_calls")
+            if result.truncated and isinstance(tool_calls, list):
+                complete = [
+                    call
+                    for index, call in enumerate(tool_calls)
+                    if result.is_complete("tool_calls", index)
+                ]
+                if len(complete) < len(tool_calls):
+                    logger.warning(
+                        f"Dropping {len(tool_calls) - len(complete)} cut-off tool calls "
+                        f"from truncated LLM output: {tool_calls[len(complete):]}"
+                    )
+                    result.value["tool_calls"] = complete
+            return result.value, False, result.repaired, result.truncated
 
         # Last resort: check if raw_text looks like JSON (starts with {)
         # If so, it's likely a malformed JSON - mark as invalid
-        if raw_text.strip().startswith("{"):
+        if (raw_text or "").strip().startswith("{"):
             logger.error(
                 f"LLM returned malformed JSON, cannot extract reply: {raw_text[:200]}..."
             )
-            return {"reply": "", "emotion": {}}, True
+            return {"reply": "", "emotion": {}}, True, False, False
 
         # Otherwise treat as plain text (also considered invalid JSON)
-        return {"reply": raw_text.strip(), "emotion": {}}, True
+        return {"reply": (raw_text or "").strip(), "emotion": {}}, True, False, False
 
     def _normalize_emotion_map(self, parsed: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -341,5 +1093,10 @@ class LLMService:
         # No longer add fallback - return empty dict if no valid emotions
         return normalized
 
+    def _client(self, endpoint: LLMConfig) -> httpx.AsyncClient:
+        """Shared client for the endpoint's provider (borrowed from the pool)."""
+        return llm_client_pool.get(endpoint.base_url or "")
+
     async def close(self):
-        await self.client.aclose()
+        # Clients are shared process-wide and closed in the app lifespan.
+        pass
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from src.core.configs import llm_defaults
+from src.services.llm.client_pool import provider_origin
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Refilling budget of `per_minute` units; `per_minute <= 0` means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.capacity = float(max(0, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self.tokens
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def consume(self, amount: float, now: float):
+        if self.unlimited:
+            return
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    tokens: int
+    enqueued_at: float
+
+
+class ProviderScheduler:
+    """
+    Admission control for one provider/model.
+
+    Requests wait for a slot under `max_in_flight` and for the requests- and
+    tokens-per-minute buckets. Waiters are queued per session and served
+    round-robin, so one chatty session cannot starve the others. A 429 can
+    pause admission with `backoff()`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._waiters: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due = 0.0
+
+        self._granted = 0
+        self._throttled = 0
+        self._backoffs = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str], tokens: int = 0) -> AsyncIterator[None]:
+        await self.acquire(session_id, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, session_id: Optional[str], tokens: int = 0):
+        loop = asyncio.get_running_loop()
+        key = session_id or ""
+        waiter = _Waiter(
+            future=loop.create_future(), tokens=max(0, tokens), enqueued_at=time.monotonic()
+        )
+        self._waiters.setdefault(key, deque()).append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before cancellation: hand the slot back.
+                self.release()
+            else:
+                self._discard(key, waiter)
+            raise
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+    def release(self):
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def backoff(self, seconds: float):
+        """Stop admitting requests for `seconds` (e.g. after a 429)."""
+        self._backoffs += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + max(0.0, seconds))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": sum(len(q) for q in self._waiters.values()),
+            "queued_sessions": len(self._waiters),
+            "granted": self._granted,
+            "throttled": self._throttled,
+            "backoffs": self._backoffs,
+            "avg_wait_ms": round(self._total_wait / self._granted * 1000, 3)
+            if self._granted
+            else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+            "requests_per_minute": self._requests.per_minute,
+            "tokens_per_minute": self._tokens.per_minute,
+        }
+
+    def _dispatch(self):
+        while self._waiters and self._in_flight < self.max_in_flight:
+            now = time.monotonic()
+            key, queue = next(iter(self._waiters.items()))
+            waiter = queue[0]
+            if waiter.future.done():
+                self._discard(key, waiter)
+                continue
+
+            delay = max(
+                self._paused_until - now,
+                self._requests.time_until(1, now),
+                self._tokens.time_until(waiter.tokens, now),
+            )
+            if delay > 0:
+                self._throttled += 1
+                self._schedule(delay)
+                return
+
+            queue.popleft()
+            if queue:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+
+            self._requests.consume(1, now)
+            self._tokens.consume(waiter.tokens, now)
+            self._in_flight += 1
+            self._granted += 1
+            waiter.future.set_result(None)
+
+    def _discard(self, key: str, waiter: _Waiter):
+        queue = self._waiters.get(key)
+        if not queue:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiters[key]
+
+    def _schedule(self, delay: float):
+        due = time.monotonic() + delay
+        if self._timer is not None and not self._timer.cancelled() and self._timer_due <= due:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_due = due
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+
+_schedulers: Dict[str, ProviderScheduler] = {}
+
+
+def get_provider_scheduler(base_url: str, model: str) -> ProviderScheduler:
+    """Shared scheduler for a provider origin + model, created on first use."""
+    key = f"{provider_origin(base_url) or '<default>'}|{model or ''}"
+    scheduler = _schedulers.get(key)
+    if scheduler is None:
+        scheduler = ProviderScheduler(
+            key,
+            max_in_flight=llm_defaults.max_in_flight,
+            requests_per_minute=llm_defaults.requests_per_minute,
+            tokens_per_minute=llm_defaults.tokens_per_minute,
+        )
+        _schedulers[key] = scheduler
+    return scheduler
+
+
+def get_scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    return {key: scheduler.get_stats() for key, scheduler in _schedulers.items()}
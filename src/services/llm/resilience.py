@@ -0,0 +1,195 @@
+import random
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.core.configs import llm_defaults
+from src.core.utils.logger import unified_logger, LogCategory
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without contacting the provider while its circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"LLM endpoint {endpoint} is unavailable (circuit open, retry in {retry_in:.1f}s)"
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After in seconds (delta-seconds form only), or None."""
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ProviderStreamError(Exception):
+    """Error event received inside a stream that started with HTTP 200."""
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """A 429: the provider is up, the scheduler's backoff handles it."""
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient provider errors."""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in RETRYABLE_STATUS_CODES
+        # Timeouts, connection resets, protocol errors, in-stream error events.
+        return isinstance(exc, (httpx.TransportError, ProviderStreamError))
+
+    def delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """Delay before retry number `attempt` (1-based); honors Retry-After."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(exc.response)
+            if retry_after is not None:
+                return min(self.max_delay, retry_after)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        # Jitter spreads retries from many sessions over the window.
+        return random.uniform(ceiling / 2, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and requests fail fast with CircuitOpenError. Once
+    `recovery_timeout` has passed a single probe request is let through
+    (half-open); its success closes the circuit, its failure reopens it.
+    Rate limiting (429) is not a failure: it only ends the request.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, endpoint: str, failure_threshold: int, recovery_timeout: float):
+        self.endpoint = endpoint
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = max(0.0, recovery_timeout)
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self._opened_count = 0
+        self._rejected = 0
+
+    @property
+    def allows_request(self) -> bool:
+        """Whether before_request() would let a request through right now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() < self._opened_at + self.recovery_timeout:
+                return False
+        return not self._probe_in_flight
+
+    def check(self):
+        """Fail fast while open, without taking the half-open probe."""
+        if self.allows_request:
+            return
+        self._rejected += 1
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+            raise CircuitOpenError(self.endpoint, max(0.0, remaining))
+        raise CircuitOpenError(self.endpoint, self.recovery_timeout)
+
+    def before_request(self):
+        if self.state == self.CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.recovery_timeout - now
+            if remaining > 0:
+                self._rejected += 1
+                raise CircuitOpenError(self.endpoint, remaining)
+            self._transition(self.HALF_OPEN)
+        if self._probe_in_flight:
+            self._rejected += 1
+            raise CircuitOpenError(self.endpoint, self.recovery_timeout)
+        self._probe_in_flight = True
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self.state != self.OPEN:
+                self._opened_count += 1
+                self._transition(self.OPEN)
+
+    def release(self):
+        """End a request that proved nothing about the provider (e.g. a 4xx)."""
+        self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self._opened_count,
+            "rejected": self._rejected,
+        }
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        level = unified_logger.warning if state == self.OPEN else unified_logger.info
+        level(
+            f"LLM circuit {previous} -> {state} for {self.endpoint}",
+            category=LogCategory.LLM,
+            metadata={
+                "endpoint": self.endpoint,
+                "state": state,
+                "consecutive_failures": self._failures,
+            },
+        )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(base_url: str, model: str) -> CircuitBreaker:
+    """Breaker for a base URL + model, keyed like the router's endpoint health."""
+    endpoint = f"{(base_url or '').strip().rstrip('/')}|{model or ''}"
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            endpoint,
+            failure_threshold=llm_defaults.circuit_failure_threshold,
+            recovery_timeout=llm_defaults.circuit_recovery_timeout,
+        )
+        _breakers[endpoint] = breaker
+    return breaker
+
+
+def get_circuit_stats() -> Dict[str, Dict[str, Any]]:
+    return {endpoint: breaker.get_stats() for endpoint, breaker in _breakers.items()}
+
+
+def default_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=llm_defaults.retry_max_attempts,
+        base_delay=llm_defaults.retry_base_delay,
+        max_delay=llm_defaults.retry_max_delay,
+    )
@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.configs import llm_defaults
+
+logger = logging.getLogger(__name__)
+
+
+def response_cache_key(
+    base_url: str,
+    protocol: str,
+    model: Optional[str],
+    temperature: Optional[float],
+    max_tokens: int,
+    messages: List[Dict[str, Any]],
+) -> str:
+    """
+    Digest of everything that determines a reply: the budgeted message list
+    (role + content with line endings and surrounding whitespace normalized),
+    the endpoint's base URL, protocol, model, temperature and max_tokens.
+    """
+    normalized = [
+        [m.get("role", ""), str(m.get("content") or "").replace("\r\n", "\n").strip()]
+        for m in messages
+    ]
+    material = json.dumps(
+        [
+            (base_url or "").strip().rstrip("/"),
+            protocol,
+            model or "",
+            temperature,
+            max_tokens,
+            normalized,
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache of raw LLM replies for byte-identical prompts.
+
+    Entries live in a bounded in-memory LRU and, when `path` is set, in a
+    SQLite file that survives restarts (read through on a memory miss, written
+    on every store). Both tiers expire entries after `ttl` seconds. Sampled
+    requests (temperature unset or > 0) are not cached unless `allow_sampling`
+    is on, since a replay would pin one random draw.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        path: str = "",
+        allow_sampling: bool = False,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl = max(0.0, ttl)
+        self.allow_sampling = allow_sampling
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if path:
+            self._open_disk_tier(Path(path))
+
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._skipped = 0
+        self._evictions = 0
+
+    def cacheable(self, temperature: Optional[float]) -> bool:
+        if self.allow_sampling or (temperature is not None and temperature <= 0):
+            return True
+        self._skipped += 1
+        return False
+
+    async def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """(raw_text, tier) for a fresh entry, or None."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1], "memory"
+            del self._entries[key]
+
+        if self._db is not None:
+            row = await self._run(self._disk_get, key, now - self.ttl)
+            if row is not None:
+                self._remember(key, row[0], row[1])
+                self._hits += 1
+                self._disk_hits += 1
+                return row[1], "disk"
+
+        self._misses += 1
+        return None
+
+    async def put(self, key: str, raw_text: str):
+        created_at = time.time()
+        self._remember(key, created_at, raw_text)
+        self._stores += 1
+        if self._db is not None:
+            await self._run(self._disk_put, key, created_at, raw_text)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "disk": self._db is not None,
+            "hits": self._hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "stores": self._stores,
+            "skipped_sampling": self._skipped,
+            "evictions": self._evictions,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, created_at: float, raw_text: str):
+        self._entries[key] = (created_at, raw_text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    # ------------------------------------------------------------------ #
+    # SQLite tier (blocking calls run on a single worker thread)
+    # ------------------------------------------------------------------ #
+    def _open_disk_tier(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, raw_text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "DELETE FROM llm_response_cache WHERE created_at < ?",
+                (time.time() - self.ttl,),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache disk tier disabled ({path}): {e}")
+            return
+        self._db = conn
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="rin-llm-cache"
+        )
+        logger.info(f"LLM response cache persisted at {path}")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache disk error: {e}")
+            return None
+
+    def _disk_get(self, key: str, fresh_after: float) -> Optional[Tuple[float, str]]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created_at, raw_text FROM llm_response_cache "
+                "WHERE key = ? AND created_at >= ?",
+                (key, fresh_after),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _disk_put(self, key: str, created_at: float, raw_text: str):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, raw_text, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, raw_text, created_at),
+            )
+            self._db.execute(
+                "DELETE FROM llm_response_cache WHERE created_at < ?",
+                (created_at - self.ttl,),
+            )
+            self._db.commit()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache, created on first use; None unless LLM_RESPONSE_CACHE is on."""
+    global _response_cache
+    if not llm_defaults.response_cache:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=llm_defaults.response_cache_max_entries,
+            ttl=llm_defaults.response_cache_ttl,
+            path=llm_defaults.response_cache_path,
+            allow_sampling=llm_defaults.response_cache_allow_sampling,
+        )
+    return _response_cache
+
+
+def get_response_cache_stats() -> Optional[Dict[str, Any]]:
+    return _response_cache.get_stats() if _response_cache is not None else None
+
+
+def close_response_cache():
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
@@ -0,0 +1,196 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from src.core.configs import llm_defaults
+from src.core.schemas import LLMConfig
+from src.services.llm.resilience import CircuitBreaker, get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+# Error rate at which an endpoint is ranked behind every healthy one.
+UNHEALTHY_ERROR_RATE = 0.5
+# Expected latency is inflated by (1 + penalty * error_rate).
+ERROR_RATE_PENALTY = 4.0
+
+
+@dataclass
+class RoutedEndpoint:
+    config: LLMConfig
+    weight: float = 1.0
+
+    @property
+    def key(self) -> str:
+        return f"{(self.config.base_url or '').rstrip('/')}|{self.config.model or ''}"
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return get_circuit_breaker(self.config.base_url or "", self.config.model or "")
+
+
+class EndpointHealth:
+    """Rolling latency and outcome window for one endpoint (base URL + model)."""
+
+    def __init__(self, window: int):
+        window = max(1, window)
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+
+    def record_success(self, latency_ms: float):
+        self.requests += 1
+        self.latencies.append(latency_ms)
+        self.outcomes.append(True)
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.outcomes.append(False)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "samples": len(self.latencies),
+        }
+
+
+_health: Dict[str, EndpointHealth] = {}
+
+
+def get_endpoint_health(key: str) -> EndpointHealth:
+    health = _health.get(key)
+    if health is None:
+        health = EndpointHealth(llm_defaults.router_window)
+        _health[key] = health
+    return health
+
+
+def get_router_stats() -> Dict[str, Dict[str, Any]]:
+    return {key: health.get_stats() for key, health in _health.items()}
+
+
+class EndpointRouter:
+    """
+    Orders a session's endpoints by health for each request.
+
+    The session's own LLMConfig is the primary endpoint; LLM_FALLBACK_ENDPOINTS
+    adds more (fields they omit are inherited from the primary) unless
+    LLM_OVERRIDE_BASE_URL pins every session to one endpoint. Endpoints
+    whose circuit is open or whose recent error rate is high go last; the rest
+    are ranked by rolling p50 latency inflated by the error rate and divided
+    by weight. Endpoints without samples are assumed as fast as the best
+    known one, so an untried list keeps its configured order.
+    """
+
+    def __init__(self, endpoints: List[RoutedEndpoint]):
+        self.endpoints = endpoints
+        self.min_samples = max(1, llm_defaults.router_min_samples)
+        self.hedge_enabled = llm_defaults.hedge_enabled
+        self.hedge_min_delay = max(0.0, llm_defaults.hedge_min_delay)
+        self.hedge_default_delay = max(self.hedge_min_delay, llm_defaults.hedge_default_delay)
+
+    @classmethod
+    def from_config(
+        cls, config: LLMConfig, fallbacks: Optional[List[Dict[str, Any]]] = None
+    ) -> "EndpointRouter":
+        if fallbacks is None:
+            fallbacks = llm_defaults.fallback_endpoints
+        if llm_defaults.override_base_url:
+            # Every request must reach the override (e.g. the mock LLM), so no
+            # failover or hedge can leak to a real provider.
+            if fallbacks:
+                logger.info("LLM_OVERRIDE_BASE_URL set; ignoring fallback endpoints")
+            fallbacks = []
+        endpoints = [RoutedEndpoint(config)]
+        seen = {endpoints[0].key}
+        for entry in fallbacks or []:
+            if not isinstance(entry, dict) or not entry.get("base_url"):
+                logger.warning(f"Ignoring LLM fallback endpoint without base_url: {entry!r}")
+                continue
+            update = {
+                field: entry[field]
+                for field in ("base_url", "api_key", "model")
+                if entry.get(field)
+            }
+            endpoint = RoutedEndpoint(
+                config.model_copy(update=update),
+                weight=cls._weight(entry.get("weight", 1.0)),
+            )
+            if endpoint.key in seen:
+                continue
+            seen.add(endpoint.key)
+            endpoints.append(endpoint)
+        return cls(endpoints)
+
+    def health(self, endpoint: RoutedEndpoint) -> EndpointHealth:
+        return get_endpoint_health(endpoint.key)
+
+    def ranked(self) -> List[RoutedEndpoint]:
+        if len(self.endpoints) == 1:
+            return list(self.endpoints)
+        p50s = [
+            p50
+            for p50 in (self.health(e).percentile(0.5) for e in self.endpoints)
+            if p50 is not None
+        ]
+        baseline = min(p50s) if p50s else 0.0
+
+        def rank(item):
+            index, endpoint = item
+            health = self.health(endpoint)
+            unavailable = not endpoint.breaker.allows_request
+            unhealthy = (
+                len(health.outcomes) >= self.min_samples
+                and health.error_rate >= UNHEALTHY_ERROR_RATE
+            )
+            latency = health.percentile(0.5)
+            if latency is None:
+                latency = baseline
+            expected = latency * (1 + ERROR_RATE_PENALTY * health.error_rate) / endpoint.weight
+            return (unavailable, unhealthy, expected, index)
+
+        return [endpoint for _, endpoint in sorted(enumerate(self.endpoints), key=rank)]
+
+    def hedge_target(self, ranked: List[RoutedEndpoint]) -> Optional[RoutedEndpoint]:
+        """Endpoint to duplicate a slow request to, if hedging applies."""
+        if not self.hedge_enabled:
+            return None
+        for endpoint in ranked[1:]:
+            if endpoint.breaker.allows_request:
+                return endpoint
+        return None
+
+    def hedge_delay(self, endpoint: RoutedEndpoint) -> float:
+        """Seconds to wait on `endpoint` before hedging: its p95, floored."""
+        health = self.health(endpoint)
+        p95 = health.percentile(0.95)
+        if p95 is None or len(health.latencies) < self.min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, p95 / 1000)
+
+    @staticmethod
+    def _weight(value: Any) -> float:
+        try:
+            weight = float(value)
+        except (TypeError, ValueError):
+            return 1.0
+        return weight if weight > 0 else 1.0
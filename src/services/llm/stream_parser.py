@@ -0,0 +1,237 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class StreamingReplyParser:
+    """
+    Incremental scanner for the structured reply object
+    {"emotion": {...}, "reply": "...", "tool_calls": [...]} while it streams.
+
+    Top-level values are decoded as soon as they close; the `reply` string is
+    decoded character by character so callers can act on finished segments
+    before the object is complete. Input that does not look like the expected
+    object just stops the scan (`failed`); the final, non-incremental parse in
+    LLMService stays authoritative.
+    """
+
+    def __init__(
+        self, normalize_emotion: Optional[Callable[[Dict[str, Any]], Dict[str, str]]] = None
+    ):
+        self._normalize_emotion = normalize_emotion
+        self.values: Dict[str, Any] = {}
+        self.reply = ""
+        self.reply_started = False
+        self.reply_done = False
+        self.failed = False
+        self.done = False
+
+        self._state = "start"
+        self._key: List[str] = []
+        self._current_key = ""
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: List[str] = []
+        self._high_surrogate: Optional[int] = None
+
+    @property
+    def current_key(self) -> str:
+        """Top-level key whose value is being read ("" between values)."""
+        return self._current_key if self._state in ("value", "raw", "scalar", "reply") else ""
+
+    @property
+    def has_emotion(self) -> bool:
+        return "emotion" in self.values
+
+    @property
+    def emotion_map(self) -> Dict[str, str]:
+        if not self.has_emotion:
+            return {}
+        if self._normalize_emotion is None:
+            emotion = self.values.get("emotion")
+            return dict(emotion) if isinstance(emotion, dict) else {}
+        return self._normalize_emotion(self.values)
+
+    @property
+    def has_tool_calls(self) -> bool:
+        """True once a non-empty tool_calls value is seen or being read."""
+        if self.current_key == "tool_calls" and self._state == "raw":
+            return "".join(self._buf).lstrip("[ \t\r\n") != ""
+        return bool(self.values.get("tool_calls"))
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; return True if the reply or a top-level value advanced."""
+        if self.failed or self.done or not chunk:
+            return False
+        reply_len = len(self.reply)
+        value_count = len(self.values)
+        for ch in chunk:
+            self._step(ch)
+            if self.failed or self.done:
+                break
+        return len(self.reply) != reply_len or len(self.values) != value_count
+
+    def _step(self, ch: str):
+        state = self._state
+
+        if state == "start":
+            if ch == "{":
+                self._state = "key_or_end"
+            return
+
+        if state == "key_or_end":
+            if ch.isspace() or ch == ",":
+                return
+            if ch == '"':
+                self._key = []
+                self._state = "key"
+            elif ch == "}":
+                self.done = True
+            else:
+                self.failed = True
+            return
+
+        if state == "key":
+            if self._escape:
+                self._key.append(_ESCAPES.get(ch, ch))
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._current_key = "".join(self._key)
+                self._state = "colon"
+            else:
+                self._key.append(ch)
+            return
+
+        if state == "colon":
+            if ch.isspace():
+                return
+            if ch == ":":
+                self._state = "value"
+            else:
+                self.failed = True
+            return
+
+        if state == "value":
+            if ch.isspace():
+                return
+            self._buf = [ch]
+            if self._current_key == "reply" and ch == '"':
+                self._buf = []
+                self.reply_started = True
+                self._state = "reply"
+            elif ch in "{[":
+                self._depth = 1
+                self._in_string = False
+                self._state = "raw"
+            elif ch == '"':
+                self._depth = 0
+                self._in_string = True
+                self._state = "raw"
+            else:
+                self._state = "scalar"
+            return
+
+        if state == "raw":
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            if self._depth == 0 and not self._in_string:
+                self._finish_value("".join(self._buf))
+            return
+
+        if state == "scalar":
+            if ch in ",}":
+                self._finish_value("".join(self._buf).strip())
+                self._step(ch)
+            else:
+                self._buf.append(ch)
+            return
+
+        if state == "reply":
+            self._step_reply(ch)
+            return
+
+        if state == "after_value":
+            if ch.isspace():
+                return
+            if ch == ",":
+                self._state = "key_or_end"
+            elif ch == "}":
+                self.done = True
+            else:
+                self.failed = True
+
+    def _step_reply(self, ch: str):
+        if self._unicode or (self._escape and ch == "u"):
+            if self._escape:
+                self._escape = False
+                self._unicode = ["u"]
+                return
+            self._unicode.append(ch)
+            if len(self._unicode) == 5:
+                try:
+                    code = int("".join(self._unicode[1:]), 16)
+                except ValueError:
+                    self.failed = True
+                    return
+                self._unicode = []
+                self._append_code_point(code)
+            return
+        if self._escape:
+            self._escape = False
+            self._append_reply(_ESCAPES.get(ch, ch))
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self.reply_done = True
+            self.values["reply"] = self.reply
+            self._state = "after_value"
+        else:
+            self._append_reply(ch)
+
+    def _append_code_point(self, code: int):
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        self._append_reply(chr(code))
+
+    def _append_reply(self, text: str):
+        if self._high_surrogate is not None:
+            self._high_surrogate = None
+        self.reply += text
+
+    def _finish_value(self, raw: str):
+        try:
+            self.values[self._current_key] = json.loads(raw)
+        except ValueError:
+            self.failed = True
+            return
+        self._state = "after_value"
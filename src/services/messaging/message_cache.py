@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.core.configs import cache_config
+from src.core.models.message import Message
+
+
+@dataclass
+class _SessionTail:
+    messages: List[Message] = field(default_factory=list)
+    by_id: Dict[str, Message] = field(default_factory=dict)
+    # True while `messages` still holds the whole transcript (nothing trimmed).
+    complete: bool = True
+
+
+class MessageTailCache:
+    """
+    Bounded LRU of recent messages per session, kept in seq order.
+
+    MessageService writes through on create, recall and read changes, so hot
+    sessions are served from memory. A session is loaded once from SQLite;
+    if its transcript exceeds `max_messages_per_session` only the tail is
+    kept and the entry is marked incomplete, so full-history reads fall back
+    to the database while tail lookups still hit.
+    """
+
+    def __init__(self, max_sessions: int, max_messages_per_session: int):
+        self.max_sessions = max(1, max_sessions)
+        self.max_messages_per_session = max(1, max_messages_per_session)
+        self._sessions: "OrderedDict[str, _SessionTail]" = OrderedDict()
+        # Bumped on every write-through so a load that raced a write is not stored.
+        self._generations: Dict[str, int] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._trimmed = 0
+
+    def generation(self, session_id: str) -> int:
+        return self._generations.get(session_id, 0)
+
+    def get_messages(
+        self,
+        session_id: str,
+        after_timestamp: Optional[float] = None,
+        after_seq: Optional[int] = None,
+    ) -> Optional[List[Message]]:
+        """Return cached messages, or None if the cache cannot answer."""
+        entry = self._sessions.get(session_id)
+        if entry is None or not self._covers(entry, after_timestamp, after_seq):
+            self._misses += 1
+            return None
+        self._touch(session_id)
+        self._hits += 1
+        if after_seq is not None:
+            return self._after_seq(entry, after_seq)
+        if after_timestamp is None:
+            return list(entry.messages)
+        return [m for m in entry.messages if m.timestamp > after_timestamp]
+
+    def get_last_message(self, session_id: str) -> Optional[Message]:
+        entry = self._sessions.get(session_id)
+        if entry is None or not entry.messages:
+            self._misses += 1
+            return None
+        self._touch(session_id)
+        self._hits += 1
+        return entry.messages[-1]
+
+    def find(self, message_id: str) -> Optional[Message]:
+        for entry in self._sessions.values():
+            message = entry.by_id.get(message_id)
+            if message is not None:
+                self._hits += 1
+                return message
+        self._misses += 1
+        return None
+
+    def store(self, session_id: str, messages: List[Message], generation: int):
+        """Cache a full transcript loaded from the database."""
+        if self.generation(session_id) != generation:
+            return
+        entry = _SessionTail(messages=list(messages))
+        entry.by_id = {m.id: m for m in entry.messages}
+        self._sessions[session_id] = entry
+        self._touch(session_id)
+        self._trim(entry)
+        self._evict()
+
+    def append(self, message: Message):
+        self._bump(message.session_id)
+        entry = self._sessions.get(message.session_id)
+        if entry is None:
+            return
+        entry.messages.append(message)
+        entry.by_id[message.id] = message
+        self._touch(message.session_id)
+        self._trim(entry)
+
+    def mark_recalled(self, session_id: str, message_id: str):
+        self._bump(session_id)
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        message = entry.by_id.get(message_id)
+        if message is not None:
+            message.is_recalled = True
+
+    def mark_read_until(self, session_id: str, until_timestamp: float):
+        self._bump(session_id)
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        for message in entry.messages:
+            if message.timestamp <= until_timestamp and not message.is_recalled:
+                message.is_read = True
+
+    def invalidate(self, session_id: str):
+        self._bump(session_id)
+        self._sessions.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "sessions": len(self._sessions),
+            "messages": sum(len(e.messages) for e in self._sessions.values()),
+            "max_sessions": self.max_sessions,
+            "max_messages_per_session": self.max_messages_per_session,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "trimmed_messages": self._trimmed,
+        }
+
+    def _covers(
+        self,
+        entry: _SessionTail,
+        after_timestamp: Optional[float],
+        after_seq: Optional[int] = None,
+    ) -> bool:
+        if entry.complete:
+            return True
+        if not entry.messages:
+            return False
+        if after_seq is not None:
+            return after_seq >= (entry.messages[0].seq or 0)
+        if after_timestamp is None:
+            return False
+        return after_timestamp >= entry.messages[0].timestamp
+
+    def _after_seq(self, entry: _SessionTail, after_seq: int) -> List[Message]:
+        # Messages are appended in seq order, so scan back from the tail.
+        start = len(entry.messages)
+        while start > 0 and (entry.messages[start - 1].seq or 0) > after_seq:
+            start -= 1
+        return entry.messages[start:]
+
+    def _bump(self, session_id: str):
+        self._generations[session_id] = self._generations.get(session_id, 0) + 1
+
+    def _touch(self, session_id: str):
+        self._sessions.move_to_end(session_id)
+
+    def _trim(self, entry: _SessionTail):
+        overflow = len(entry.messages) - self.max_messages_per_session
+        if overflow <= 0:
+            return
+        for message in entry.messages[:overflow]:
+            entry.by_id.pop(message.id, None)
+        del entry.messages[:overflow]
+        entry.complete = False
+        self._trimmed += overflow
+
+    def _evict(self):
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._evictions += 1
+
+
+# Process-wide cache shared by every MessageService instance.
+message_tail_cache = MessageTailCache(
+    max_sessions=cache_config.message_cache_sessions,
+    max_messages_per_session=cache_config.message_cache_messages_per_session,
+)
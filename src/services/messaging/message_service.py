@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 import random
 import uuid
@@ -7,7 +7,12 @@ from src.core.models.message import (
     MessageType,
     ALLOWED_SYSTEM_MESSAGE_TYPES,
 )
-from src.core.interfaces.repositories import IMessageRepository
+from src.core.interfaces.repositories import (
+    IMessageRepository,
+    ISessionStateRepository,
+)
+from src.core.configs import database_config
+from src.services.messaging.message_cache import MessageTailCache, message_tail_cache
 from src.core.utils.logger import (
     unified_logger,
     broadcast_log_if_needed,
@@ -17,10 +22,42 @@ from src.core.utils.logger import (
 # Time message interval in seconds - SINGLE SOURCE OF TRUTH
 TIME_MESSAGE_INTERVAL = 300
 
+# session_state keys
+EMOTION_STATE_KEY = "emotion"
+TYPING_STATE_PREFIX = "typing:"
+SUMMARY_STATE_KEY = "summary"
+
 
 class MessageService:
-    def __init__(self, message_repo: IMessageRepository):
+    def __init__(
+        self,
+        message_repo: IMessageRepository,
+        state_repo: ISessionStateRepository,
+        message_cache: Optional[MessageTailCache] = None,
+    ):
         self.message_repo = message_repo
+        self.state_repo = state_repo
+        self.message_cache = message_cache or message_tail_cache
+
+    async def _create(self, message: Message, durable: bool = False) -> bool:
+        """Persist a message and write it through to the tail cache."""
+        created = await self.message_repo.create(
+            message,
+            durable=durable,
+            on_failure=lambda: self._on_write_lost(message.session_id, message.id),
+        )
+        if created:
+            self.message_cache.append(message)
+        return created
+
+    def _on_write_lost(self, session_id: str, message_id: str):
+        """A queued write failed after the cache saw it: reload from the DB."""
+        self.message_cache.invalidate(session_id)
+        unified_logger.error(
+            f"Message write for {message_id} was lost; tail cache invalidated",
+            category=LogCategory.MESSAGE,
+            metadata={"session_id": session_id, "message_id": message_id},
+        )
 
     async def _ensure_system_invariants(
         self, session_id: str, sender_id: str, message_type: MessageType
@@ -98,7 +135,7 @@ class MessageService:
             timestamp=timestamp,
         )
 
-        await self.message_repo.create(message)
+        await self._create(message)
         await self.set_typing_state(session_id, sender_id, False)
 
         return [m for m in [time_msg, message] if m is not None]
@@ -106,7 +143,7 @@ class MessageService:
     async def recall_message(
         self, session_id: str, message_id: str, timestamp: float, recalled_by: str
     ) -> Optional[Message]:
-        original = await self.message_repo.get_by_id(message_id)
+        original = await self.get_message(message_id)
         if not original:
             log_entry = unified_logger.warning(
                 f"Message {message_id} not found for recall",
@@ -123,7 +160,13 @@ class MessageService:
             await broadcast_log_if_needed(log_entry)
             return None
 
-        await self.message_repo.update_recalled_status(message_id, True)
+        await self.message_repo.update_recalled_status(
+            message_id,
+            True,
+            durable=False,
+            on_failure=lambda: self._on_write_lost(session_id, message_id),
+        )
+        self.message_cache.mark_recalled(session_id, message_id)
 
         recall_id = f"recall-{uuid.uuid4().hex[:12]}"
         recall_message = Message(
@@ -142,7 +185,7 @@ class MessageService:
             timestamp=datetime.now(timezone.utc).timestamp(),
         )
 
-        await self.message_repo.create(recall_message)
+        await self._create(recall_message)
         return recall_message
 
     async def create_session(
@@ -170,7 +213,7 @@ class MessageService:
                 is_read=False,
                 timestamp=base_timestamp,
             )
-            await self.message_repo.create(time_msg)
+            await self._create(time_msg)
 
             hint_msg = Message(
                 id=f"hint-{uuid.uuid4().hex[:12]}",
@@ -183,7 +226,7 @@ class MessageService:
                 is_read=True,
                 timestamp=base_timestamp + 1,
             )
-            await self.message_repo.create(hint_msg)
+            await self._create(hint_msg)
 
             user_nickname = user_nickname or "用户"
             greeting_msg = Message(
@@ -197,7 +240,7 @@ class MessageService:
                 is_read=True,
                 timestamp=base_timestamp + 2,
             )
-            await self.message_repo.create(greeting_msg)
+            await self._create(greeting_msg)
 
             greeting_msg = Message(
                 id=f"greeting-{uuid.uuid4().hex[:12]}",
@@ -210,7 +253,7 @@ class MessageService:
                 is_read=True,
                 timestamp=base_timestamp + 3,
             )
-            await self.message_repo.create(greeting_msg)
+            await self._create(greeting_msg)
 
             hint_msg = Message(
                 id=f"hint-{uuid.uuid4().hex[:12]}",
@@ -223,8 +266,10 @@ class MessageService:
                 is_read=True,
                 timestamp=base_timestamp + 4,
             )
-            await self.message_repo.create(hint_msg)
+            await self._create(hint_msg)
 
+            # The five seed rows are committed together in one transaction.
+            await self.message_repo.flush_pending_writes()
             return True
         except Exception as e:
             log_entry = unified_logger.error(
@@ -235,16 +280,89 @@ class MessageService:
             await broadcast_log_if_needed(log_entry)
             return False
 
+    async def flush_pending_writes(self):
+        """Commit messages queued with durable=False."""
+        await self.message_repo.flush_pending_writes()
+
     async def delete_session(self, session_id: str) -> bool:
+        self.message_cache.invalidate(session_id)
+        await self.state_repo.delete_by_session(session_id)
         return await self.message_repo.delete_by_session(session_id)
 
     async def get_message(self, message_id: str) -> Optional[Message]:
+        cached = self.message_cache.find(message_id)
+        if cached is not None:
+            return cached
         return await self.message_repo.get_by_id(message_id)
 
     async def get_messages(
         self, session_id: str, after_timestamp: Optional[float] = None
     ) -> List[Message]:
-        return await self.message_repo.get_by_session(session_id, after_timestamp)
+        """
+        Session transcript, served from the tail cache for hot sessions.
+        A full-history miss loads the session once and caches it.
+        """
+        cached = self.message_cache.get_messages(session_id, after_timestamp)
+        if cached is not None:
+            return cached
+
+        if after_timestamp is not None:
+            return await self.message_repo.get_by_session(session_id, after_timestamp)
+
+        generation = self.message_cache.generation(session_id)
+        messages = await self.message_repo.get_by_session(session_id)
+        self.message_cache.store(session_id, messages, generation)
+        return list(messages)
+
+    async def get_messages_after_seq(
+        self, session_id: str, after_seq: int
+    ) -> List[Message]:
+        """Messages newer than a seq cursor, from the tail cache when it covers them."""
+        cached = self.message_cache.get_messages(session_id, after_seq=after_seq)
+        if cached is not None:
+            return cached
+        if after_seq <= 0:
+            return await self.get_messages(session_id)
+        return await self.message_repo.get_by_session(session_id, after_seq=after_seq)
+
+    async def get_message_page(
+        self,
+        session_id: str,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        limit: Optional[int] = None,
+        after_timestamp: Optional[float] = None,
+        from_end: bool = False,
+    ) -> Tuple[List[Message], bool]:
+        """
+        Bounded page of messages using seq cursors.
+        Returns (messages, has_more); has_more means another page exists in
+        the paging direction (older for before_seq/from_end, newer otherwise).
+        """
+        if limit is None or limit <= 0:
+            limit = database_config.message_page_size
+        limit = min(limit, database_config.message_page_max)
+
+        messages = await self.message_repo.get_by_session(
+            session_id,
+            after_timestamp=after_timestamp,
+            limit=limit + 1,
+            after_seq=after_seq,
+            before_seq=before_seq,
+            from_end=from_end,
+        )
+        has_more = len(messages) > limit
+        if has_more:
+            backwards = after_seq is None and (before_seq is not None or from_end)
+            messages = messages[1:] if backwards else messages[:limit]
+        return messages, has_more
+
+    async def get_latest_message_by_type(
+        self, session_id: str, message_type: MessageType
+    ) -> Optional[Message]:
+        return await self.message_repo.get_latest_by_type(
+            session_id, MessageType(message_type).value
+        )
 
     async def mark_read_until(self, session_id: str, until_timestamp: float) -> float:
         """
@@ -257,35 +375,109 @@ class MessageService:
         await self.message_repo.update_read_status_until(
             session_id=session_id, until_timestamp=until_timestamp, is_read=True
         )
+        self.message_cache.mark_read_until(session_id, until_timestamp)
         return await self.message_repo.get_last_read_timestamp(session_id)
 
     async def set_typing_state(
         self, session_id: str, user_id: str, is_typing: bool
     ) -> Message:
-        typing_id = f"typing-{uuid.uuid4().hex[:12]}"
-        typing_msg = Message(
-            id=typing_id,
+        """
+        Upsert the typing state of a user.
+        Returns a transient message for broadcasting; it is not stored in history.
+        """
+        timestamp = datetime.now(timezone.utc).timestamp()
+        metadata = {"user_id": user_id, "is_typing": is_typing}
+        await self.state_repo.set_state(
+            session_id,
+            f"{TYPING_STATE_PREFIX}{user_id}",
+            metadata,
+            timestamp,
+            durable=False,
+        )
+        return self._typing_message(session_id, metadata, timestamp)
+
+    async def set_emotion_state(
+        self, session_id: str, emotion_map: Dict[str, str]
+    ) -> Message:
+        """
+        Upsert the current emotion of a session.
+        Returns a transient message for broadcasting; it is not stored in history.
+        """
+        timestamp = datetime.now(timezone.utc).timestamp()
+        await self.state_repo.set_state(
+            session_id, EMOTION_STATE_KEY, emotion_map, timestamp, durable=False
+        )
+        return self._emotion_message(session_id, emotion_map, timestamp)
+
+    async def get_latest_emotion_state(
+        self, session_id: str
+    ) -> Optional[Dict[str, str]]:
+        return await self.state_repo.get_state(session_id, EMOTION_STATE_KEY)
+
+    async def get_summary_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Rolling summary of older turns: {"text": ..., "through_seq": ...}."""
+        return await self.state_repo.get_state(session_id, SUMMARY_STATE_KEY)
+
+    async def set_summary_state(self, session_id: str, text: str, through_seq: int):
+        timestamp = datetime.now(timezone.utc).timestamp()
+        await self.state_repo.set_state(
+            session_id,
+            SUMMARY_STATE_KEY,
+            {"text": text, "through_seq": through_seq},
+            timestamp,
+        )
+
+    async def get_latest_typing_state(self, session_id: str, user_id: str) -> bool:
+        state = await self.state_repo.get_state(
+            session_id, f"{TYPING_STATE_PREFIX}{user_id}"
+        )
+        return bool(state and state.get("is_typing", False))
+
+    async def get_state_messages(
+        self, session_id: str, after_timestamp: Optional[float] = None
+    ) -> List[Message]:
+        """
+        Current typing/emotion state as transient messages, so clients that
+        render state from the message stream keep working.
+        """
+        states = await self.state_repo.get_states(session_id)
+        messages: List[Message] = []
+        for key, state in states.items():
+            updated_at = state["updated_at"]
+            if after_timestamp is not None and updated_at <= after_timestamp:
+                continue
+            if key == EMOTION_STATE_KEY:
+                messages.append(
+                    self._emotion_message(session_id, state["value"], updated_at)
+                )
+            elif key.startswith(TYPING_STATE_PREFIX):
+                messages.append(
+                    self._typing_message(session_id, state["value"], updated_at)
+                )
+        messages.sort(key=lambda m: m.timestamp)
+        return messages
+
+    def _typing_message(
+        self, session_id: str, metadata: Dict, timestamp: float
+    ) -> Message:
+        # Stable id per (session, user) so clients replace the previous state.
+        return Message(
+            id=f"typing-{session_id}-{metadata.get('user_id')}",
             session_id=session_id,
             sender_id="system",
             type=MessageType.SYSTEM_TYPING,
             content="",
-            metadata={"user_id": user_id, "is_typing": is_typing},
+            metadata=metadata,
             is_recalled=False,
             is_read=False,
-            timestamp=datetime.now(timezone.utc).timestamp(),
+            timestamp=timestamp,
         )
 
-        await self.message_repo.create(typing_msg)
-        await self._cleanup_old_state_messages(session_id, MessageType.SYSTEM_TYPING)
-
-        return typing_msg
-
-    async def set_emotion_state(
-        self, session_id: str, emotion_map: Dict[str, str]
+    def _emotion_message(
+        self, session_id: str, emotion_map: Dict[str, str], timestamp: float
     ) -> Message:
-        emotion_id = f"emotion-{uuid.uuid4().hex[:12]}"
-        emotion_msg = Message(
-            id=emotion_id,
+        return Message(
+            id=f"emotion-{session_id}",
             session_id=session_id,
             sender_id="system",
             type=MessageType.SYSTEM_EMOTION,
@@ -293,52 +485,27 @@ class MessageService:
             metadata=emotion_map,
             is_recalled=False,
             is_read=False,
-            timestamp=datetime.now(timezone.utc).timestamp(),
+            timestamp=timestamp,
         )
 
-        await self.message_repo.create(emotion_msg)
-        await self._cleanup_old_state_messages(session_id, MessageType.SYSTEM_EMOTION)
-
-        return emotion_msg
-
-    async def get_latest_emotion_state(
-        self, session_id: str
-    ) -> Optional[Dict[str, str]]:
-        messages = await self.message_repo.get_by_session(session_id)
-        for msg in reversed(messages):
-            if msg.type == MessageType.SYSTEM_EMOTION:
-                return msg.metadata
-        return None
-
-    async def get_latest_typing_state(self, session_id: str, user_id: str) -> bool:
-        messages = await self.message_repo.get_by_session(session_id)
-        for msg in reversed(messages):
-            if (
-                msg.type == MessageType.SYSTEM_TYPING
-                and msg.metadata.get("user_id") == user_id
-            ):
-                return msg.metadata.get("is_typing", False)
-        return False
-
     async def is_session_blocked(self, session_id: str) -> bool:
         """
         Check if a session is in blocked state.
         A session is blocked if there's any SYSTEM_BLOCKED message in history.
         """
-        messages = await self.message_repo.get_by_session(session_id)
-        for msg in messages:
-            if msg.type == MessageType.SYSTEM_BLOCKED:
-                return True
-        return False
+        return await self.message_repo.exists_by_type(
+            session_id, MessageType.SYSTEM_BLOCKED.value
+        )
 
     async def _insert_time_message_if_needed(
         self, session_id: str, reference_timestamp: float
     ) -> Optional[Message]:
-        messages = await self.message_repo.get_by_session(session_id)
-        if not messages:
+        last_message = self.message_cache.get_last_message(
+            session_id
+        ) or await self.message_repo.get_last_message(session_id)
+        if not last_message:
             return None
 
-        last_message = messages[-1]
         time_gap = reference_timestamp - last_message.timestamp
 
         if time_gap > TIME_MESSAGE_INTERVAL:
@@ -356,22 +523,7 @@ class MessageService:
                 timestamp=reference_timestamp - 0.001,
             )
 
-            await self.message_repo.create(time_msg)
+            await self._create(time_msg)
             return time_msg
 
         return None
-
-    async def _cleanup_old_state_messages(
-        self, session_id: str, message_type: MessageType
-    ):
-        messages = await self.message_repo.get_by_session(session_id)
-
-        state_messages = [msg for msg in messages if msg.type == message_type]
-
-        if len(state_messages) <= 1:
-            return
-
-        state_messages.sort(key=lambda m: m.timestamp)
-
-        for old_msg in state_messages[:-1]:
-            await self.message_repo.update_recalled_status(old_msg.id, True)
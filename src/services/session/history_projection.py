@@ -0,0 +1,192 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.models.message import Message, MessageType
+from src.core.schemas import ChatMessage
+
+# Messages written by MessageService.create_session before the first real turn.
+GREETING_BLOCK_SIZE = 5
+
+RenderFn = Callable[[Message], List[ChatMessage]]
+
+
+def is_greeting_block(messages: List[Message]) -> bool:
+    """Detect the initial greeting block (time + hints + "我是..." exchange)."""
+    if len(messages) < GREETING_BLOCK_SIZE:
+        return False
+    m0, m1, m2, m3, m4 = messages[:GREETING_BLOCK_SIZE]
+    return (
+        m0.sender_id == "system"
+        and m0.type == MessageType.SYSTEM_TIME
+        and m1.sender_id == "system"
+        and m1.type == MessageType.SYSTEM_HINT
+        and m2.sender_id == "user"
+        and m2.type == MessageType.TEXT
+        and (m2.content or "").startswith("我是")
+        and m3.sender_id == "assistant"
+        and m3.type == MessageType.TEXT
+        and (m3.content or "").startswith("我是")
+        and m4.sender_id == "system"
+        and m4.type == MessageType.SYSTEM_HINT
+        and ("打招呼" in (m4.content or "") or "以上" in (m4.content or ""))
+    )
+
+
+@dataclass
+class _Segment:
+    message: Message
+    # Highest seq covered by the segment (the greeting spans several messages).
+    seq: int = 0
+    greeting: bool = False
+    # Re-rendered on every build because its text depends on data outside
+    # the transcript (user nickname, image descriptions that may appear later).
+    volatile: bool = False
+    chat_messages: List[ChatMessage] = field(default_factory=list)
+
+
+class HistoryProjection:
+    """
+    Incremental List[ChatMessage] view of one session's transcript.
+
+    Each stored message is rendered once into a segment; later turns only
+    process messages with a seq above `last_seq`. A SYSTEM_RECALL re-renders
+    just its target's segment. The first messages are held back until the
+    greeting block can be detected, then collapsed into a single segment.
+    Segments up to a summary's `through_seq` can be skipped when building.
+    """
+
+    def __init__(
+        self,
+        render_message: RenderFn,
+        render_greeting: RenderFn,
+        is_volatile: Optional[Callable[[Message], bool]] = None,
+    ):
+        self._render_message = render_message
+        self._render_greeting = render_greeting
+        self._is_volatile = is_volatile or (lambda msg: False)
+        self.reset()
+
+    def reset(self, session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.last_seq = 0
+        self.last_message_id: Optional[str] = None
+        self._head: List[Message] = []
+        self._head_decided = False
+        self._segments: List[_Segment] = []
+        self._by_id: Dict[str, _Segment] = {}
+
+    def extend(self, messages: List[Message]):
+        """Project messages newer than `last_seq`; older ones are ignored."""
+        for msg in messages:
+            if msg.seq is not None and msg.seq <= self.last_seq:
+                continue
+            self._apply(msg)
+            if msg.seq is not None:
+                self.last_seq = msg.seq
+            self.last_message_id = msg.id
+
+    def build(
+        self,
+        tail: Optional[List[ChatMessage]] = None,
+        head: Optional[List[ChatMessage]] = None,
+        after_seq: int = 0,
+    ) -> List[ChatMessage]:
+        """Projected history, skipping segments covered up to `after_seq`."""
+        out: List[ChatMessage] = list(head or [])
+        for _, chat_messages in self.segments_after(after_seq):
+            out.extend(chat_messages)
+        for msg in self._head:
+            out.extend(self._render_message(msg))
+        if tail:
+            out.extend(tail)
+        return out
+
+    def segments_after(self, after_seq: int = 0) -> List[Tuple[int, List[ChatMessage]]]:
+        """(seq, chat messages) of each settled segment newer than `after_seq`."""
+        out: List[Tuple[int, List[ChatMessage]]] = []
+        for segment in self._segments:
+            if after_seq and segment.seq <= after_seq:
+                continue
+            if segment.volatile:
+                segment.chat_messages = self._render(segment)
+            out.append((segment.seq, segment.chat_messages))
+        return out
+
+    def discard_through(self, seq: int):
+        """Drop segments folded into a summary; they are never rendered again."""
+        if not seq or not self._segments or self._segments[0].seq > seq:
+            return
+        keep = 0
+        while keep < len(self._segments) and self._segments[keep].seq <= seq:
+            self._by_id.pop(self._segments[keep].message.id, None)
+            keep += 1
+        del self._segments[:keep]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Projection size; `approx_bytes` counts stored and rendered text only."""
+        messages = [segment.message for segment in self._segments] + self._head
+        rendered = [m for segment in self._segments for m in segment.chat_messages]
+        return {
+            "segments": len(self._segments),
+            "chat_messages": len(rendered),
+            "approx_bytes": sum(sys.getsizeof(m.content or "") for m in messages)
+            + sum(sys.getsizeof(m.content) for m in rendered),
+        }
+
+    def _apply(self, msg: Message):
+        if msg.type == MessageType.SYSTEM_RECALL:
+            self._apply_recall(msg)
+
+        if self._head_decided:
+            self._add_segment(_Segment(message=msg))
+            return
+
+        self._head.append(msg)
+        if len(self._head) < GREETING_BLOCK_SIZE:
+            return
+
+        head, self._head = self._head, []
+        self._head_decided = True
+        if is_greeting_block(head):
+            # The greeting collapses into one segment; its messages are not
+            # indexed, so recalls inside it do not change the projection.
+            self._add_segment(
+                _Segment(
+                    message=head[0],
+                    seq=head[GREETING_BLOCK_SIZE - 1].seq or 0,
+                    greeting=True,
+                    volatile=True,
+                ),
+                index=False,
+            )
+            head = head[GREETING_BLOCK_SIZE:]
+        for item in head:
+            self._add_segment(_Segment(message=item))
+
+    def _apply_recall(self, recall: Message):
+        target_id = (recall.metadata or {}).get("target_message_id")
+        if not target_id:
+            return
+        segment = self._by_id.get(target_id)
+        if segment is not None:
+            segment.message.is_recalled = True
+            segment.chat_messages = self._render(segment)
+            return
+        for msg in self._head:
+            if msg.id == target_id:
+                msg.is_recalled = True
+
+    def _add_segment(self, segment: _Segment, index: bool = True):
+        if not segment.greeting:
+            segment.seq = segment.message.seq or 0
+            segment.volatile = self._is_volatile(segment.message)
+        segment.chat_messages = self._render(segment)
+        self._segments.append(segment)
+        if index:
+            self._by_id[segment.message.id] = segment
+
+    def _render(self, segment: _Segment) -> List[ChatMessage]:
+        if segment.greeting:
+            return self._render_greeting(segment.message)
+        return self._render_message(segment.message)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, ItemsView, Optional
+
+from src.services.session.session_service import SessionService
+from src.core.utils.logger import (
+    unified_logger,
+    broadcast_log_if_needed,
+    LogCategory,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry:
+    """
+    Live SessionService instances, bounded by count and idle time.
+
+    Services are kept in LRU order, touched on init and on every inbound
+    message. A background sweep stops services idle for longer than
+    `idle_timeout`, and adding one past `max_sessions` stops the least
+    recently used. Busy services (a reply queued, generating or playing) are
+    never evicted, so the bound may be exceeded briefly. The init payload of
+    an evicted session is kept (up to `max_dormant`) so the next message can
+    rebuild its service; history, summary and emotion live in the database.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        idle_timeout: float,
+        sweep_interval: float,
+        max_dormant: int,
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = max(0.0, idle_timeout)
+        self.sweep_interval = max(1.0, sweep_interval)
+        self.max_dormant = max(0, max_dormant)
+        self._services: "OrderedDict[str, SessionService]" = OrderedDict()
+        self._init_payloads: Dict[str, Dict[str, Any]] = {}
+        self._dormant: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self._evicted_idle = 0
+        self._evicted_capacity = 0
+        self._rehydrated = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._services
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def get(self, session_id: str) -> Optional[SessionService]:
+        return self._services.get(session_id)
+
+    def items(self) -> ItemsView[str, SessionService]:
+        return self._services.items()
+
+    def touch(self, session_id: str):
+        if session_id in self._services:
+            self._services.move_to_end(session_id)
+
+    async def add(
+        self, session_id: str, service: SessionService, init_payload: Dict[str, Any]
+    ):
+        """Register a started service; `init_payload` is what rebuilds it later."""
+        previous = self._services.pop(session_id, None)
+        if previous is not None and previous is not service:
+            await previous.stop()
+        self._services[session_id] = service
+        self._init_payloads[session_id] = init_payload
+        self._dormant.pop(session_id, None)
+        self._ensure_sweeper()
+
+        while len(self._services) > self.max_sessions:
+            victim = next(
+                (
+                    sid
+                    for sid, candidate in self._services.items()
+                    if sid != session_id and not candidate.is_busy
+                ),
+                None,
+            )
+            if victim is None:
+                break
+            if not await self._evict(victim, "capacity", only_if_idle=True):
+                break
+
+    async def remove(self, session_id: str):
+        """Stop and forget a session (cleared, reinitialized or deleted)."""
+        self._dormant.pop(session_id, None)
+        self._init_payloads.pop(session_id, None)
+        service = self._services.pop(session_id, None)
+        if service is not None:
+            await service.stop()
+
+    def take_dormant(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Init payload of an evicted session, consumed by the rebuild."""
+        payload = self._dormant.pop(session_id, None)
+        if payload is not None:
+            self._rehydrated += 1
+        return payload
+
+    async def evict_idle(self) -> int:
+        if not self.idle_timeout:
+            return 0
+        now = time.monotonic()
+        idle = [
+            sid
+            for sid, service in self._services.items()
+            if now - service.last_active > self.idle_timeout and not service.is_busy
+        ]
+        evicted = 0
+        for sid in idle:
+            # Earlier evictions await; a message may have arrived meanwhile
+            if await self._evict(sid, "idle", only_if_idle=True):
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        """Forget everything (services must already be stopped)."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        self._services.clear()
+        self._init_payloads.clear()
+        self._dormant.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        per_session = {
+            sid: service.get_memory_stats() for sid, service in self._services.items()
+        }
+        return {
+            "active": len(self._services),
+            "max_active": self.max_sessions,
+            "dormant": len(self._dormant),
+            "idle_timeout": self.idle_timeout,
+            "evicted_idle": self._evicted_idle,
+            "evicted_capacity": self._evicted_capacity,
+            "rehydrated": self._rehydrated,
+            "approx_bytes": sum(s["approx_bytes"] for s in per_session.values()),
+            "sessions": per_session,
+        }
+
+    def _evictable(self, service: SessionService, reason: str) -> bool:
+        if service.is_busy:
+            return False
+        if reason == "idle":
+            return time.monotonic() - service.last_active > self.idle_timeout
+        return True
+
+    async def _evict(self, session_id: str, reason: str, only_if_idle: bool = False) -> bool:
+        """
+        Stop a service and keep its init payload. With `only_if_idle` the
+        service is re-checked right before removal and kept if it became busy
+        (or, for idle sweeps, active) since the candidate list was built.
+        """
+        service = self._services.get(session_id)
+        if service is None:
+            return False
+        if only_if_idle and not self._evictable(service, reason):
+            return False
+        del self._services[session_id]
+        payload = self._init_payloads.pop(session_id, None)
+        if payload is not None and self.max_dormant:
+            self._dormant[session_id] = payload
+            while len(self._dormant) > self.max_dormant:
+                self._dormant.popitem(last=False)
+        if reason == "idle":
+            self._evicted_idle += 1
+        else:
+            self._evicted_capacity += 1
+
+        try:
+            await service.stop()
+        except Exception as e:
+            logger.error(f"Error stopping evicted SessionService {session_id}: {e}")
+
+        log_entry = unified_logger.info(
+            f"SessionService evicted for session {session_id} ({reason})",
+            category=LogCategory.WEBSOCKET,
+            metadata={"session_id": session_id, "reason": reason, "active": len(self)},
+        )
+        await broadcast_log_if_needed(log_entry)
+        return True
+
+    def _ensure_sweeper(self):
+        if not self.idle_timeout:
+            return
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f"Idle session sweep failed: {e}", exc_info=True)
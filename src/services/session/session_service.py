@@ -1,15 +1,23 @@
 import asyncio
 import logging
+import sys
+import time
 from datetime import datetime, timezone
-from typing import List, Any
+from typing import Any, Dict, List, Optional
 from src.services.llm.llm_service import LLMService
+from src.services.llm.resilience import CircuitOpenError
 from src.core.schemas import LLMConfig, ChatMessage
 from src.services.behavior.coordinator import BehaviorCoordinator
+from src.services.behavior.scheduler import ScheduledTimeline, timeline_scheduler
 from src.core.models.behavior import PlaybackAction
 from src.services.messaging.message_service import MessageService
+from src.services.session.history_projection import HistoryProjection
+from src.services.session.summarizer import ConversationSummarizer, format_summary
+from src.services.session.stream_playback import StreamedReplyPlayback
 from src.core.models.message import Message, MessageType
 from src.core.models.character import Character
 from src.core.models.constants import DEFAULT_USER_AVATAR, DEFAULT_USER_ID
+from src.core.configs import session_config
 from src.core.utils.logger import (
     unified_logger,
     broadcast_log_if_needed,
@@ -45,18 +53,42 @@ class SessionService:
 
         self.coordinator = BehaviorCoordinator(character)
         self.tool_service = ToolService(message_service)
+        self.history_projection = HistoryProjection(
+            self._project_message,
+            self._project_greeting,
+            is_volatile=self._is_unresolved_image,
+        )
+        self.summarizer = ConversationSummarizer(self.llm_client, message_service)
+        self._summary: Optional[Dict[str, Any]] = None
         self._running = False
         self._tasks = []
         self.session_id = None
+        # Monotonic time of the last start or inbound message (idle eviction)
+        self.last_active = time.monotonic()
+
+        # Inbound queue: the newest unanswered message of the current burst,
+        # how many messages the burst holds, and the tasks of the turn in flight
+        self._pending_message: Optional[Message] = None
+        self._pending_count = 0
+        self._inbound = asyncio.Event()
+        self._inbound_worker: Optional[asyncio.Task] = None
+        self._turn_tasks: List[asyncio.Task] = []
+        # Timelines of this session playing on the shared scheduler
+        self._timelines: List[ScheduledTimeline] = []
 
     async def start(self, session_id: str):
         self._running = True
         self.session_id = session_id
+        self.last_active = time.monotonic()
         logger.info(f"SessionService started for session {session_id}")
 
     async def stop(self):
         self._running = False
 
+        for timeline in self._timelines:
+            timeline_scheduler.cancel(timeline)
+        self._timelines.clear()
+
         # Cancel all pending tasks
         for task in self._tasks:
             if not task.done():
@@ -68,10 +100,38 @@ class SessionService:
 
         self._tasks.clear()
 
-        # Close the HTTP client
+        # Release the LLM client (HTTP connections are pooled process-wide)
         await self.llm_client.close()
         logger.info("SessionService stopped")
 
+    @property
+    def is_busy(self) -> bool:
+        """A reply is queued, generating or playing, or background work is running."""
+        if self._pending_message is not None:
+            return True
+        if any(t.active for t in self._timelines):
+            return True
+        return any(
+            not task.done() for task in self._tasks if task is not self._inbound_worker
+        )
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Per-session resident state, for operator metrics."""
+        history = self.history_projection.get_stats()
+        summary_bytes = (
+            sys.getsizeof(self._summary.get("text") or "") if self._summary else 0
+        )
+        return {
+            "character_id": getattr(self.character, "id", None),
+            "busy": self.is_busy,
+            "idle_seconds": round(time.monotonic() - self.last_active, 1),
+            "history_segments": history["segments"],
+            "history_chat_messages": history["chat_messages"],
+            "tasks": sum(not task.done() for task in self._tasks),
+            "timelines": sum(t.active for t in self._timelines),
+            "approx_bytes": history["approx_bytes"] + summary_bytes,
+        }
+
     def update_character(self, character: Character):
         """Update the character configuration for this SessionService instance.
 
@@ -82,6 +142,100 @@ class SessionService:
         self.coordinator = BehaviorCoordinator(character)
         logger.info(f"Character configuration updated for session {self.session_id}")
 
+    async def enqueue_user_message(self, user_message: Message):
+        """
+        Hand a user message to this session's reply worker without waiting for the reply.
+
+        Messages arriving within SESSION_INBOUND_DEBOUNCE_MS of each other are
+        coalesced into one turn (history is read from the database, so that turn
+        sees all of them). With SESSION_SUPERSEDE_ON_NEW_INPUT, new input cancels
+        the turn in flight: its LLM call and whatever part of its timeline has
+        not played yet.
+        """
+        if not self._running:
+            return
+
+        self.last_active = time.monotonic()
+        self._pending_message = user_message
+        self._pending_count += 1
+        if session_config.supersede_on_new_input:
+            await self._supersede_turn()
+
+        self._inbound.set()
+        if self._inbound_worker is None or self._inbound_worker.done():
+            self._inbound_worker = asyncio.create_task(self._run_inbound())
+            self._track_task(self._inbound_worker)
+
+    async def _run_inbound(self):
+        window = max(0, session_config.inbound_debounce_ms) / 1000
+        while self._running:
+            await self._inbound.wait()
+            # Debounce: start the turn once a full window passes without input
+            while True:
+                self._inbound.clear()
+                if window <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._inbound.wait(), timeout=window)
+                except asyncio.TimeoutError:
+                    break
+
+            message, count = self._pending_message, self._pending_count
+            self._pending_message, self._pending_count = None, 0
+            if message is None or not self._running:
+                continue
+
+            if count > 1:
+                log_entry = unified_logger.info(
+                    f"Coalesced {count} user messages into one turn",
+                    category=LogCategory.LLM,
+                    metadata={"session_id": self.session_id, "messages": count},
+                )
+                await broadcast_log_if_needed(log_entry)
+
+            turn = asyncio.create_task(self.process_user_message(message))
+            self._track_turn_task(turn)
+            # A superseded turn ends cancelled; keep serving the inbox either way
+            await asyncio.wait({turn})
+
+    async def _supersede_turn(self):
+        """Cancel the current turn's LLM call and unplayed timeline."""
+        pending = [task for task in self._turn_tasks if not task.done()]
+        timelines = [t for t in self._timelines if t.active]
+        self._turn_tasks = []
+        self._timelines = []
+        if not pending and not timelines:
+            return
+
+        for task in pending:
+            task.cancel()
+        for timeline in timelines:
+            timeline_scheduler.cancel(timeline)
+        await asyncio.gather(*pending, return_exceptions=True)
+        # A cancelled timeline may have left the typing indicator on
+        await self._set_typing(self.session_id, False)
+
+        log_entry = unified_logger.info(
+            "Reply superseded by new user input",
+            category=LogCategory.LLM,
+            metadata={
+                "session_id": self.session_id,
+                "cancelled_tasks": len(pending),
+                "cancelled_timelines": len(timelines),
+            },
+        )
+        await broadcast_log_if_needed(log_entry)
+
+    def _track_task(self, task: asyncio.Task):
+        # Finished tasks are dropped so long-lived sessions do not accumulate them
+        self._tasks = [t for t in self._tasks if not t.done()]
+        self._tasks.append(task)
+
+    def _track_turn_task(self, task: asyncio.Task):
+        self._track_task(task)
+        self._turn_tasks = [t for t in self._turn_tasks if not t.done()]
+        self._turn_tasks.append(task)
+
     async def process_user_message(self, user_message: Message):
         if not self._running:
             return
@@ -94,14 +248,31 @@ class SessionService:
             while iteration < MAX_TOOL_CALL_ITERATIONS:
                 iteration += 1
 
-                history = await self.message_service.get_messages(
+                conversation_history = await self._build_llm_history(
                     user_message.session_id
                 )
-                conversation_history = self._build_llm_history(history)
-                llm_response = await self.llm_client.chat(conversation_history)
+                playback = self._new_stream_playback(user_message.session_id)
+                try:
+                    llm_response = await self.llm_client.chat(
+                        conversation_history,
+                        on_partial=playback.on_partial,
+                        session_id=user_message.session_id,
+                    )
+                except asyncio.CancelledError:
+                    # Superseded or stopped: drop the partly played reply as well
+                    if playback.task:
+                        playback.task.cancel()
+                    raise
+                except BaseException:
+                    playback.close()
+                    raise
+                finally:
+                    if playback.task:
+                        self._track_turn_task(playback.task)
 
                 # Handle invalid JSON or empty content - skip processing entirely
                 if llm_response.is_invalid_json or llm_response.is_empty_content:
+                    playback.close()
                     reason = (
                         "invalid_json"
                         if llm_response.is_invalid_json
@@ -138,6 +309,8 @@ class SessionService:
 
                 # Check if LLM wants to use tools
                 if llm_response.tool_calls:
+                    # Segments already streamed stay sent; the rest is dropped.
+                    playback.close()
                     log_entry = unified_logger.info(
                         f"LLM requested {len(llm_response.tool_calls)} tool calls (iteration {iteration})",
                         category=LogCategory.LLM,
@@ -193,13 +366,14 @@ class SessionService:
                             # Handle special side effects (blocking, recalling)
                             if tool_name == "block_user" and result.get("success"):
                                 # Broadcast the blocked message
-                                messages = await self.message_service.get_messages(
-                                    user_message.session_id
+                                blocked_msg = (
+                                    await self.message_service.get_latest_message_by_type(
+                                        user_message.session_id,
+                                        MessageType.SYSTEM_BLOCKED,
+                                    )
                                 )
-                                for msg in reversed(messages):
-                                    if msg.type == MessageType.SYSTEM_BLOCKED:
-                                        await self._broadcast_message(msg)
-                                        break
+                                if blocked_msg:
+                                    await self._broadcast_message(blocked_msg)
 
                                 # Set flag to terminate loop after blocking
                                 should_terminate = True
@@ -278,36 +452,10 @@ class SessionService:
                 )
                 return
 
-            # Determine the emotion_map to use
-            emotion_map_to_use = llm_response.emotion_map
-
-            # If emotion_map is empty, reuse the last emotion state
-            if not emotion_map_to_use:
-                last_emotion = await self.message_service.get_latest_emotion_state(
-                    user_message.session_id
-                )
-                if last_emotion:
-                    emotion_map_to_use = last_emotion
-                    log_entry = unified_logger.info(
-                        "Reusing last emotion state (LLM returned no emotions)",
-                        category=LogCategory.EMOTION,
-                        metadata={
-                            "session_id": user_message.session_id,
-                            "last_emotion": last_emotion,
-                        },
-                    )
-                    await broadcast_log_if_needed(log_entry)
-                else:
-                    # No previous emotion state exists, use neutral as absolute fallback
-                    emotion_map_to_use = {"neutral": "low"}
-                    log_entry = unified_logger.info(
-                        "No emotion from LLM and no previous state, using neutral fallback",
-                        category=LogCategory.EMOTION,
-                        metadata={
-                            "session_id": user_message.session_id,
-                        },
-                    )
-                    await broadcast_log_if_needed(log_entry)
+            # Determine the emotion_map to use (either new or reused)
+            emotion_map_to_use = playback.emotion_map or await self._resolve_emotion_map(
+                user_message.session_id, llm_response.emotion_map
+            )
 
             # Only update emotion state if we have valid emotions from LLM
             if llm_response.emotion_map:
@@ -340,68 +488,85 @@ class SessionService:
                 except Exception:
                     pass
 
-            # Use emotion_map_to_use for behavior processing (either new or reused)
-            timeline = self.coordinator.process_message(
-                llm_response.reply, emotion_map=emotion_map_to_use
-            )
+            if playback.started:
+                # Segments already played while streaming; queue the remainder.
+                playback.finish(llm_response.reply)
+                await self._broadcast_sticker_logs()
+                log_entry = unified_logger.behavior(
+                    action="Streamed reply finished",
+                    details={
+                        "segments": playback.segments,
+                        "reply": llm_response.reply,
+                    },
+                )
+                await broadcast_log_if_needed(log_entry)
+            else:
+                # Use emotion_map_to_use for behavior processing (either new or reused)
+                timeline = self.coordinator.process_message(
+                    llm_response.reply, emotion_map=emotion_map_to_use
+                )
+                await self._broadcast_sticker_logs()
+
+                behavior_summary = []
+                for action in timeline:
+                    parts = [f"{action.type}@{action.timestamp:.2f}s"]
+                    if action.type == "send":
+                        preview = (
+                            action.text[:30] + "..."
+                            if len(action.text) > 30
+                            else action.text
+                        )
+                        parts.append(f"'{preview}'")
+                    behavior_summary.append(" ".join(parts))
+
+                log_entry = unified_logger.behavior(
+                    action="Timeline generated",
+                    details={
+                        "actions": behavior_summary,
+                        "total": len(timeline),
+                        "reply": llm_response.reply,
+                    },
+                )
+                await broadcast_log_if_needed(log_entry)
 
-            sticker_log_entries = self.coordinator.get_and_clear_log_entries()
-            for entry in sticker_log_entries:
-                await broadcast_log_if_needed(entry)
-
-            behavior_summary = []
-            for action in timeline:
-                parts = [f"{action.type}@{action.timestamp:.2f}s"]
-                if action.type == "send":
-                    preview = (
-                        action.text[:30] + "..."
-                        if len(action.text) > 30
-                        else action.text
+                # Full timeline for debugging (rendered via log metadata).
+                full_timeline = []
+                for a in timeline:
+                    full_timeline.append(
+                        {
+                            "type": getattr(a, "type", None),
+                            "timestamp": getattr(a, "timestamp", None),
+                            "text": getattr(a, "text", None),
+                            "target_id": getattr(a, "target_id", None),
+                            "metadata": getattr(a, "metadata", None),
+                        }
                     )
-                    parts.append(f"'{preview}'")
-                behavior_summary.append(" ".join(parts))
-
-            log_entry = unified_logger.behavior(
-                action="Timeline generated",
-                details={
-                    "actions": behavior_summary,
-                    "total": len(timeline),
-                    "reply": llm_response.reply,
-                },
-            )
-            await broadcast_log_if_needed(log_entry)
-
-            # Full timeline for debugging (rendered via log metadata).
-            full_timeline = []
-            for a in timeline:
-                full_timeline.append(
-                    {
-                        "type": getattr(a, "type", None),
-                        "timestamp": getattr(a, "timestamp", None),
-                        "text": getattr(a, "text", None),
-                        "target_id": getattr(a, "target_id", None),
-                        "metadata": getattr(a, "metadata", None),
-                    }
+                log_entry = unified_logger.behavior(
+                    action="Timeline full",
+                    details={"timeline": full_timeline},
                 )
-            log_entry = unified_logger.behavior(
-                action="Timeline full",
-                details={"timeline": full_timeline},
-            )
-            await broadcast_log_if_needed(log_entry)
+                await broadcast_log_if_needed(log_entry)
+
+                await self._schedule_timeline(timeline, user_message.session_id)
 
-            task = asyncio.create_task(
-                self._execute_timeline(timeline, user_message.session_id)
+            # Fold older turns into the rolling summary while the reply plays back
+            summary_task = self.summarizer.maybe_schedule(
+                user_message.session_id, self.history_projection, self._summary
             )
-            self._tasks.append(task)
+            if summary_task:
+                self._track_task(summary_task)
 
         except Exception as e:
             logger.error(f"Error processing user message: {e}", exc_info=True)
             # Do not inject synthetic assistant messages on failure.
             # Notify frontend via toast and debug logs instead.
+            toast = (
+                "LLM 服务暂时不可用，请稍后再试。"
+                if isinstance(e, CircuitOpenError)
+                else "LLM 请求失败，请检查设置和日志。"
+            )
             await self.ws_manager.send_toast(
-                user_message.session_id,
-                "LLM 请求失败，请检查设置和日志。",
-                level="error",
+                user_message.session_id, toast, level="error"
             )
             log_entry = unified_logger.error(
                 "LLM request failed",
@@ -410,8 +575,79 @@ class SessionService:
             )
             await broadcast_log_if_needed(log_entry)
 
+    async def _broadcast_sticker_logs(self):
+        sticker_log_entries = self.coordinator.get_and_clear_log_entries()
+        for entry in sticker_log_entries:
+            await broadcast_log_if_needed(entry)
+
+    async def _resolve_emotion_map(
+        self, session_id: str, emotion_map: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Emotion used for behavior: the LLM's, else the last state, else neutral."""
+        emotion_map_to_use = emotion_map
+
+        # If emotion_map is empty, reuse the last emotion state
+        if not emotion_map_to_use:
+            last_emotion = await self.message_service.get_latest_emotion_state(
+                session_id
+            )
+            if last_emotion:
+                emotion_map_to_use = last_emotion
+                log_entry = unified_logger.info(
+                    "Reusing last emotion state (LLM returned no emotions)",
+                    category=LogCategory.EMOTION,
+                    metadata={
+                        "session_id": session_id,
+                        "last_emotion": last_emotion,
+                    },
+                )
+                await broadcast_log_if_needed(log_entry)
+            else:
+                # No previous emotion state exists, use neutral as absolute fallback
+                emotion_map_to_use = {"neutral": "low"}
+                log_entry = unified_logger.info(
+                    "No emotion from LLM and no previous state, using neutral fallback",
+                    category=LogCategory.EMOTION,
+                    metadata={
+                        "session_id": session_id,
+                    },
+                )
+                await broadcast_log_if_needed(log_entry)
+
+        return emotion_map_to_use
+
+    def _new_stream_playback(self, session_id: str) -> StreamedReplyPlayback:
+        async def run_timeline(timeline: List[PlaybackAction]):
+            await self._execute_timeline(timeline, session_id)
+
+        async def resolve_emotion(emotion_map: Dict[str, str]) -> Dict[str, str]:
+            return await self._resolve_emotion_map(session_id, emotion_map)
+
+        async def set_typing(is_typing: bool):
+            await self._set_typing(session_id, is_typing)
+
+        return StreamedReplyPlayback(
+            self.coordinator, run_timeline, resolve_emotion, set_typing
+        )
+
+    async def _set_typing(self, session_id: str, is_typing: bool):
+        typing_msg = await self.message_service.set_typing_state(
+            session_id, self.user_id, is_typing
+        )
+        await self._broadcast_message(typing_msg)
+
     async def _execute_timeline(self, timeline: List[PlaybackAction], session_id: str):
-        start_time = datetime.now(timezone.utc).timestamp()
+        """Play a timeline on the shared scheduler and wait until it finishes."""
+        await (await self._schedule_timeline(timeline, session_id)).wait()
+
+    async def _schedule_timeline(
+        self, timeline: List[PlaybackAction], session_id: str
+    ) -> ScheduledTimeline:
+        """
+        Hand a timeline to the process-wide TimelineScheduler. Timestamps are
+        relative to now; the session keeps the handle so new input or stop()
+        can cancel what has not played yet.
+        """
         sent_timestamps_by_id: dict[str, float] = {}
         recalled_target_ids: set[str] = set()
 
@@ -422,110 +658,117 @@ class SessionService:
         )
         await broadcast_log_if_needed(log_entry)
 
-        for action in timeline:
-            if not self._running:
-                break
+        async def run_action(action: PlaybackAction):
+            if self._running:
+                await self._run_action(
+                    action, session_id, sent_timestamps_by_id, recalled_target_ids
+                )
 
-            scheduled_time = start_time + action.timestamp
-            current_time = datetime.now(timezone.utc).timestamp()
-            wait_time = max(0, scheduled_time - current_time)
+        async def on_complete():
+            try:
+                await self.message_service.flush_pending_writes()
+            except Exception as e:
+                logger.error(f"Error flushing timeline writes: {e}", exc_info=True)
 
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
+            log_entry = unified_logger.info(
+                "Timeline execution completed",
+                metadata={"session_id": session_id},
+                category=LogCategory.BEHAVIOR,
+            )
+            await broadcast_log_if_needed(log_entry)
 
-            try:
-                if action.type == "typing_start":
-                    typing_msg = await self.message_service.set_typing_state(
-                        session_id, self.user_id, True
-                    )
-                    await self._broadcast_message(typing_msg)
+        handle = timeline_scheduler.schedule(session_id, timeline, run_action, on_complete)
+        self._timelines = [t for t in self._timelines if t.active]
+        self._timelines.append(handle)
+        return handle
 
-                elif action.type == "typing_end":
-                    typing_msg = await self.message_service.set_typing_state(
-                        session_id, self.user_id, False
-                    )
-                    await self._broadcast_message(typing_msg)
+    async def _run_action(
+        self,
+        action: PlaybackAction,
+        session_id: str,
+        sent_timestamps_by_id: dict[str, float],
+        recalled_target_ids: set[str],
+    ):
+        try:
+            if action.type == "typing_start":
+                await self._set_typing(session_id, True)
 
-                elif action.type == "send":
-                    if action.metadata and action.metadata.get("is_correction") is True:
-                        correction_for = action.metadata.get("correction_for")
-                        if correction_for and correction_for not in recalled_target_ids:
-                            continue
+            elif action.type == "typing_end":
+                await self._set_typing(session_id, False)
 
-                    messages = await self.message_service.send_message_with_time(
-                        session_id=session_id,
-                        sender_id=self.user_id,
-                        message_type=MessageType.TEXT,
-                        content=action.text,
-                        metadata=action.metadata,
-                        message_id=action.message_id,
-                    )
-                    for message in messages:
-                        await self._broadcast_message(message)
-                    if messages:
-                        last_msg = messages[-1]
-                        if last_msg and last_msg.id and last_msg.timestamp:
-                            sent_timestamps_by_id[str(last_msg.id)] = float(
-                                last_msg.timestamp
-                            )
+            elif action.type == "send":
+                if action.metadata and action.metadata.get("is_correction") is True:
+                    correction_for = action.metadata.get("correction_for")
+                    if correction_for and correction_for not in recalled_target_ids:
+                        return
 
-                elif action.type == "image":
-                    sticker_url = f"/api/stickers/{action.text}"
-                    messages = await self.message_service.send_message_with_time(
-                        session_id=session_id,
-                        sender_id=self.user_id,
-                        message_type=MessageType.IMAGE,
-                        content=sticker_url,
-                        metadata=action.metadata,
-                        message_id=action.message_id,
-                    )
-                    for message in messages:
-                        await self._broadcast_message(message)
-                    if messages:
-                        last_msg = messages[-1]
-                        if last_msg and last_msg.id and last_msg.timestamp:
-                            sent_timestamps_by_id[str(last_msg.id)] = float(
-                                last_msg.timestamp
-                            )
+                messages = await self.message_service.send_message_with_time(
+                    session_id=session_id,
+                    sender_id=self.user_id,
+                    message_type=MessageType.TEXT,
+                    content=action.text,
+                    metadata=action.metadata,
+                    message_id=action.message_id,
+                )
+                for message in messages:
+                    await self._broadcast_message(message)
+                if messages:
+                    last_msg = messages[-1]
+                    if last_msg and last_msg.id and last_msg.timestamp:
+                        sent_timestamps_by_id[str(last_msg.id)] = float(
+                            last_msg.timestamp
+                        )
 
-                elif action.type == "recall":
-                    if not action.target_id:
-                        continue
-
-                    target_id = str(action.target_id)
-                    target_ts = None
-                    if action.metadata:
-                        target_ts = action.metadata.get("target_timestamp")
-                    if not target_ts:
-                        target_ts = sent_timestamps_by_id.get(target_id)
-                    if not target_ts:
-                        original = await self.message_service.get_message(target_id)
-                        target_ts = original.timestamp if original else 0
-
-                    recall_msg = await self.message_service.recall_message(
-                        session_id=session_id,
-                        message_id=target_id,
-                        timestamp=float(target_ts or 0),
-                        recalled_by=self.user_id,
-                    )
-                    if recall_msg:
-                        recalled_target_ids.add(target_id)
-                        await self._broadcast_message(recall_msg)
+            elif action.type == "image":
+                sticker_url = f"/api/stickers/{action.text}"
+                messages = await self.message_service.send_message_with_time(
+                    session_id=session_id,
+                    sender_id=self.user_id,
+                    message_type=MessageType.IMAGE,
+                    content=sticker_url,
+                    metadata=action.metadata,
+                    message_id=action.message_id,
+                )
+                for message in messages:
+                    await self._broadcast_message(message)
+                if messages:
+                    last_msg = messages[-1]
+                    if last_msg and last_msg.id and last_msg.timestamp:
+                        sent_timestamps_by_id[str(last_msg.id)] = float(
+                            last_msg.timestamp
+                        )
 
-                elif action.type == "wait":
-                    pass
+            elif action.type == "recall":
+                if not action.target_id:
+                    return
 
-            except Exception as e:
-                logger.error(
-                    f"Error executing action {action.type}: {e}", exc_info=True
+                target_id = str(action.target_id)
+                target_ts = None
+                if action.metadata:
+                    target_ts = action.metadata.get("target_timestamp")
+                if not target_ts:
+                    target_ts = sent_timestamps_by_id.get(target_id)
+                if not target_ts:
+                    original = await self.message_service.get_message(target_id)
+                    target_ts = original.timestamp if original else 0
+
+                recall_msg = await self.message_service.recall_message(
+                    session_id=session_id,
+                    message_id=target_id,
+                    timestamp=float(target_ts or 0),
+                    recalled_by=self.user_id,
                 )
+                if recall_msg:
+                    recalled_target_ids.add(target_id)
+                    await self._broadcast_message(recall_msg)
 
-        log_entry = unified_logger.info(
-            "Timeline execution completed",
-            metadata={"session_id": session_id},
-            category=LogCategory.BEHAVIOR,
-        )
-        await broadcast_log_if_needed(log_entry)
+            elif action.type == "wait":
+                pass
+
+        except Exception as e:
+            logger.error(
+                f"Error executing action {action.type}: {e}", exc_info=True
+            )
 
     async def _resolve_user_avatar(self) -> str:
         """Resolve the latest user avatar for the current session."""
@@ -557,16 +800,17 @@ class SessionService:
                 "is_recalled": message.is_recalled,
                 "is_read": message.is_read,
                 "timestamp": message.timestamp,
+                "seq": message.seq,
             },
         }
         await self.ws_manager.send_to_conversation(message.session_id, event)
 
-    def _build_llm_history(self, history: List[Message]) -> List[ChatMessage]:
+    async def _build_llm_history(self, session_id: str) -> List[ChatMessage]:
         """
-        Build the LLM input messages from DB history.
+        Build the LLM input messages from the session's incremental projection.
 
         Rules:
-        - Filter out SYSTEM_TYPING messages.
+        - Filter out SYSTEM_TYPING / SYSTEM_EMOTION rows (legacy; state lives in session_state).
         - Filter out SYSTEM_RECALL messages.
         - Keep recalled messages but add a system message after them indicating recall.
         - Keep all 3 roles' messages (system/user/assistant), except the greeting hijack:
@@ -574,100 +818,96 @@ class SessionService:
             1) the first system-time message
             2) a synthetic system-hint:
                "你已接受{user_nickname}的好友请求，现在可以开始聊天了。"
-        """
-
-        if not history:
-            return []
-
-        # Detect the initial greeting block (5 messages created by MessageService.create_session).
-        greeting_block = False
-        if len(history) >= 5:
-            m0, m1, m2, m3, m4 = (
-                history[0],
-                history[1],
-                history[2],
-                history[3],
-                history[4],
-            )
-            greeting_block = (
-                m0.sender_id == "system"
-                and m0.type == MessageType.SYSTEM_TIME
-                and m1.sender_id == "system"
-                and m1.type == MessageType.SYSTEM_HINT
-                and m2.sender_id == "user"
-                and m2.type == MessageType.TEXT
-                and (m2.content or "").startswith("我是")
-                and m3.sender_id == "assistant"
-                and m3.type == MessageType.TEXT
-                and (m3.content or "").startswith("我是")
-                and m4.sender_id == "system"
-                and m4.type == MessageType.SYSTEM_HINT
-                and ("打招呼" in (m4.content or "") or "以上" in (m4.content or ""))
-            )
-
-        nickname = (self.llm_client.config.user_nickname or "").strip() or "用户"
-        synthetic_hint = f"你已接受{nickname}的好友请求，现在可以开始聊天了。"
-
-        out: List[ChatMessage] = []
-
-        # Track the last emotion message to include only the latest state.
-        last_emotion_id = None
-        for msg in reversed(history):
-            if msg.type == MessageType.SYSTEM_EMOTION:
-                last_emotion_id = msg.id
-                break
+        - Append the current emotion state at the end so the LLM sees current emotions.
+        - Replace turns folded into the rolling summary with the summary text.
 
-        start_idx = 0
-        if greeting_block:
-            # Keep the first time message, then replace the remaining 4 greeting messages.
-            time_msg = history[0]
-            out.append(
+        Only messages newer than the projection's last seq are fetched and
+        rendered; the projection is rebuilt if the session was recreated.
+        """
+        projection = self.history_projection
+        if projection.session_id != session_id or (
+            projection.last_message_id is not None
+            and await self.message_service.get_message(projection.last_message_id)
+            is None
+        ):
+            projection.reset(session_id)
+
+        new_messages = await self.message_service.get_messages_after_seq(
+            session_id, projection.last_seq
+        )
+        projection.extend(new_messages)
+
+        head: List[ChatMessage] = []
+        through_seq = 0
+        summary = await self.message_service.get_summary_state(session_id)
+        # A summary past the transcript's end belongs to a deleted session.
+        if summary and 0 < int(summary.get("through_seq") or 0) <= projection.last_seq:
+            through_seq = int(summary["through_seq"])
+            head.append(format_summary(summary.get("text") or ""))
+            projection.discard_through(through_seq)
+        else:
+            summary = None
+        self._summary = summary
+
+        tail: List[ChatMessage] = []
+        emotion_state = await self.message_service.get_latest_emotion_state(session_id)
+        if emotion_state:
+            tail.append(
                 ChatMessage(
-                    role="system",
-                    content=self._format_system_time(time_msg.timestamp),
+                    role="system", content=self._format_emotion_state(emotion_state)
                 )
             )
-            out.append(ChatMessage(role="system", content=synthetic_hint))
-            start_idx = 5
-
-        for msg in history[start_idx:]:
-            # Skip SYSTEM_TYPING (input state) messages entirely
-            if msg.type == MessageType.SYSTEM_TYPING:
-                continue
-
-            # Only keep the latest SYSTEM_EMOTION state so LLM sees current emotions
-            if msg.type == MessageType.SYSTEM_EMOTION and msg.id != last_emotion_id:
-                continue
-
-            # Skip SYSTEM_RECALL messages
-            if msg.type == MessageType.SYSTEM_RECALL:
-                continue
+        return projection.build(tail, head=head, after_seq=through_seq)
+
+    def _project_message(self, msg: Message) -> List[ChatMessage]:
+        # State messages are never part of the prompt body; the current emotion is
+        # appended as the tail. Recall markers only flag their target.
+        if msg.type in (
+            MessageType.SYSTEM_TYPING,
+            MessageType.SYSTEM_EMOTION,
+            MessageType.SYSTEM_RECALL,
+        ):
+            return []
 
-            role: str
-            if msg.sender_id == "assistant":
-                role = "assistant"
-            elif msg.sender_id == "user":
-                role = "user"
-            else:
-                role = "system"
+        role: str
+        if msg.sender_id == "assistant":
+            role = "assistant"
+        elif msg.sender_id == "user":
+            role = "user"
+        else:
+            role = "system"
 
-            content = ""
-            if role == "system":
-                content = self._system_message_to_text(msg)
-            else:
-                content = self._user_message_to_text(msg)
+        content = ""
+        if role == "system":
+            content = self._system_message_to_text(msg)
+        else:
+            content = self._user_message_to_text(msg)
 
-            if content.strip():
-                out.append(ChatMessage(role=role, content=content))
+        out: List[ChatMessage] = []
+        if content.strip():
+            out.append(ChatMessage(role=role, content=content))
 
-            # If this message was recalled, add a system message indicating it
-            if msg.is_recalled and role in {"assistant", "user"}:
-                out.append(
-                    ChatMessage(role="system", content="系统提示：上一条消息已被撤回。")
-                )
+        # If this message was recalled, add a system message indicating it
+        if msg.is_recalled and role in {"assistant", "user"}:
+            out.append(ChatMessage(role="system", content="系统提示：上一条消息已被撤回。"))
 
         return out
 
+    def _project_greeting(self, time_msg: Message) -> List[ChatMessage]:
+        nickname = (self.llm_client.config.user_nickname or "").strip() or "用户"
+        synthetic_hint = f"你已接受{nickname}的好友请求，现在可以开始聊天了。"
+        return [
+            ChatMessage(
+                role="system", content=self._format_system_time(time_msg.timestamp)
+            ),
+            ChatMessage(role="system", content=synthetic_hint),
+        ]
+
+    def _is_unresolved_image(self, msg: Message) -> bool:
+        return msg.type == MessageType.IMAGE and not image_descriptions.get_description(
+            msg.content or ""
+        )
+
     def _format_system_time(self, timestamp: float) -> str:
         try:
             dt = datetime.fromtimestamp(timestamp, tz=timezone.utc).astimezone()
@@ -681,9 +921,7 @@ class SessionService:
         if msg.type == MessageType.SYSTEM_HINT:
             return msg.content or ""
         if msg.type == MessageType.SYSTEM_EMOTION:
-            meta = msg.metadata or {}
-            parts = [f"{k}={v}" for k, v in meta.items()]
-            return "Emotion state: " + (", ".join(parts) if parts else "neutral")
+            return self._format_emotion_state(msg.metadata or {})
         if msg.type == MessageType.SYSTEM_BLOCKED:
             return "系统提示：你已拉黑对方。"
         if msg.type == MessageType.SYSTEM_TOOL:
@@ -703,6 +941,10 @@ class SessionService:
         # Fallback for other system messages.
         return msg.content or ""
 
+    def _format_emotion_state(self, emotion_map: Dict[str, str]) -> str:
+        parts = [f"{k}={v}" for k, v in emotion_map.items()]
+        return "Emotion state: " + (", ".join(parts) if parts else "neutral")
+
     def _user_message_to_text(self, msg: Message) -> str:
         if msg.type == MessageType.TEXT:
             return msg.content or ""
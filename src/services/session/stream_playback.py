@@ -0,0 +1,103 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.core.models.behavior import PlaybackAction
+from src.services.behavior.coordinator import BehaviorCoordinator
+from src.services.llm.stream_parser import StreamingReplyParser
+
+TimelineRunner = Callable[[List[PlaybackAction]], Awaitable[None]]
+EmotionResolver = Callable[[Dict[str, str]], Awaitable[Dict[str, str]]]
+TypingSetter = Callable[[bool], Awaitable[None]]
+
+
+class StreamedReplyPlayback:
+    """
+    Plays a reply while the LLM is still generating it.
+
+    `on_partial` is the LLMService stream callback. Once the emotion is known
+    and the reply string starts, the lead-in (hesitation, typing indicator)
+    is queued; every segment the segmenter can no longer change gets its own
+    timeline. A single worker plays the timelines in order and keeps the
+    typing indicator on while it waits for the next segment. If the stream
+    turns into a tool call or stops parsing, nothing further is queued.
+    """
+
+    def __init__(
+        self,
+        coordinator: BehaviorCoordinator,
+        run_timeline: TimelineRunner,
+        resolve_emotion: EmotionResolver,
+        set_typing: TypingSetter,
+    ):
+        self.coordinator = coordinator
+        self._run_timeline = run_timeline
+        self._resolve_emotion = resolve_emotion
+        self._set_typing = set_typing
+        self._queue: "asyncio.Queue[Optional[List[PlaybackAction]]]" = asyncio.Queue()
+        self._closed = False
+        self.emotion_map: Optional[Dict[str, str]] = None
+        self.segments: List[str] = []
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self.task is not None
+
+    async def on_partial(self, parser: StreamingReplyParser):
+        if self._closed:
+            return
+        if parser.failed or parser.has_tool_calls:
+            # A tool turn replaces this reply; stop before playing more of it.
+            self.close()
+            return
+        if not parser.has_emotion or not parser.reply_started:
+            return
+
+        if self.emotion_map is None:
+            self.emotion_map = await self._resolve_emotion(parser.emotion_map)
+            self._enqueue(self.coordinator.stream_lead_in())
+        self._dispatch(
+            self.coordinator.stream_segments(parser.reply, final=parser.reply_done)
+        )
+
+    def finish(self, reply: str):
+        """Queue the rest of the completed reply (and sticker), then stop."""
+        if self._closed:
+            return
+        self._dispatch(self.coordinator.stream_segments(reply, final=True))
+        self._enqueue(self.coordinator.finish_stream(reply, self.emotion_map))
+        self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.task is not None:
+            self._queue.put_nowait(None)
+
+    def _dispatch(self, segments: List[str]):
+        for index in range(len(self.segments), len(segments)):
+            self._enqueue(
+                self.coordinator.process_stream_segment(
+                    segments[index], index, self.emotion_map
+                )
+            )
+            self.segments.append(segments[index])
+
+    def _enqueue(self, timeline: List[PlaybackAction]):
+        if not timeline:
+            return
+        self._queue.put_nowait(timeline)
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            timeline = await self._queue.get()
+            if timeline is None:
+                break
+            await self._run_timeline(timeline)
+            if self._queue.empty() and not self._closed:
+                # Still generating: show typing until the next segment is ready.
+                await self._set_typing(True)
+        await self._set_typing(False)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.core.configs import llm_defaults
+from src.core.schemas import ChatMessage
+from src.core.utils.logger import (
+    unified_logger,
+    broadcast_log_if_needed,
+    LogCategory,
+)
+from src.services.llm.context_budget import TokenEstimator, get_token_estimator
+from src.services.session.history_projection import HistoryProjection
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_PROMPT = """
+你负责为一段微信聊天记录写滚动摘要，供扮演聊天角色的模型日后参考。
+要求：
+1) 合并“已有摘要”和“新增聊天记录”，输出一段新的完整摘要，不要丢失已有摘要中的重要信息
+2) 保留人物关系、双方提到的事实与约定、未解决的话题、情绪变化和称呼习惯
+3) 省略寒暄和重复内容，不要编造聊天记录中没有的信息
+4) 使用中文第三人称叙述，只输出摘要正文，不超过 400 字
+""".strip()
+
+SUMMARY_HISTORY_PREFIX = "系统提示：以下是更早聊天记录的摘要。\n"
+
+
+def format_summary(text: str) -> ChatMessage:
+    return ChatMessage(role="system", content=f"{SUMMARY_HISTORY_PREFIX}{text}")
+
+
+class ConversationSummarizer:
+    """
+    Folds older turns of one session into a rolling summary in session_state.
+
+    After a reply, `maybe_schedule` checks the unsummarized part of the
+    history projection; past the message or token threshold it starts one
+    background task that summarizes everything except the newest
+    `keep_recent` messages. The prompt path only reads the stored summary,
+    so per-turn latency does not depend on summarization.
+    """
+
+    def __init__(
+        self,
+        llm_client,
+        message_service,
+        estimator: Optional[TokenEstimator] = None,
+    ):
+        self.llm_client = llm_client
+        self.message_service = message_service
+        self.estimator = estimator or get_token_estimator(
+            llm_defaults.context_tokenizer
+        )
+        self.enabled = llm_defaults.summary_enabled
+        self.trigger_messages = max(1, llm_defaults.summary_trigger_messages)
+        self.trigger_tokens = max(1, llm_defaults.summary_trigger_tokens)
+        self.keep_recent = max(1, llm_defaults.summary_keep_recent_messages)
+        self.max_tokens = llm_defaults.summary_max_tokens
+        self._task: Optional[asyncio.Task] = None
+
+    def maybe_schedule(
+        self,
+        session_id: str,
+        projection: HistoryProjection,
+        summary: Optional[Dict[str, Any]],
+    ) -> Optional[asyncio.Task]:
+        if not self.enabled or (self._task and not self._task.done()):
+            return None
+
+        through_seq = int((summary or {}).get("through_seq") or 0)
+        pending = projection.segments_after(through_seq)
+        if len(pending) <= self.keep_recent:
+            return None
+
+        pending_messages = [m for _, chat_messages in pending for m in chat_messages]
+        if len(pending_messages) < self.trigger_messages:
+            tokens = sum(self.estimator.count(m.content) for m in pending_messages)
+            if tokens < self.trigger_tokens:
+                return None
+
+        folded = pending[: -self.keep_recent]
+        new_through_seq = folded[-1][0]
+        transcript = [m for _, chat_messages in folded for m in chat_messages]
+        if not transcript:
+            return None
+
+        self._task = asyncio.create_task(
+            self._summarize(
+                session_id,
+                (summary or {}).get("text") or "",
+                transcript,
+                new_through_seq,
+            )
+        )
+        return self._task
+
+    async def _summarize(
+        self,
+        session_id: str,
+        previous: str,
+        transcript: List[ChatMessage],
+        through_seq: int,
+    ):
+        lines = [f"[{m.role}] {m.content}" for m in transcript]
+        request = [
+            ChatMessage(role="system", content=SUMMARY_PROMPT),
+            ChatMessage(
+                role="user",
+                content=(
+                    f"已有摘要：\n{previous or '（无）'}\n\n"
+                    "新增聊天记录：\n" + "\n".join(lines)
+                ),
+            ),
+        ]
+        try:
+            text = await self.llm_client.complete_text(
+                request, self.max_tokens, session_id=session_id
+            )
+            if not text:
+                return
+            await self.message_service.set_summary_state(session_id, text, through_seq)
+            log_entry = unified_logger.info(
+                "Conversation summary updated",
+                category=LogCategory.LLM,
+                metadata={
+                    "session_id": session_id,
+                    "through_seq": through_seq,
+                    "folded_messages": len(transcript),
+                    "summary_tokens": self.estimator.count(text),
+                },
+            )
+            await broadcast_log_if_needed(log_entry)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Conversation summary failed for {session_id}: {e}")
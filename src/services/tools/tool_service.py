@@ -146,10 +146,13 @@ class ToolService:
         Returns:
             Dictionary with list of recallable messages
         """
-        messages = await self.message_service.get_messages(session_id)
         current_time = datetime.now(timezone.utc).timestamp()
         # Claim 2 minutes but actually return 1.5 minutes (90 seconds)
         ninety_seconds_ago = current_time - 90
+        # Only load the recent tail instead of the whole transcript
+        messages = await self.message_service.get_messages(
+            session_id, ninety_seconds_ago - 1
+        )
 
         recallable = []
         for msg in messages:
@@ -0,0 +1,114 @@
+from src.services.llm.context_budget import (
+    MESSAGE_OVERHEAD_TOKENS,
+    OMITTED_HISTORY_HINT,
+    RECALL_NOTICE,
+    ContextBudget,
+    PrefixTracker,
+    TokenEstimator,
+)
+
+COST = 10 + MESSAGE_OVERHEAD_TOKENS
+
+
+class FlatEstimator(TokenEstimator):
+    """Every non-empty text is 10 tokens, so each message costs COST."""
+
+    name = "flat"
+
+    def count(self, text: str) -> int:
+        return 10 if text else 0
+
+
+def conversation(turns: int):
+    messages = [{"role": "system", "content": "persona"}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"turn {i}"})
+    messages.append({"role": "system", "content": "emotion state"})
+    return messages
+
+
+def contents(window):
+    return [m["content"] for m in window.messages]
+
+
+def test_under_budget_is_untouched():
+    messages = conversation(4)
+    window = ContextBudget(FlatEstimator(), budget=COST * len(messages)).fit(messages)
+    assert window.messages == messages
+    assert window.dropped == 0
+    assert window.token_count == COST * len(messages)
+
+
+def test_zero_budget_only_counts():
+    messages = conversation(50)
+    window = ContextBudget(FlatEstimator(), budget=0).fit(messages)
+    assert window.messages == messages
+    assert window.token_count == COST * len(messages)
+
+
+def test_drops_oldest_turns_and_keeps_system_messages():
+    messages = conversation(10)
+    window = ContextBudget(FlatEstimator(), budget=COST * 6).fit(messages)
+    kept = contents(window)
+    assert kept[0] == "persona"
+    assert kept[-1] == "emotion state"
+    assert kept[1] == OMITTED_HISTORY_HINT.format(count=window.dropped)
+    assert kept[2:-1] == [f"turn {i}" for i in range(window.dropped, 10)]
+    assert window.token_count <= window.budget
+    assert window.token_count == FlatEstimator().count_messages(window.messages)
+
+
+def test_min_recent_turns_are_never_dropped():
+    messages = conversation(10)
+    window = ContextBudget(FlatEstimator(), budget=COST * 3, min_recent=6).fit(messages)
+    assert contents(window)[-7:-1] == [f"turn {i}" for i in range(4, 10)]
+    assert window.dropped == 4
+    assert window.token_count > window.budget
+
+
+def test_drop_granularity_rounds_up_drops():
+    messages = conversation(20)
+    window = ContextBudget(FlatEstimator(), budget=COST * 12, drop_granularity=4).fit(messages)
+    assert window.dropped % 4 == 0
+    assert window.token_count <= window.budget
+
+
+def test_drop_granularity_keeps_the_prefix_stable_across_turns():
+    budget = ContextBudget(FlatEstimator(), budget=COST * 12, drop_granularity=4)
+    prefixes = []
+    for turns in range(20, 32):
+        window = budget.fit(conversation(turns))
+        prefixes.append(tuple(contents(window)[:3]))
+    # One new turn per request; the leading messages change every 4 turns.
+    changes = sum(1 for before, after in zip(prefixes, prefixes[1:]) if before != after)
+    assert changes <= len(prefixes) // 4 + 1
+
+    unrounded = ContextBudget(FlatEstimator(), budget=COST * 12)
+    plain = [tuple(contents(unrounded.fit(conversation(t)))[:3]) for t in range(20, 32)]
+    assert sum(1 for b, a in zip(plain, plain[1:]) if b != a) == len(plain) - 1
+
+
+def test_recall_notice_is_dropped_with_its_message():
+    messages = conversation(10)
+    messages.insert(4, {"role": "system", "content": RECALL_NOTICE})
+    # The budget alone drops turns 0-2; the notice after them goes too.
+    window = ContextBudget(FlatEstimator(), budget=COST * 11).fit(messages)
+    assert window.dropped == 4
+    assert contents(window)[1:3] == [OMITTED_HISTORY_HINT.format(count=4), "turn 3"]
+
+
+def test_heuristic_counts_cjk_per_character():
+    estimator = TokenEstimator()
+    assert estimator.count("") == 0
+    assert estimator.count("你好") == 2
+    assert estimator.count("hello world") == 4
+
+
+def test_prefix_tracker_counts_shared_leading_messages():
+    estimator = FlatEstimator()
+    budget = ContextBudget(estimator, budget=0)
+    tracker = PrefixTracker(estimator)
+    assert tracker.observe(budget.fit(conversation(4))) == 0
+    # The trailing emotion message moved, everything before it is shared.
+    assert tracker.observe(budget.fit(conversation(5))) == COST * 5
@@ -0,0 +1,92 @@
+import json
+import random
+
+import pytest
+
+from scripts.benchmarks.json_repair_bench import (
+    DEFAULT_CORPUS,
+    SAMPLE_REPLIES,
+    load_corpus,
+    mutate,
+    repaired_parse,
+)
+from src.services.llm.json_repair import repair_json
+
+CORPUS = load_corpus(DEFAULT_CORPUS)
+
+
+@pytest.mark.parametrize("row", CORPUS, ids=[str(i) for i in range(len(CORPUS))])
+def test_corpus_reply_recovered(row):
+    parsed = repaired_parse(row["content"])
+    assert parsed is not None
+    if "expected_reply" in row:
+        assert parsed.get("reply", "") == row["expected_reply"]
+    else:
+        assert parsed.get("reply") or parsed.get("tool_calls")
+
+
+def test_strict_json_takes_fast_path():
+    text = json.dumps({"emotion": {"happy": "low"}, "reply": "嗯", "tool_calls": []})
+    result = repair_json(text)
+    assert result.value == {"emotion": {"happy": "low"}, "reply": "嗯", "tool_calls": []}
+    assert not result.repaired
+    assert not result.truncated
+
+
+def test_missing_comma_between_members():
+    result = repair_json('{"emotion": {"excited": "high"}, "reply": "冲冲冲！" "tool_calls": []}')
+    assert result.value == {"emotion": {"excited": "high"}, "reply": "冲冲冲！", "tool_calls": []}
+    assert result.repaired
+    assert not result.truncated
+
+
+def test_truncated_tool_call_is_flagged():
+    result = repair_json('{"reply":"x","tool_calls":[{"name":"block_user","arguments":{')
+    assert result.value["reply"] == "x"
+    assert result.truncated
+    assert not result.is_complete("tool_calls", 0)
+
+
+def test_tool_calls_closed_before_cut_off_are_complete():
+    result = repair_json(
+        '{"reply":"x","tool_calls":[{"name":"recall_message","arguments":{"id":"1"}},'
+        '{"name":"block_us'
+    )
+    assert result.truncated
+    assert result.is_complete("tool_calls", 0)
+    assert not result.is_complete("tool_calls", 1)
+    assert not result.is_complete("tool_calls")
+
+
+def test_only_outer_object_open():
+    result = repair_json(
+        '{"reply":"x","tool_calls":[{"name":"recall_message","arguments":{"id":"1"}}]'
+    )
+    assert result.value["tool_calls"] == [{"name": "recall_message", "arguments": {"id": "1"}}]
+    assert result.closed == ((),)
+    assert result.is_complete("tool_calls", 0)
+
+
+def test_truncated_inside_surrogate_pair_drops_high_half():
+    result = repair_json('{"reply": "funny \\ud83d\\ude')
+    assert result.value == {"reply": "funny "}
+    assert result.truncated
+
+
+def test_no_object_yields_none():
+    result = repair_json("抱歉，我不太明白")
+    assert result.value is None
+    assert result.repaired
+
+
+def test_mutation_fuzz():
+    rng = random.Random(0)
+    for _ in range(5000):
+        case = mutate(rng, rng.choice(SAMPLE_REPLIES))
+        parsed = repaired_parse(case["text"])
+        got = (parsed or {}).get("reply", "")
+        if case["kind"] == "truncate":
+            assert isinstance(got, str), case
+            assert case["reply"].startswith(got.rstrip("\\")), case
+        else:
+            assert got == case["reply"], case
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.llm.rate_limiter import ProviderScheduler, TokenBucket
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    assert bucket.time_until(60, now) == 0.0
+    bucket.consume(60, now)
+    assert bucket.time_until(1, now) == pytest.approx(1.0)
+    assert bucket.time_until(1, now + 0.5) == pytest.approx(0.5)
+    assert bucket.time_until(1, now + 1.0) == 0.0
+    # Requests larger than the bucket only wait for a full bucket.
+    assert bucket.time_until(600, now + 1.0) == pytest.approx(59.0)
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(per_minute=0)
+    bucket.consume(10**6, time.monotonic())
+    assert bucket.time_until(10**6, time.monotonic()) == 0.0
+
+
+def test_in_flight_limit_and_round_robin_across_sessions():
+    async def scenario():
+        scheduler = ProviderScheduler("test", max_in_flight=1)
+        await scheduler.acquire("holder")
+        order = []
+
+        async def request(session_id, label):
+            await scheduler.acquire(session_id)
+            order.append(label)
+
+        tasks = [
+            asyncio.create_task(request("a", "a1")),
+            asyncio.create_task(request("a", "a2")),
+            asyncio.create_task(request("a", "a3")),
+            asyncio.create_task(request("b", "b1")),
+        ]
+        await asyncio.sleep(0)
+        queued = scheduler.get_stats()["queued"]
+        for _ in tasks:
+            scheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return scheduler, order, queued
+
+    scheduler, order, queued = asyncio.run(scenario())
+    assert queued == 4
+    assert order == ["a1", "b1", "a2", "a3"]
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 1
+    assert stats["granted"] == 5
+    assert stats["queued"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = ProviderScheduler("test", max_in_flight=1)
+        await scheduler.acquire("holder")
+        waiter = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queued = scheduler.get_stats()["queued_sessions"]
+        scheduler.release()
+        return scheduler, queued
+
+    scheduler, queued = asyncio.run(scenario())
+    assert queued == 0
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 0
+    assert stats["granted"] == 1
+
+
+def test_slot_releases_on_error():
+    async def scenario():
+        scheduler = ProviderScheduler("test", max_in_flight=1)
+        with pytest.raises(RuntimeError):
+            async with scheduler.slot("a"):
+                raise RuntimeError("provider error")
+        async with scheduler.slot("b"):
+            pass
+        return scheduler
+
+    stats = asyncio.run(scenario()).get_stats()
+    assert stats["in_flight"] == 0
+    assert stats["granted"] == 2
+
+
+def test_backoff_pauses_admission():
+    async def scenario():
+        scheduler = ProviderScheduler("test", max_in_flight=4)
+        scheduler.backoff(0.05)
+        started = time.monotonic()
+        async with scheduler.slot("a"):
+            waited = time.monotonic() - started
+        return scheduler, waited
+
+    scheduler, waited = asyncio.run(scenario())
+    assert waited >= 0.04
+    stats = scheduler.get_stats()
+    assert stats["backoffs"] == 1
+    assert stats["throttled"] >= 1
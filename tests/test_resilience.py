@@ -0,0 +1,104 @@
+import time
+
+import httpx
+import pytest
+
+from src.services.llm.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    get_circuit_breaker,
+    is_rate_limited,
+)
+
+
+def status_error(code: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://llm.example/v1/chat/completions")
+    response = httpx.Response(code, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {code}", request=request, response=response)
+
+
+def open_breaker(threshold=2, recovery=60.0) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=threshold, recovery_timeout=recovery)
+    for _ in range(threshold):
+        breaker.before_request()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=60.0)
+    for _ in range(2):
+        breaker.before_request()
+        breaker.record_failure()
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker = open_breaker(threshold=3)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allows_request
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.get_stats()["rejected"] == 2
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = open_breaker(recovery=0.0)
+    breaker.check()
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allows_request
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allows_request
+
+
+def test_failed_probe_reopens():
+    breaker = open_breaker(recovery=0.05)
+    time.sleep(0.06)
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allows_request
+    assert breaker.get_stats()["opened"] == 2
+
+
+def test_release_frees_the_probe_without_deciding():
+    breaker = open_breaker(recovery=0.0)
+    breaker.before_request()
+    breaker.release()  # e.g. cancelled, a 4xx, or a 429
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allows_request
+    breaker.before_request()
+
+
+def test_rate_limits_are_retried_but_not_provider_failures():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=10.0)
+    assert policy.is_retryable(status_error(429))
+    assert is_rate_limited(status_error(429))
+    assert policy.is_retryable(status_error(503))
+    assert not is_rate_limited(status_error(503))
+    assert not policy.is_retryable(status_error(409))
+    assert not policy.is_retryable(status_error(400))
+    assert policy.is_retryable(httpx.ConnectError("reset"))
+
+
+def test_retry_delay_honors_retry_after_and_caps():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=4.0)
+    assert policy.delay(1, status_error(429, {"retry-after": "2"})) == 2.0
+    assert policy.delay(1, status_error(429, {"retry-after": "30"})) == 4.0
+    for attempt in range(1, 6):
+        ceiling = min(4.0, 0.5 * 2 ** (attempt - 1))
+        assert ceiling / 2 <= policy.delay(attempt) <= ceiling
+
+
+def test_breakers_are_per_base_url_and_model():
+    first = get_circuit_breaker("https://llm.example/v1/", "model-a")
+    assert get_circuit_breaker("https://llm.example/v1", "model-a") is first
+    assert get_circuit_breaker("https://llm.example/v1", "model-b") is not first
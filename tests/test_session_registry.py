@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+from src.services.session.session_registry import SessionRegistry
+
+
+class FakeService:
+    """Stands in for SessionService: activity, busy flag and stop()."""
+
+    def __init__(self, idle_for: float = 0.0, busy: bool = False, on_stop=None):
+        self.last_active = time.monotonic() - idle_for
+        self.is_busy = busy
+        self.stopped = False
+        self._on_stop = on_stop
+
+    async def stop(self):
+        await asyncio.sleep(0)
+        if self._on_stop is not None:
+            self._on_stop()
+        self.stopped = True
+
+    def get_memory_stats(self):
+        return {"approx_bytes": 100}
+
+
+def registry(**overrides) -> SessionRegistry:
+    options = dict(max_sessions=2, idle_timeout=0.0, sweep_interval=60.0, max_dormant=8)
+    options.update(overrides)
+    return SessionRegistry(**options)
+
+
+def payload(session_id):
+    return {"data": {"session": session_id}, "user_id": "user"}
+
+
+def test_capacity_evicts_least_recently_used():
+    async def scenario():
+        sessions = registry()
+        services = {sid: FakeService() for sid in ("a", "b", "c")}
+        await sessions.add("a", services["a"], payload("a"))
+        await sessions.add("b", services["b"], payload("b"))
+        sessions.touch("a")
+        await sessions.add("c", services["c"], payload("c"))
+        return sessions, services
+
+    sessions, services = asyncio.run(scenario())
+    assert "b" not in sessions
+    assert services["b"].stopped
+    assert {"a", "c"} == {sid for sid, _ in sessions.items()}
+    assert sessions.take_dormant("b") == payload("b")
+    assert sessions.take_dormant("b") is None
+    stats = sessions.get_stats()
+    assert (stats["evicted_capacity"], stats["rehydrated"], stats["dormant"]) == (1, 1, 0)
+
+
+def test_busy_sessions_are_never_evicted():
+    async def scenario():
+        sessions = registry(max_sessions=1)
+        busy = FakeService(busy=True)
+        await sessions.add("a", busy, payload("a"))
+        await sessions.add("b", FakeService(), payload("b"))
+        return sessions, busy
+
+    sessions, busy = asyncio.run(scenario())
+    assert len(sessions) == 2
+    assert not busy.stopped
+
+
+def test_evict_idle_skips_recent_and_busy_sessions():
+    async def scenario():
+        sessions = registry(max_sessions=10, idle_timeout=5.0)
+        services = {
+            "idle": FakeService(idle_for=10.0),
+            "recent": FakeService(idle_for=1.0),
+            "busy": FakeService(idle_for=10.0, busy=True),
+        }
+        for sid, service in services.items():
+            await sessions.add(sid, service, payload(sid))
+        evicted = await sessions.evict_idle()
+        sessions.clear()
+        return evicted, services
+
+    evicted, services = asyncio.run(scenario())
+    assert evicted == 1
+    assert services["idle"].stopped
+    assert not services["recent"].stopped
+    assert not services["busy"].stopped
+
+
+def test_session_active_during_sweep_is_kept():
+    async def scenario():
+        sessions = registry(max_sessions=10, idle_timeout=5.0)
+        late = FakeService(idle_for=10.0)
+
+        def message_arrives():
+            late.last_active = time.monotonic()
+
+        # "late" gets a message while the sweep awaits the first eviction.
+        first = FakeService(idle_for=10.0, on_stop=message_arrives)
+        await sessions.add("first", first, payload("first"))
+        await sessions.add("late", late, payload("late"))
+        evicted = await sessions.evict_idle()
+        sessions.clear()
+        return evicted, late, sessions
+
+    evicted, late, sessions = asyncio.run(scenario())
+    assert evicted == 1
+    assert not late.stopped
+    assert sessions.get_stats()["evicted_idle"] == 1
+
+
+def test_dormant_payloads_are_bounded():
+    async def scenario():
+        sessions = registry(max_sessions=1, max_dormant=2)
+        for sid in ("a", "b", "c", "d"):
+            await sessions.add(sid, FakeService(), payload(sid))
+        return sessions
+
+    sessions = asyncio.run(scenario())
+    assert sessions.get_stats()["dormant"] == 2
+    assert sessions.take_dormant("a") is None
+    assert sessions.take_dormant("c") == payload("c")
+
+
+def test_remove_stops_and_forgets_the_session():
+    async def scenario():
+        sessions = registry(max_sessions=1)
+        service = FakeService()
+        await sessions.add("a", service, payload("a"))
+        await sessions.remove("a")
+        return sessions, service
+
+    sessions, service = asyncio.run(scenario())
+    assert service.stopped
+    assert "a" not in sessions
+    assert sessions.take_dormant("a") is None
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from src.core.models.behavior import PlaybackAction
+from src.services.behavior.scheduler import TimelineScheduler
+
+
+def actions(*timestamps):
+    return [
+        PlaybackAction(type="send", text=str(i), timestamp=ts)
+        for i, ts in enumerate(timestamps)
+    ]
+
+
+class Recorder:
+    """run_action that records (text, loop time) for each action."""
+
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, action):
+        self.events.append((action.text, asyncio.get_running_loop().time()))
+
+    @property
+    def texts(self):
+        return [text for text, _ in self.events]
+
+
+def test_actions_run_in_order_then_completion_hook():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.005)
+        recorder = Recorder()
+        completed = []
+
+        async def on_complete():
+            completed.append(recorder.texts[:])
+
+        timeline = scheduler.schedule("s1", actions(0.0, 0.01, 0.03), recorder, on_complete)
+        await timeline.wait()
+        return scheduler, recorder, completed, timeline
+
+    scheduler, recorder, completed, timeline = asyncio.run(scenario())
+    assert recorder.texts == ["0", "1", "2"]
+    assert completed == [["0", "1", "2"]]
+    assert not timeline.active
+    stats = scheduler.get_stats()
+    assert stats["completed"] == 1
+    assert stats["active_timelines"] == 0
+    assert stats["sessions"] == 0
+
+
+def test_actions_are_not_early_by_more_than_tick():
+    tick = 0.05
+
+    async def scenario():
+        scheduler = TimelineScheduler(tick=tick)
+        recorder = Recorder()
+        start = asyncio.get_running_loop().time()
+        timeline = scheduler.schedule("s1", actions(0.0, 0.02, 0.2), recorder)
+        await timeline.wait()
+        return scheduler, recorder, start
+
+    scheduler, recorder, start = asyncio.run(scenario())
+    offsets = [at - start for _, at in recorder.events]
+    for due, offset in zip((0.0, 0.02, 0.2), offsets):
+        assert offset >= due - tick
+    # 0.02 is within one tick of 0.0, so both ran in the first batch.
+    assert offsets[1] < 0.02
+    assert scheduler.get_stats()["batches"] == 2
+
+
+def test_timelines_due_together_share_a_batch():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.02)
+        recorder = Recorder()
+        first = scheduler.schedule("s1", actions(0.03), recorder)
+        second = scheduler.schedule("s2", actions(0.035), recorder)
+        await asyncio.gather(first.wait(), second.wait())
+        return scheduler
+
+    stats = asyncio.run(scenario()).get_stats()
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 2
+    assert stats["actions"] == 2
+
+
+def test_cancel_drops_remaining_actions():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.005)
+        recorder = Recorder()
+        completed = []
+
+        async def on_complete():
+            completed.append(True)
+
+        timeline = scheduler.schedule("s1", actions(0.0, 0.05), recorder, on_complete)
+        await asyncio.sleep(0.02)
+        assert scheduler.cancel(timeline)
+        assert not scheduler.cancel(timeline)
+        with pytest.raises(asyncio.CancelledError):
+            await timeline.wait()
+        await asyncio.sleep(0.06)
+        return scheduler, recorder, completed
+
+    scheduler, recorder, completed = asyncio.run(scenario())
+    assert recorder.texts == ["0"]
+    assert completed == []
+    stats = scheduler.get_stats()
+    assert stats["cancelled"] == 1
+    assert stats["completed"] == 0
+    assert stats["active_timelines"] == 0
+
+
+def test_cancelling_the_waiter_cancels_the_timeline():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.005)
+        recorder = Recorder()
+        timeline = scheduler.schedule("s1", actions(0.05), recorder)
+        waiter = asyncio.create_task(timeline.wait())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0.06)
+        return scheduler, recorder, timeline
+
+    scheduler, recorder, timeline = asyncio.run(scenario())
+    assert not timeline.active
+    assert recorder.texts == []
+    assert scheduler.get_stats()["cancelled"] == 1
+
+
+def test_cancel_session_only_touches_that_session():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.005)
+        recorder = Recorder()
+        mine = [scheduler.schedule("s1", actions(0.02), recorder) for _ in range(3)]
+        other = scheduler.schedule("s2", actions(0.02), recorder)
+        assert scheduler.cancel_session("s1") == 3
+        assert scheduler.cancel_session("s1") == 0
+        await other.wait()
+        return scheduler, recorder, mine
+
+    scheduler, recorder, mine = asyncio.run(scenario())
+    assert recorder.texts == ["0"]
+    assert not any(timeline.active for timeline in mine)
+    stats = scheduler.get_stats()
+    assert (stats["completed"], stats["cancelled"]) == (1, 3)
+    assert stats["sessions"] == 0
+
+
+def test_cancelled_entries_are_compacted():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.005)
+        recorder = Recorder()
+        timelines = [
+            scheduler.schedule(f"s{i}", actions(60.0), recorder) for i in range(200)
+        ]
+        keep = timelines.pop()
+        for timeline in timelines:
+            scheduler.cancel(timeline)
+        await asyncio.sleep(0)  # Done callbacks run on the next loop pass
+        stats = scheduler.get_stats()
+        scheduler.cancel(keep)
+        await asyncio.sleep(0)
+        return stats, scheduler.get_stats()
+
+    during, after = asyncio.run(scenario())
+    assert during["active_timelines"] == 1
+    assert during["heap_size"] < 200
+    assert after["active_timelines"] == 0
+    assert after["cancelled"] == 200
+    assert after["scheduled"] == after["completed"] + after["cancelled"]
+
+
+def test_failing_action_does_not_stop_the_timeline():
+    async def scenario():
+        scheduler = TimelineScheduler(tick=0.005)
+        ran = []
+
+        async def run_action(action):
+            ran.append(action.text)
+            if action.text == "0":
+                raise RuntimeError("boom")
+
+        timeline = scheduler.schedule("s1", actions(0.0, 0.01), run_action)
+        await timeline.wait()
+        return scheduler, ran
+
+    scheduler, ran = asyncio.run(scenario())
+    assert ran == ["0", "1"]
+    assert scheduler.get_stats()["completed"] == 1
@@ -0,0 +1,710 @@
+"""
+Mock LLM server for offline load testing.
+
+Speaks the three wire formats LLMService uses (OpenAI /chat/completions,
+OpenAI /responses, Anthropic /messages), including SSE streaming, and
+answers with the structured {"emotion", "reply", "tool_calls"} JSON the
+behavior prompt asks for. Latency, injected errors, scripted tool calls
+and recorded fixtures are configurable from the command line.
+
+    python tools/mock_llm/mock_llm_server.py --port 9000 \
+        --latency lognormal:600,0.5 --error-rate 0.02
+
+    python run.py --mock-llm --mock-llm-options "--latency uniform:200,900"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import shlex
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMOTIONS = [
+    "neutral",
+    "happy",
+    "excited",
+    "playful",
+    "caring",
+    "shy",
+    "surprised",
+    "confused",
+    "tired",
+]
+INTENSITIES = ["low", "medium", "high"]
+CANNED_REPLIES = [
+    "收到啦～你说的「{text}」我记住了。等我想想怎么回你",
+    "诶？「{text}」吗。好像挺有意思的！你再多说一点嘛",
+    "嗯嗯，我在听。关于「{text}」，我也有点想法",
+    "哈哈，「{text}」这个我懂。今天过得怎么样呀",
+]
+TOOL_RESULT_PREFIX = "工具调用结果"
+# System notices the app sends; the messages protocol delivers them as user text.
+SYSTEM_NOTICE_PREFIXES = (TOOL_RESULT_PREFIX, "Emotion state:", "时间：", "系统提示：")
+PROTOCOL_PATHS = {
+    "/chat/completions": "completions",
+    "/responses": "responses",
+    "/messages": "messages",
+}
+
+
+class LatencyModel:
+    """
+    Latency distribution in milliseconds, parsed from a spec string:
+    fixed:MS, uniform:LO,HI, normal:MEAN,STD or lognormal:MEDIAN,SIGMA.
+    """
+
+    def __init__(self, kind: str, params: List[float]):
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = (spec or "fixed:0").partition(":")
+        kind = kind.strip().lower()
+        try:
+            params = [float(p) for p in raw.split(",") if p.strip()]
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid latency spec: {spec}")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise argparse.ArgumentTypeError(f"Invalid latency spec: {spec}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """One draw, in seconds."""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(self.params[0], self.params[1])
+        else:
+            ms = rng.lognormvariate(math.log(max(self.params[0], 1e-3)), self.params[1])
+        return max(0.0, ms) / 1000
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+
+@dataclass
+class MockSettings:
+    latency: LatencyModel = field(default_factory=lambda: LatencyModel("fixed", [300]))
+    chunk_delay: LatencyModel = field(default_factory=lambda: LatencyModel("fixed", [30]))
+    chunk_chars: int = 4
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [429, 500, 503])
+    retry_after: float = 1.0
+    stall_rate: float = 0.0
+    stall_seconds: float = 120.0
+    midstream_error_rate: float = 0.0
+    script: List[Dict[str, Any]] = field(default_factory=list)
+    fixtures: Dict[str, str] = field(default_factory=dict)
+    fixtures_by_user: Dict[str, str] = field(default_factory=dict)
+    replay_strict: bool = False
+    record_path: Optional[Path] = None
+    upstream_url: str = ""
+    upstream_key: str = ""
+    upstream_model: str = ""
+    seed: Optional[int] = None
+
+
+# ---------------------------------------------------------------------- #
+# Fixtures
+# ---------------------------------------------------------------------- #
+def fixture_key(messages: List[Dict[str, str]]) -> str:
+    canonical = json.dumps(
+        [[m.get("role", ""), m.get("content", "")] for m in messages],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_system_notice(text: str) -> bool:
+    return text.startswith(SYSTEM_NOTICE_PREFIXES)
+
+
+def last_user_index(messages: List[Dict[str, str]]) -> int:
+    """Index of the last message the user typed (system notices skipped), or -1."""
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if message.get("role") == "user" and not is_system_notice(
+            message.get("content", "")
+        ):
+            return index
+    return -1
+
+
+def last_user_text(messages: List[Dict[str, str]]) -> str:
+    index = last_user_index(messages)
+    return messages[index].get("content", "") if index >= 0 else ""
+
+
+def load_fixtures(path: Path) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Read JSONL fixtures ({"messages": [...], "content": "..."} per line, as
+    written by --record) from a file or every *.jsonl in a directory.
+    """
+    files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+    by_key: Dict[str, str] = {}
+    by_user: Dict[str, str] = {}
+    for file in files:
+        for line in file.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            messages = record.get("messages") or []
+            content = record.get("content", "")
+            by_key[record.get("key") or fixture_key(messages)] = content
+            user_text = last_user_text(messages)
+            if user_text:
+                by_user.setdefault(user_text, content)
+    return by_key, by_user
+
+
+def append_fixture(path: Path, messages: List[Dict[str, str]], content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {"key": fixture_key(messages), "messages": messages, "content": content}
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# ---------------------------------------------------------------------- #
+# Request normalization
+# ---------------------------------------------------------------------- #
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return ""
+
+
+def normalize_messages(protocol: str, body: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Flatten any of the three request formats to [{"role", "content"}]."""
+    if protocol == "completions":
+        raw = body.get("messages") or []
+        return [
+            {"role": m.get("role", ""), "content": _text_of(m.get("content"))} for m in raw
+        ]
+
+    if protocol == "responses":
+        messages: List[Dict[str, str]] = []
+        if body.get("instructions"):
+            messages.append({"role": "system", "content": body["instructions"]})
+        raw = body.get("input") or []
+        if isinstance(raw, str):
+            raw = [{"role": "user", "content": raw}]
+        for m in raw:
+            role = "system" if m.get("role") == "developer" else m.get("role", "")
+            messages.append({"role": role, "content": _text_of(m.get("content"))})
+        return messages
+
+    # Same-role turns are merged into content blocks (system notices included),
+    # so each text block stays its own message.
+    messages = []
+    system = body.get("system")
+    if system:
+        messages.append({"role": "system", "content": _text_of(system)})
+    for m in body.get("messages") or []:
+        role, content = m.get("role", ""), m.get("content")
+        if isinstance(content, list):
+            messages.extend(
+                {"role": role, "content": part.get("text", "")}
+                for part in content
+                if isinstance(part, dict) and part.get("type", "text") == "text"
+            )
+        else:
+            messages.append({"role": role, "content": _text_of(content)})
+    return messages
+
+
+# ---------------------------------------------------------------------- #
+# Reply generation
+# ---------------------------------------------------------------------- #
+class MockLLM:
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "streams": 0,
+            "errors_injected": 0,
+            "stalls": 0,
+            "midstream_errors": 0,
+            "script_hits": 0,
+            "replay_hits": 0,
+            "replay_misses": 0,
+            "recorded": 0,
+        }
+        self._lock = asyncio.Lock()
+
+    def injected_error(self) -> Optional[JSONResponse]:
+        if self.rng.random() >= self.settings.error_rate:
+            return None
+        self.stats["errors_injected"] += 1
+        status = self.rng.choice(self.settings.error_statuses)
+        headers = {"Retry-After": str(self.settings.retry_after)} if status == 429 else {}
+        return JSONResponse(
+            {"error": {"message": f"Injected mock error {status}", "type": "mock_error"}},
+            status_code=status,
+            headers=headers,
+        )
+
+    async def maybe_stall(self):
+        if self.rng.random() < self.settings.stall_rate:
+            self.stats["stalls"] += 1
+            await asyncio.sleep(self.settings.stall_seconds)
+
+    async def content_for(
+        self, messages: List[Dict[str, str]], body: Dict[str, Any]
+    ) -> Optional[str]:
+        """Raw assistant content, or None when strict replay has no fixture."""
+        key = fixture_key(messages)
+        if key in self.settings.fixtures:
+            self.stats["replay_hits"] += 1
+            return self.settings.fixtures[key]
+        user_text = last_user_text(messages)
+        if user_text in self.settings.fixtures_by_user:
+            self.stats["replay_hits"] += 1
+            return self.settings.fixtures_by_user[user_text]
+        if self.settings.fixtures:
+            self.stats["replay_misses"] += 1
+            if self.settings.replay_strict:
+                return None
+
+        if self.settings.upstream_url:
+            content = await self._forward(messages, body)
+            if self.settings.record_path is not None:
+                async with self._lock:
+                    append_fixture(self.settings.record_path, messages, content)
+                self.stats["recorded"] += 1
+            return content
+
+        return json.dumps(self._generate(messages), ensure_ascii=False)
+
+    def _generate(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        user_index = last_user_index(messages)
+        user_text = messages[user_index]["content"] if user_index >= 0 else ""
+        after_tool = any(
+            m.get("role") in ("system", "user")
+            and m.get("content", "").startswith(TOOL_RESULT_PREFIX)
+            for m in messages[user_index + 1 :]
+        )
+
+        for entry in self.settings.script:
+            if bool(entry.get("after_tool", False)) != after_tool:
+                continue
+            if not re.search(entry.get("match", ""), user_text):
+                continue
+            self.stats["script_hits"] += 1
+            return {
+                "emotion": entry.get("emotion") or {"neutral": "medium"},
+                "reply": entry.get("reply", ""),
+                "tool_calls": entry.get("tool_calls") or [],
+            }
+
+        snippet = (user_text.strip() or "……")[:12]
+        digest = hashlib.md5(user_text.encode("utf-8")).hexdigest()
+        template = CANNED_REPLIES[int(digest, 16) % len(CANNED_REPLIES)]
+        return {
+            "emotion": {self.rng.choice(EMOTIONS): self.rng.choice(INTENSITIES)},
+            "reply": template.format(text=snippet),
+            "tool_calls": [],
+        }
+
+    async def _forward(self, messages: List[Dict[str, str]], body: Dict[str, Any]) -> str:
+        payload = {
+            "model": self.settings.upstream_model or body.get("model"),
+            "messages": messages,
+            "max_tokens": body.get("max_tokens") or body.get("max_output_tokens") or 1000,
+            "response_format": {"type": "json_object"},
+        }
+        async with httpx.AsyncClient(timeout=120) as client:
+            response = await client.post(
+                f"{self.settings.upstream_url.rstrip('/')}/chat/completions",
+                json=payload,
+                headers={"Authorization": f"Bearer {self.settings.upstream_key}"},
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+
+    def chunks(self, content: str) -> List[str]:
+        size = max(1, self.settings.chunk_chars)
+        return [content[i : i + size] for i in range(0, len(content), size)] or [""]
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+# ---------------------------------------------------------------------- #
+# Wire formats
+# ---------------------------------------------------------------------- #
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def render_response(
+    protocol: str, model: str, content: str, prompt_tokens: int
+) -> Dict[str, Any]:
+    completion_tokens = _tokens(content)
+    if protocol == "completions":
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+    if protocol == "responses":
+        return {
+            "id": f"resp_{uuid.uuid4().hex[:12]}",
+            "object": "response",
+            "status": "completed",
+            "model": model,
+            "output": [
+                {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": content}],
+                }
+            ],
+            "usage": {
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+            },
+        }
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:12]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": content}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens},
+    }
+
+
+async def stream_events(
+    mock: MockLLM, protocol: str, model: str, content: str, prompt_tokens: int
+) -> AsyncIterator[str]:
+    pieces = mock.chunks(content)
+    fail_at = (
+        len(pieces) // 2 if mock.rng.random() < mock.settings.midstream_error_rate else None
+    )
+    stream_id = uuid.uuid4().hex[:12]
+
+    if protocol == "messages":
+        yield _sse(
+            {
+                "type": "message_start",
+                "message": {
+                    "id": f"msg_{stream_id}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model,
+                    "content": [],
+                    "usage": {"input_tokens": prompt_tokens, "output_tokens": 0},
+                },
+            },
+            "message_start",
+        )
+        yield _sse(
+            {
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            },
+            "content_block_start",
+        )
+
+    for index, piece in enumerate(pieces):
+        if index == fail_at:
+            mock.stats["midstream_errors"] += 1
+            if protocol == "completions":
+                # Drop the connection, like a provider-side reset.
+                raise ConnectionResetError("Injected mid-stream failure")
+            error = {"type": "overloaded_error", "message": "Injected mid-stream failure"}
+            yield _sse({"type": "error", "error": error}, "error")
+            return
+        await asyncio.sleep(mock.settings.chunk_delay.sample(mock.rng))
+        if protocol == "completions":
+            yield _sse(
+                {
+                    "id": f"chatcmpl-{stream_id}",
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "delta": {"content": piece}, "finish_reason": None}
+                    ],
+                }
+            )
+        elif protocol == "responses":
+            yield _sse(
+                {
+                    "type": "response.output_text.delta",
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": piece,
+                },
+                "response.output_text.delta",
+            )
+        else:
+            yield _sse(
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": piece},
+                },
+                "content_block_delta",
+            )
+
+    if protocol == "completions":
+        yield "data: [DONE]\n\n"
+    elif protocol == "responses":
+        response = render_response(protocol, model, content, prompt_tokens)
+        yield _sse({"type": "response.completed", "response": response}, "response.completed")
+    else:
+        yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+        yield _sse(
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn"},
+                "usage": {"output_tokens": _tokens(content)},
+            },
+            "message_delta",
+        )
+        yield _sse({"type": "message_stop"}, "message_stop")
+
+
+# ---------------------------------------------------------------------- #
+# App
+# ---------------------------------------------------------------------- #
+def create_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI(title="Mock LLM")
+    mock = MockLLM(settings)
+    app.state.mock = mock
+
+    async def handle(protocol: str, request: Request):
+        body = await request.json()
+        mock.stats["requests"] += 1
+        messages = normalize_messages(protocol, body)
+        model = body.get("model") or "mock-model"
+
+        await mock.maybe_stall()
+        error = mock.injected_error()
+        if error is not None:
+            return error
+
+        content = await mock.content_for(messages, body)
+        if content is None:
+            return JSONResponse(
+                {
+                    "error": {
+                        "message": "No fixture for this request",
+                        "type": "mock_replay_miss",
+                    }
+                },
+                status_code=404,
+            )
+
+        prompt_tokens = sum(_tokens(m["content"]) for m in messages)
+        await asyncio.sleep(settings.latency.sample(mock.rng))
+        if body.get("stream"):
+            mock.stats["streams"] += 1
+            return StreamingResponse(
+                stream_events(mock, protocol, model, content, prompt_tokens),
+                media_type="text/event-stream",
+            )
+        return render_response(protocol, model, content, prompt_tokens)
+
+    def route(protocol: str):
+        async def endpoint(request: Request):
+            return await handle(protocol, request)
+
+        return endpoint
+
+    for prefix in ("", "/v1"):
+        for path, protocol in PROTOCOL_PATHS.items():
+            app.add_api_route(f"{prefix}{path}", route(protocol), methods=["POST"])
+
+    @app.get("/stats")
+    async def stats():
+        return mock.stats
+
+    return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Mock LLM server for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument(
+        "--latency",
+        type=LatencyModel.parse,
+        default=LatencyModel("fixed", [300]),
+        help="Time before the response / first chunk: fixed:MS, uniform:LO,HI, "
+        "normal:MEAN,STD or lognormal:MEDIAN,SIGMA (default fixed:300)",
+    )
+    parser.add_argument(
+        "--chunk-delay",
+        type=LatencyModel.parse,
+        default=LatencyModel("fixed", [30]),
+        help="Delay between streamed chunks, same syntax (default fixed:30)",
+    )
+    parser.add_argument(
+        "--chunk-chars", type=int, default=4, help="Characters per streamed chunk"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests answered with an error status",
+    )
+    parser.add_argument(
+        "--error-statuses",
+        default="429,500,503",
+        help="Comma-separated statuses to inject (429 carries Retry-After)",
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument(
+        "--stall-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests that hang (client timeouts)",
+    )
+    parser.add_argument("--stall-seconds", type=float, default=120.0)
+    parser.add_argument(
+        "--midstream-error-rate",
+        type=float,
+        default=0.0,
+        help="Share of streams that fail halfway (reset or error event)",
+    )
+    parser.add_argument(
+        "--script",
+        type=Path,
+        help='JSON list of {"match": regex on the last user message, "emotion", '
+        '"reply", "tool_calls", "after_tool": bool}; first match wins',
+    )
+    parser.add_argument(
+        "--replay", type=Path, help="Fixture JSONL file or directory to replay"
+    )
+    parser.add_argument(
+        "--replay-strict",
+        action="store_true",
+        help="Answer 404 instead of generating when no fixture matches",
+    )
+    parser.add_argument(
+        "--record", type=Path, help="Append upstream responses as fixtures to this JSONL file"
+    )
+    parser.add_argument(
+        "--upstream",
+        default="",
+        help="Real /chat/completions provider to forward to (with --record)",
+    )
+    parser.add_argument("--upstream-key", default="")
+    parser.add_argument("--upstream-model", default="")
+    parser.add_argument("--seed", type=int, help="Seed for latency/error/emotion randomness")
+    return parser
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    settings = MockSettings(
+        latency=args.latency,
+        chunk_delay=args.chunk_delay,
+        chunk_chars=args.chunk_chars,
+        error_rate=args.error_rate,
+        error_statuses=[int(s) for s in args.error_statuses.split(",") if s.strip()],
+        retry_after=args.retry_after,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        midstream_error_rate=args.midstream_error_rate,
+        replay_strict=args.replay_strict,
+        record_path=args.record,
+        upstream_url=args.upstream,
+        upstream_key=args.upstream_key,
+        upstream_model=args.upstream_model,
+        seed=args.seed,
+    )
+    if args.script:
+        settings.script = json.loads(args.script.read_text(encoding="utf-8"))
+    if args.replay:
+        settings.fixtures, settings.fixtures_by_user = load_fixtures(args.replay)
+    return settings
+
+
+def parse_options(options: str = "") -> Tuple[argparse.Namespace, MockSettings]:
+    """Parse an embedded option string; the port defaults to 0 (any free port)."""
+    parser = build_parser()
+    parser.set_defaults(port=0)
+    args = parser.parse_args(shlex.split(options or ""))
+    return args, settings_from_args(args)
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def start_in_background(settings: MockSettings, host: str = "127.0.0.1", port: int = 0) -> str:
+    """Serve the mock from a daemon thread; returns its base URL once listening."""
+    port = port or free_port(host)
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(settings), host=host, port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, name="mock-llm", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Mock LLM server failed to start")
+        time.sleep(0.05)
+    return f"http://{host}:{port}"
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    settings = settings_from_args(args)
+    print(f"Mock LLM listening on http://{args.host}:{args.port}", flush=True)
+    print(
+        f"  latency={settings.latency} chunk_delay={settings.chunk_delay} "
+        f"error_rate={settings.error_rate}",
+        flush=True,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()